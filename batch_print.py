@@ -0,0 +1,105 @@
+"""Headless batch printing: merge PDFs or collections without a GUI session.
+
+Usage:
+    python -m pdf_printer_app print --collection "Morning Labels" --out merged.pdf
+    python batch_print.py --collection a.pdfcol --collection b.pdfcol --out merged.pdf
+    python batch_print.py one.pdf two.pdf --out merged.pdf --printer Office_Laser
+
+Uses the same pre-flight, blank-page padding and streaming merge as the
+Print button, and never imports Qt.
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+from pdf_print_core import (DEFAULT_CHUNK_SIZE, preflight, merge_files,
+                            read_collection, resolve_collection)
+
+COLLECTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'collections')
+
+
+def send_to_printer(file_path, printer):
+    """Queue a PDF on a CUPS printer (macOS/Linux)"""
+    if sys.platform == "win32":
+        raise RuntimeError("--printer is only supported where CUPS 'lp' is available")
+    command = ['lp', file_path] if printer == 'default' else ['lp', '-d', printer, file_path]
+    subprocess.run(command, check=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='pdf_printer_app print',
+        description="Merge PDFs into one print-ready file, headless.")
+    parser.add_argument('files', nargs='*', help="PDF files to merge, in order")
+    parser.add_argument('--collection', action='append', default=[],
+                        help="collection name or .pdfcol file (may be repeated)")
+    parser.add_argument('--out', required=True, help="path of the merged PDF")
+    parser.add_argument('--no-blank-pages', action='store_true',
+                        help="don't pad odd-page documents for double-sided printing")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes for pre-flight (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="documents merged in memory before each flush to disk")
+    parser.add_argument('--strict', action='store_true',
+                        help="fail instead of skipping files with errors")
+    parser.add_argument('--printer', help="send the result to this CUPS printer ('default' for the default one)")
+    parser.add_argument('--quiet', action='store_true', help="only print errors")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    log = (lambda message: None) if args.quiet else (lambda message: print(message, file=sys.stderr))
+
+    files = []
+    try:
+        for name in args.collection:
+            files.extend(entry.path for entry in read_collection(resolve_collection(name, COLLECTIONS_DIR)))
+    except Exception as e:
+        print(f"Error reading collection: {e}", file=sys.stderr)
+        return 1
+    files.extend(args.files)
+    if not files:
+        print("No files to print.", file=sys.stderr)
+        return 1
+
+    add_blank_pages = not args.no_blank_pages
+    start = time.perf_counter()
+    report = preflight(files, add_blank_pages, max_workers=args.workers)
+    log(f"Pre-flight ({time.perf_counter() - start:.2f}s): {report.summary()}")
+    for info in report.broken:
+        print(f"Error: {info['path']} ({info['error']})", file=sys.stderr)
+    if report.broken and args.strict:
+        return 1
+    if not report.valid:
+        print("No printable files.", file=sys.stderr)
+        return 1
+
+    def merge_progress(done, total, file_path):
+        if done and done % 100 == 0:
+            log(f"Merged {done}/{total} files")
+
+    result = merge_files(report.valid_files, args.out, add_blank_pages=add_blank_pages,
+                         chunk_size=args.chunk_size, progress_callback=merge_progress)
+    for file_path, error in result.failed:
+        print(f"Error: {file_path} ({error})", file=sys.stderr)
+    if result.output_path is None:
+        print("No printable files.", file=sys.stderr)
+        return 1
+    log(f"Wrote {args.out}: {result.page_count} pages in {time.perf_counter() - start:.2f}s")
+    if result.failed and args.strict:
+        return 1
+
+    if args.printer:
+        try:
+            send_to_printer(args.out, args.printer)
+        except Exception as e:
+            print(f"Error sending to printer: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Peak memory of print-job assembly versus batch size.
+
+Compares the old approach (insert every document into one in-memory PDF,
+then save) with pdf_print_core.StreamingMergeJob. Each run happens in a fresh
+subprocess so its peak RSS can be read from the OS.
+
+Usage:
+    python benchmarks/bench_merge_memory.py [--sizes 50 200 800] [--pages 2]
+
+Peak RSS is read with the resource module, so this runs on macOS/Linux only.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def make_corpus(folder, count, pages):
+    """Write count PDFs of the given page count, each with an incompressible image"""
+    import fitz
+    for i in range(count):
+        doc = fitz.open()
+        for p in range(pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Document {i} page {p + 1}")
+            pix = fitz.Pixmap(fitz.csRGB, 200, 200, os.urandom(200 * 200 * 3), False)
+            page.insert_image(fitz.Rect(72, 100, 472, 500), pixmap=pix)
+        doc.save(os.path.join(folder, f"doc_{i:05d}.pdf"))
+        doc.close()
+
+
+def run_in_memory(files, output_path):
+    import fitz
+    combined = fitz.open()
+    for file_path in files:
+        doc = fitz.open(file_path)
+        combined.insert_pdf(doc)
+        if doc.page_count % 2 != 0:
+            combined.new_page(-1, width=doc[0].rect.width, height=doc[0].rect.height)
+        doc.close()
+    combined.save(output_path)
+    combined.close()
+
+
+def run_streaming(files, output_path):
+    from pdf_print_core import StreamingMergeJob
+    job = StreamingMergeJob(output_path)
+    for file_path in files:
+        job.add(file_path)
+    job.finish()
+
+
+def child(mode, folder, count):
+    """Merge the first count files of folder and print timing and peak RSS as JSON"""
+    import resource
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith('.pdf'))[:count]
+    output_path = os.path.join(folder, f"out_{mode}_{count}.pdf")
+    start = time.perf_counter()
+    if mode == 'in-memory':
+        run_in_memory(files, output_path)
+    else:
+        run_streaming(files, output_path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        peak *= 1024  # Linux reports kilobytes, macOS bytes
+    output_bytes = os.path.getsize(output_path)
+    os.remove(output_path)
+    print(json.dumps({'mode': mode, 'files': count, 'seconds': round(elapsed, 3),
+                      'peak_rss_mb': round(peak / (1024 * 1024), 1),
+                      'output_mb': round(output_bytes / (1024 * 1024), 1)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 800])
+    parser.add_argument('--pages', type=int, default=2, help="pages per document")
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'FOLDER', 'COUNT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, folder, count = args.child
+        child(mode, folder, int(count))
+        return 0
+
+    folder = tempfile.mkdtemp(prefix='pdf_merge_bench_')
+    try:
+        print(f"Generating {max(args.sizes)} documents of {args.pages} pages...")
+        make_corpus(folder, max(args.sizes), args.pages)
+        results = []
+        print(f"{'mode':<10} {'files':>6} {'seconds':>8} {'peak RSS MB':>12} {'output MB':>10}")
+        for count in args.sizes:
+            for mode in ('in-memory', 'streaming'):
+                out = subprocess.run([sys.executable, __file__, '--child', mode, folder, str(count)],
+                                     capture_output=True, text=True, check=True)
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"{mode:<10} {count:>6} {result['seconds']:>8} "
+                      f"{result['peak_rss_mb']:>12} {result['output_mb']:>10}")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Raster print throughput and spool size by lookahead, resolution and colour mode.
+
+Prints a generated document through the app's QPrinter back-end into a PDF
+file (QPrinter.PdfFormat), the same path the Windows print button takes, once
+per combination of lookahead, dpi and colour mode. Lookahead 0 renders each
+page only when the previous one has been spooled, as the print loop used to.
+The size of the PDF written stands in for the spool size. --spool-delay adds
+a sleep per page to stand in for a slow printer driver.
+
+Usage:
+    python benchmarks/bench_print_raster.py [--pages 60] [--lookahead 0 2 4 8]
+    python benchmarks/bench_print_raster.py --label --modes rgb gray mono --dpi 203 300
+    python benchmarks/bench_print_raster.py --spool-delay 50 --json results.json
+
+Runs on an offscreen Qt platform, so no display or printer is needed.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def make_document(file_path, pages, label=False):
+    """Write a PDF of pages with text, a barcode and a colour gradient image on each.
+
+    Pages are letter size, or 4x6 inch shipping labels with label=True.
+    """
+    import fitz
+    width, height = (288, 432) if label else (612, 792)
+    side = 120
+    gradient = bytes(value for y in range(side) for x in range(side)
+                     for value in (x * 255 // side, y * 255 // side, 160))
+    logo = fitz.Pixmap(fitz.csRGB, side, side, gradient, False)
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page(width=width, height=height)
+        lines = 12 if label else 30
+        for line in range(lines):
+            page.insert_text((18, 30 + line * 14), f"Page {p + 1} line {line + 1} " + "lorem ipsum " * 3,
+                             fontsize=9)
+        bars = fitz.Rect(18, height - 110, width - 18, height - 30)
+        x = bars.x0
+        for i in range(90):
+            bar_width = 1 + (i * 7 + p) % 3
+            if i % 2 == 0 and x + bar_width <= bars.x1:
+                page.draw_rect(fitz.Rect(x, bars.y0, x + bar_width, bars.y1), color=None, fill=(0, 0, 0))
+            x += bar_width
+        page.insert_image(fitz.Rect(width - 108, height - 220, width - 18, height - 130), pixmap=logo)
+    doc.save(file_path)
+    doc.close()
+
+
+def run(pdf_path, output_path, lookahead, dpi, color_mode, spool_delay):
+    from PyQt5.QtPrintSupport import QPrinter
+    from pdf_print_core import metrics, print_raster
+    from pdf_printer_app import QPrinterBackend
+
+    class DelayedBackend(QPrinterBackend):
+        def draw(self, page):
+            super().draw(page)
+            time.sleep(spool_delay)
+
+    printer = QPrinter(QPrinter.HighResolution)
+    printer.setOutputFormat(QPrinter.PdfFormat)
+    printer.setOutputFileName(output_path)
+    metrics.reset()
+    start = time.perf_counter()
+    pages = print_raster(pdf_path, DelayedBackend(printer), dpi=dpi, color_mode=color_mode,
+                         lookahead=lookahead)
+    elapsed = time.perf_counter() - start
+    histograms = metrics.snapshot()['histograms']
+    rendered = histograms.get('print.render_page', {}).get('total_ms', 0.0)
+    waited = histograms.get('print.wait_render', {}).get('total_ms', 0.0)
+    if lookahead == 0:
+        # Nothing is rendered ahead, so every render is time the printer waits
+        waited = rendered
+    return {'lookahead': lookahead, 'dpi': dpi, 'mode': color_mode, 'pages': pages,
+            'seconds': round(elapsed, 3), 'pages_per_second': round(pages / elapsed, 1),
+            'render_ms': round(rendered, 1), 'waiting_ms': round(waited, 1),
+            'output_mb': round(os.path.getsize(output_path) / (1024 * 1024), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=60)
+    parser.add_argument('--label', action='store_true', help="4x6 inch label pages instead of letter")
+    parser.add_argument('--lookahead', type=int, nargs='+', default=[0, 4])
+    parser.add_argument('--dpi', type=int, nargs='+', default=[144])
+    parser.add_argument('--modes', nargs='+', default=['rgb', 'gray', 'mono'],
+                        choices=['rgb', 'gray', 'mono'])
+    parser.add_argument('--spool-delay', type=float, default=0, help="milliseconds added per page")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])  # noqa: F841 - QPrinter needs an application
+
+    folder = tempfile.mkdtemp(prefix='pdf_print_bench_')
+    try:
+        pdf_path = os.path.join(folder, 'job.pdf')
+        print(f"Generating a {args.pages}-page document...")
+        make_document(pdf_path, args.pages, args.label)
+        results = []
+        print(f"{'lookahead':>9} {'dpi':>4} {'mode':<5} {'seconds':>8} {'pages/s':>8} "
+              f"{'render ms':>10} {'waiting ms':>11} {'spool MB':>9}")
+        for lookahead in args.lookahead:
+            for dpi in args.dpi:
+                for mode in args.modes:
+                    output_path = os.path.join(folder, f"out_{lookahead}_{dpi}_{mode}.pdf")
+                    result = run(pdf_path, output_path, lookahead, dpi, mode, args.spool_delay / 1000)
+                    results.append(result)
+                    print(f"{lookahead:>9} {dpi:>4} {mode:<5} {result['seconds']:>8} "
+                          f"{result['pages_per_second']:>8} {result['render_ms']:>10} "
+                          f"{result['waiting_ms']:>11} {result['output_mb']:>9}")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
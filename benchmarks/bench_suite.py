@@ -0,0 +1,306 @@
+"""Benchmark suite for preview, print and file-list operations.
+
+Generates seeded synthetic corpora (see corpus.py), then times each stage in
+a fresh subprocess so its peak RSS can be read from the OS:
+
+    preview           render_preview() on a sample of files, one at a time
+    preview_parallel  the same sample on a process pool with all cores
+    preflight         pdf_print_core.preflight() on the sample
+    merge             pdf_print_core.merge_files() on the sample, as print_pdf does
+    load_pdf_list     PDFPrinterApp.load_pdf_list() with every corpus file listed
+    sort_files        PDFPrinterApp.sort_files(), alternating direction
+    filter_files      PDFPrinterApp.filter_files() with a fixed set of queries
+    load_collection   PDFPrinterApp.load_collection() of the whole corpus
+
+The GUI stages run on an offscreen Qt platform against a scratch data folder,
+with preview rendering switched off so only GUI-thread work is measured.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1000 10000] [--json results.json]
+    python benchmarks/bench_suite.py --sizes 1000 --compare baseline.json
+
+Results list throughput, p50/p95 latency per operation and peak RSS. With
+--compare the run is checked against an earlier --json file and the exit
+code is 1 if any stage got slower than --tolerance allows. Peak RSS is read
+with the resource module, so this runs on macOS/Linux only.
+"""
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_corpus
+
+FILE_STAGES = ['preview', 'preview_parallel', 'preflight', 'merge']
+GUI_STAGES = ['load_pdf_list', 'sort_files', 'filter_files', 'load_collection']
+STAGES = FILE_STAGES + GUI_STAGES
+
+FILTER_QUERIES = ['doc_00', 'doc_0001', '7', 'batch', 'zzz', '']
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile; None for an empty list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def peak_rss_mb():
+    """Peak RSS of this process or its largest worker process"""
+    import resource
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    if sys.platform != 'darwin':
+        peak *= 1024  # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024), 1)
+
+
+def sample_files(files, sample):
+    """Every k-th file, so the sample keeps the corpus's mix of sizes"""
+    if sample >= len(files):
+        return list(files)
+    step = len(files) / sample
+    return [files[int(i * step)] for i in range(sample)]
+
+
+# Stages: each returns (items, item unit, seconds, per-operation latencies in seconds)
+
+def stage_preview(files, scratch, options):
+    from pdf_print_core import render_preview
+    latencies = []
+    start = time.perf_counter()
+    for i, file_path in enumerate(sample_files(files, options['sample'])):
+        t = time.perf_counter()
+        render_preview(file_path, os.path.join(scratch, f"preview_{i}.png"))
+        latencies.append(time.perf_counter() - t)
+    return len(latencies), 'files', time.perf_counter() - start, latencies
+
+
+def warm_worker(_):
+    import fitz  # loaded before the clock starts
+    return os.getpid()
+
+
+def stage_preview_parallel(files, scratch, options):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from pdf_print_core import render_preview
+    sample = sample_files(files, options['sample'])
+    executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    try:
+        # Start the workers first so process startup isn't counted
+        list(executor.map(warm_worker, range(os.cpu_count() or 1)))
+        start = time.perf_counter()
+        futures = [executor.submit(render_preview, file_path, os.path.join(scratch, f"preview_{i}.png"))
+                   for i, file_path in enumerate(sample)]
+        for future in futures:
+            future.result()
+        seconds = time.perf_counter() - start
+    finally:
+        executor.shutdown()
+    return len(sample), 'files', seconds, []
+
+
+def stage_preflight(files, scratch, options):
+    from pdf_print_core import preflight
+    sample = sample_files(files, options['sample'])
+    start = time.perf_counter()
+    preflight(sample)
+    return len(sample), 'files', time.perf_counter() - start, []
+
+
+def stage_merge(files, scratch, options):
+    from pdf_print_core import merge_files
+    sample = sample_files(files, options['sample'])
+    marks = []
+    start = time.perf_counter()
+    result = merge_files(sample, os.path.join(scratch, 'merged.pdf'),
+                         progress_callback=lambda done, total, path: marks.append(time.perf_counter()))
+    seconds = time.perf_counter() - start
+    marks.append(start + seconds)
+    latencies = [b - a for a, b in zip(marks, marks[1:])]
+    return result.page_count, 'pages', seconds, latencies
+
+
+def run_gui_stage(stage, files, scratch, options):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from pdf_print_core import save_file_list, write_collection, CollectionEntry, LIST_FILE_NAME
+    import pdf_printer_app
+
+    app = QApplication.instance() or QApplication([])
+    save_file_list(os.path.join(scratch, LIST_FILE_NAME), files)
+    window = pdf_printer_app.PDFPrinterApp(data_dir=scratch)
+    window.preview_pool.submit = lambda *args: None  # measure GUI-thread work only
+    app.processEvents()
+    repeat = options['repeat']
+    latencies = []
+
+    def timed(action):
+        t = time.perf_counter()
+        action()
+        app.processEvents()
+        latencies.append(time.perf_counter() - t)
+
+    if stage == 'load_pdf_list':
+        for _ in range(repeat):
+            window.all_files_model.reset([])
+            timed(window.load_pdf_list)
+        items = len(files) * repeat
+    elif stage == 'sort_files':
+        for i in range(repeat):
+            timed(lambda: window.sort_files(ascending=i % 2 == 1))
+        items = len(files) * repeat
+    elif stage == 'filter_files':
+        for i in range(repeat):
+            query = FILTER_QUERIES[i % len(FILTER_QUERIES)]
+            timed(lambda: window.filter_files(query))
+        items = len(files) * repeat
+    else:
+        collection_path = write_collection(os.path.join(scratch, 'bench'),
+                                           [CollectionEntry(f, os.path.basename(f)) for f in files])
+        # Answer the Replace/Append question without showing it
+        QMessageBox.exec_ = lambda box: [b for b in box.buttons()
+                                         if b.text() == "Replace Current"][0].click()
+        for _ in range(repeat):
+            timed(lambda: window.load_collection(collection_path))
+        items = len(files) * repeat
+    seconds = sum(latencies)
+    window.preview_pool.shutdown()
+    return items, 'files', seconds, latencies
+
+
+def child(stage, folder, count, options):
+    """Run one stage and print its result as JSON"""
+    files = make_corpus(folder, count, options['max_pages'], options['seed'])
+    scratch = tempfile.mkdtemp(prefix=f'pdf_bench_{stage}_')
+    try:
+        if stage in GUI_STAGES:
+            items, unit, seconds, latencies = run_gui_stage(stage, files, scratch, options)
+        else:
+            items, unit, seconds, latencies = globals()[f'stage_{stage}'](files, scratch, options)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    p50, p95 = percentile(latencies, 0.50), percentile(latencies, 0.95)
+    print(json.dumps({
+        'stage': stage,
+        'corpus_files': count,
+        'ops': len(latencies) or 1,
+        'seconds': round(seconds, 4),
+        'throughput': round(items / seconds, 1) if seconds else None,
+        'throughput_unit': f'{unit}/s',
+        'p50_ms': round(p50 * 1000, 3) if p50 is not None else None,
+        'p95_ms': round(p95 * 1000, 3) if p95 is not None else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def environment():
+    import fitz
+    try:
+        from updater import CURRENT_VERSION
+    except ImportError:
+        CURRENT_VERSION = None
+    return {
+        'app_version': CURRENT_VERSION,
+        'python': platform.python_version(),
+        'pymupdf': fitz.VersionBind,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def compare(results, baseline_path, tolerance):
+    """Print stages that got slower than the baseline; returns their count"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['stage'], r['corpus_files']): r for r in json.load(f)['results']}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for result in results:
+        old = baseline.get((result['stage'], result['corpus_files']))
+        if old is None or not old['throughput'] or not result['throughput']:
+            continue
+        change = old['throughput'] / result['throughput'] - 1  # > 0 means slower
+        slower = change > tolerance
+        regressions += slower
+        print(f"  {result['stage']:<17} {result['corpus_files']:>6} files  "
+              f"{change:+7.1%} time  {'REGRESSION' if slower else 'ok'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help="corpus sizes in files")
+    parser.add_argument('--max-pages', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--sample', type=int, default=200,
+                        help="files used by the preview, pre-flight and merge stages")
+    parser.add_argument('--repeat', type=int, default=10, help="runs of each GUI operation")
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'pdf_bench_corpus'),
+                        help="where corpora are generated and kept for later runs")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--compare', help="earlier --json file to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown before --compare reports a regression")
+    parser.add_argument('--child', nargs=4, metavar=('STAGE', 'FOLDER', 'COUNT', 'OPTIONS'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        stage, folder, count, options = args.child
+        child(stage, folder, int(count), json.loads(options))
+        return 0
+
+    options = {'max_pages': args.max_pages, 'seed': args.seed,
+               'sample': args.sample, 'repeat': args.repeat}
+    results = []
+    print(f"{'stage':<17} {'files':>6} {'ops':>5} {'throughput':>18} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'peak RSS MB':>12}")
+    for count in args.sizes:
+        folder = os.path.join(args.corpus_dir, f"corpus_{count}_{args.max_pages}_{args.seed}")
+        start = time.perf_counter()
+        make_corpus(folder, count, args.max_pages, args.seed,
+                    progress=lambda done, total: print(f"  generating corpus: {done}/{total}"))
+        if time.perf_counter() - start > 1:
+            print(f"  corpus of {count} files ready in {time.perf_counter() - start:.0f}s")
+        for stage in args.stages:
+            out = subprocess.run([sys.executable, __file__, '--child', stage, folder, str(count),
+                                  json.dumps(options)],
+                                 capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{stage:<17} {count:>6}  failed:\n{out.stderr}")
+                continue
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(result)
+            p50 = '-' if result['p50_ms'] is None else result['p50_ms']
+            p95 = '-' if result['p95_ms'] is None else result['p95_ms']
+            throughput = f"{result['throughput']} {result['throughput_unit']}"
+            print(f"{stage:<17} {count:>6} {result['ops']:>5} {throughput:>18} "
+                  f"{p50:>9} {p95:>9} {result['peak_rss_mb']:>12}")
+
+    report = {'environment': environment(), 'options': options, 'results': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.compare and compare(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Synthetic PDF corpora for the benchmarks.
+
+A corpus is a folder of generated PDFs plus a manifest.json describing how it
+was made. Generation is seeded, so the same arguments always give the same
+files, and an existing corpus with a matching manifest is reused as-is.
+
+Page counts are skewed like a real label/invoice library: most documents are
+short, a few are long (up to max_pages). Page sizes mix A4, Letter and 4x6
+labels, and some pages carry an incompressible image so file sizes vary too.
+"""
+import os
+import json
+import random
+
+MANIFEST_NAME = 'manifest.json'
+CORPUS_VERSION = 2  # 2: image data drawn from the seed too
+
+# Width and height in points
+PAGE_SIZES = [(595, 842), (612, 792), (288, 432)]
+
+
+def page_count_for(rng, max_pages):
+    """70% of documents have 1-4 pages, 25% 5-50, 5% 51-max_pages"""
+    roll = rng.random()
+    if roll < 0.70 or max_pages <= 4:
+        return rng.randint(1, min(4, max_pages))
+    if roll < 0.95 or max_pages <= 50:
+        return rng.randint(5, min(50, max_pages))
+    return rng.randint(51, max_pages)
+
+
+def make_document(file_path, pages, page_size, image_bytes, rng):
+    import fitz
+    doc = fitz.open()
+    width, height = page_size
+    for p in range(pages):
+        page = doc.new_page(width=width, height=height)
+        page.insert_text((36, 48), f"{os.path.basename(file_path)} page {p + 1} of {pages}")
+        if image_bytes and p == 0:
+            side = int((image_bytes / 3) ** 0.5)
+            pix = fitz.Pixmap(fitz.csRGB, side, side, rng.randbytes(side * side * 3), False)
+            page.insert_image(fitz.Rect(36, 72, width - 36, height - 36), pixmap=pix)
+    # No fresh /ID, so the same seed gives byte-identical files
+    doc.save(file_path, garbage=1, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def make_corpus(folder, count, max_pages=500, seed=1, progress=None):
+    """Create (or reuse) a corpus and return its file paths in name order"""
+    settings = {'version': CORPUS_VERSION, 'count': count, 'max_pages': max_pages, 'seed': seed}
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('settings') == settings:
+            return [os.path.join(folder, name) for name in manifest['files']]
+    except (OSError, ValueError):
+        pass
+
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    names = []
+    total_pages = 0
+    for i in range(count):
+        # Spread files over sub-folders, as a real library would be
+        name = os.path.join(f"batch_{i // 1000:03d}", f"doc_{i:06d}.pdf")
+        file_path = os.path.join(folder, name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        pages = page_count_for(rng, max_pages)
+        image_bytes = rng.choice([0, 0, 20000, 200000])
+        make_document(file_path, pages, rng.choice(PAGE_SIZES), image_bytes, rng)
+        names.append(name)
+        total_pages += pages
+        if progress and (i + 1) % 500 == 0:
+            progress(i + 1, count)
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'files': names, 'total_pages': total_pages}, f)
+    return [os.path.join(folder, name) for name in names]
@@ -0,0 +1,52 @@
+"""GUI-free core of PDF Print Station.
+
+Preview rendering, the thumbnail cache, the document index, print-job
+merging (up front, speculatively in the background or in memory), kept
+merged jobs, the print spool, page rasterization for printing, the saved
+file list, collection files, file-list search, duplicate detection,
+folder discovery and timing metrics. Nothing here imports Qt, and PyMuPDF is only imported
+when a document is opened, so the core can be used from worker threads
+and processes, the command line and benchmarks. The Qt window in
+pdf_printer_app.py calls into it.
+"""
+from .metrics import Metrics, metrics
+from .mupdf import fitz_lock
+from .metadata import DocumentInfo, MetadataIndex, empty_info, document_info, inspect_pdf
+from .preview import PREVIEW_ZOOM, render_preview
+from .cache import PreviewCache
+from .merge import (DEFAULT_CHUNK_SIZE, PreflightReport, preflight, append_document,
+                    StreamingMergeJob, IncrementalMergeJob, MergeResult, merge_files)
+from .speculative import SpeculativeMerger
+from .raster import (DEFAULT_RASTER_DPI, COLOR_MODES, DEFAULT_LOOKAHEAD, RasterPage, render_page,
+                     open_document, rasterize_pages, PrinterBackend, print_raster)
+from .job_cache import (DEFAULT_JOB_CACHE_BYTES, file_identity, identities_key, job_key,
+                        MergedJobCache)
+from .spool import (JOB_BUILDING, JOB_READY, JOB_PRINTING, JOB_HANDED_OFF, JOB_DONE, JOB_CANCELLED,
+                    JOB_FAILED, fast_temp_dir, SpoolJob, SpoolManager)
+from .library import LIST_FILE_NAME, load_file_list, save_file_list, FileListStore
+from .collection_io import (COLLECTION_EXTENSION, CollectionEntry, read_collection,
+                            write_collection, list_collections, resolve_collection)
+from .search import QUERY_HELP, parse_query, SearchIndex
+from .identity import canonical_path, content_hash, content_duplicates
+from .discovery import DEFAULT_INCLUDE, parse_patterns, split_dropped_paths, discover_pdfs
+
+__all__ = [
+    'Metrics', 'metrics', 'fitz_lock',
+    'DocumentInfo', 'MetadataIndex', 'empty_info', 'document_info', 'inspect_pdf',
+    'PREVIEW_ZOOM', 'render_preview',
+    'PreviewCache',
+    'DEFAULT_CHUNK_SIZE', 'PreflightReport', 'preflight', 'append_document',
+    'StreamingMergeJob', 'IncrementalMergeJob', 'MergeResult', 'merge_files',
+    'SpeculativeMerger',
+    'DEFAULT_RASTER_DPI', 'COLOR_MODES', 'DEFAULT_LOOKAHEAD', 'RasterPage', 'render_page',
+    'open_document', 'rasterize_pages', 'PrinterBackend', 'print_raster',
+    'DEFAULT_JOB_CACHE_BYTES', 'file_identity', 'identities_key', 'job_key', 'MergedJobCache',
+    'JOB_BUILDING', 'JOB_READY', 'JOB_PRINTING', 'JOB_HANDED_OFF', 'JOB_DONE', 'JOB_CANCELLED',
+    'JOB_FAILED', 'fast_temp_dir', 'SpoolJob', 'SpoolManager',
+    'LIST_FILE_NAME', 'load_file_list', 'save_file_list', 'FileListStore',
+    'COLLECTION_EXTENSION', 'CollectionEntry', 'read_collection', 'write_collection',
+    'list_collections', 'resolve_collection',
+    'QUERY_HELP', 'parse_query', 'SearchIndex',
+    'canonical_path', 'content_hash', 'content_duplicates',
+    'DEFAULT_INCLUDE', 'parse_patterns', 'split_dropped_paths', 'discover_pdfs',
+]
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from .metrics import metrics
+
+# Bytes read from each end of a file for the optional content hash
+CONTENT_HASH_CHUNK = 64 * 1024
+
+# Default cache budgets
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 20000
+
+
+class PreviewCache:
+    """On-disk thumbnail cache keyed by file identity.
+
+    By default a key is derived from the absolute path, size and mtime, so two
+    files with the same name in different folders get separate thumbnails and
+    an edited file gets a new one. With use_content_hash the key is derived
+    from the file contents instead, so identical files share a thumbnail.
+
+    A small JSON index maps keys to thumbnail files so lookups never need a
+    directory scan. The index is only written by save_index().
+
+    The cache is bounded by max_bytes and max_entries. When either budget is
+    exceeded the least recently used thumbnails are evicted, optionally on a
+    background thread. All index access is guarded by a lock so eviction can
+    run while the GUI thread keeps looking up thumbnails.
+    """
+
+    INDEX_NAME = "index.json"
+    INDEX_VERSION = 2
+
+    def __init__(self, cache_dir: str, use_content_hash: bool = False,
+                 max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.use_content_hash = use_content_hash
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.index_path = os.path.join(cache_dir, self.INDEX_NAME)
+        self.entries: Dict[str, Dict[str, Any]] = {}  # key -> {'file', 'path', 'size', 'mtime', 'bytes', 'atime'}
+        self.keys_by_path: Dict[str, str] = {}  # absolute path -> key of its newest thumbnail
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dirty = False
+        self.lock = threading.RLock()
+        self.eviction_thread: Optional[threading.Thread] = None
+        os.makedirs(cache_dir, exist_ok=True)
+        self.load_index()
+
+    def load_index(self) -> None:
+        entries = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.INDEX_VERSION:
+                entries = data.get('entries', {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            print(f"Error reading preview cache index, starting fresh: {e}")
+        with self.lock:
+            self.entries = entries
+            self.keys_by_path = {entry['path']: key for key, entry in entries.items()}
+            self.total_bytes = sum(entry.get('bytes', 0) for entry in entries.values())
+
+    def save_index(self) -> None:
+        """Write the index if it changed since the last save"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {'version': self.INDEX_VERSION, 'entries': dict(self.entries)}
+            self.dirty = False
+        try:
+            with metrics.timer('io.save_cache_index', entries=len(data['entries'])):
+                temp_path = f"{self.index_path}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_path, self.index_path)
+        except Exception as e:
+            self.dirty = True
+            print(f"Error saving preview cache index: {e}")
+
+    @property
+    def key_scheme(self) -> str:
+        """How make_key() derives keys; keys made under another scheme don't match"""
+        return 'content' if self.use_content_hash else 'path'
+
+    def make_key(self, file_path: str) -> Optional[str]:
+        """Return the cache key for a file, or None if it can't be read"""
+        with metrics.timer('cache.make_key', trace=False):
+            try:
+                abs_path = os.path.abspath(file_path)
+                stat = os.stat(abs_path)
+                hasher = hashlib.sha1()
+                if self.use_content_hash:
+                    hasher.update(str(stat.st_size).encode())
+                    with open(abs_path, 'rb') as f:
+                        hasher.update(f.read(CONTENT_HASH_CHUNK))
+                        if stat.st_size > 2 * CONTENT_HASH_CHUNK:
+                            f.seek(-CONTENT_HASH_CHUNK, os.SEEK_END)
+                            hasher.update(f.read(CONTENT_HASH_CHUNK))
+                else:
+                    hasher.update(f"{abs_path}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+                return hasher.hexdigest()
+            except OSError as e:
+                print(f"Error reading {file_path} for preview cache: {e}")
+                return None
+
+    def path_for_key(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"preview_{key}.png")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the thumbnail path for a key if it is cached, else None.
+
+        Counts a hit or miss and marks the entry as recently used. An
+        entry whose PNG is gone (deleted outside the app, or evicted while
+        this lookup raced the eviction) is dropped and counts as a miss.
+        """
+        with metrics.timer('cache.lookup', trace=False):
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and not os.path.exists(self.path_for_key(key)):
+                    self.remove(key)
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    metrics.count('cache.miss')
+                    return None
+                self.hits += 1
+                metrics.count('cache.hit')
+                entry['atime'] = time.time()
+                self.dirty = True
+                return self.path_for_key(key)
+
+    def add(self, key: str, file_path: str) -> None:
+        """Record a freshly rendered thumbnail and drop the file's stale one"""
+        abs_path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(abs_path)
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            size, mtime = 0, 0
+        try:
+            thumb_bytes = os.path.getsize(self.path_for_key(key))
+        except OSError:
+            thumb_bytes = 0
+        with self.lock:
+            old_key = self.keys_by_path.get(abs_path)
+            if old_key and old_key != key:
+                self.remove(old_key)
+            old_entry = self.entries.get(key)
+            if old_entry:
+                self.total_bytes -= old_entry.get('bytes', 0)
+            self.entries[key] = {
+                'file': os.path.basename(self.path_for_key(key)),
+                'path': abs_path,
+                'size': size,
+                'mtime': mtime,
+                'bytes': thumb_bytes,
+                'atime': time.time(),
+            }
+            self.keys_by_path[abs_path] = key
+            self.total_bytes += thumb_bytes
+            self.dirty = True
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            if self.keys_by_path.get(entry['path']) == key:
+                del self.keys_by_path[entry['path']]
+            self.total_bytes -= entry.get('bytes', 0)
+            self.dirty = True
+        try:
+            os.remove(self.path_for_key(key))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error removing cached preview {key}: {e}")
+
+    def over_budget(self) -> bool:
+        with self.lock:
+            return (self.total_bytes > self.max_bytes
+                    or len(self.entries) > self.max_entries)
+
+    def evict(self) -> int:
+        """Evict least recently used thumbnails until both budgets are met"""
+        with self.lock:
+            if not self.over_budget():
+                return 0
+            by_age = sorted(self.entries.items(), key=lambda item: item[1].get('atime', 0))
+            victims = []
+            total_bytes = self.total_bytes
+            count = len(self.entries)
+            for key, entry in by_age:
+                if total_bytes <= self.max_bytes and count <= self.max_entries:
+                    break
+                victims.append(key)
+                total_bytes -= entry.get('bytes', 0)
+                count -= 1
+        # File deletion happens outside the lock so lookups aren't blocked
+        with metrics.timer('cache.evict', previews=len(victims)):
+            for key in victims:
+                self.remove(key)
+        with self.lock:
+            self.evictions += len(victims)
+        self.save_index()
+        return len(victims)
+
+    def evict_in_background(self) -> None:
+        """Start an eviction pass on a daemon thread if one isn't running"""
+        if not self.over_budget():
+            return
+        if self.eviction_thread is not None and self.eviction_thread.is_alive():
+            return
+        self.eviction_thread = threading.Thread(target=self.evict, daemon=True)
+        self.eviction_thread.start()
+
+    def evict_older_than(self, max_age_seconds: float) -> int:
+        """Evict thumbnails that haven't been used for max_age_seconds"""
+        cutoff = time.time() - max_age_seconds
+        with self.lock:
+            victims = [key for key, entry in self.entries.items()
+                       if entry.get('atime', 0) < cutoff]
+        for key in victims:
+            self.remove(key)
+        with self.lock:
+            self.evictions += len(victims)
+        self.save_index()
+        return len(victims)
+
+    def remove_orphans(self) -> None:
+        """Delete files in the cache folder that the index doesn't know about"""
+        with self.lock:
+            known = {entry['file'] for entry in self.entries.values()}
+        known.add(self.INDEX_NAME)
+        cutoff = time.time() - 60
+        for file in os.listdir(self.cache_dir):
+            if file in known:
+                continue
+            file_path = os.path.join(self.cache_dir, file)
+            try:
+                # Leave temp files alone while a render may still be writing them
+                if file.endswith('.tmp') and os.path.getmtime(file_path) > cutoff:
+                    continue
+                os.remove(file_path)
+            except Exception as e:
+                print(f"Error removing temp file: {e}")
+
+    def clear(self) -> None:
+        """Remove all cached thumbnails and reset the index"""
+        with self.lock:
+            for file in os.listdir(self.cache_dir):
+                try:
+                    os.remove(os.path.join(self.cache_dir, file))
+                except Exception as e:
+                    print(f"Error removing temp file {file}: {e}")
+            self.entries = {}
+            self.keys_by_path = {}
+            self.total_bytes = 0
+            self.dirty = False
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+from typing import List, NamedTuple, Sequence
+
+from .metrics import metrics
+
+COLLECTION_EXTENSION = '.pdfcol'
+COLLECTION_VERSION = '1.0'
+
+
+class CollectionEntry(NamedTuple):
+    path: str
+    name: str  # label shown in the file list
+
+
+def read_collection(file_path: str) -> List[CollectionEntry]:
+    """Return the entries of a .pdfcol file, in order"""
+    with metrics.timer('io.read_collection'), open(file_path, 'r', encoding='utf-8') as f:
+        collection_data = json.load(f)
+    # Verify version compatibility
+    if 'version' not in collection_data:
+        raise ValueError("Invalid collection file format")
+    return [CollectionEntry(file_data['path'], file_data.get('name') or os.path.basename(file_data['path']))
+            for file_data in collection_data['files']]
+
+
+def write_collection(file_path: str, entries: Sequence[CollectionEntry]) -> str:
+    """Save entries as a collection; adds the .pdfcol extension if missing"""
+    if not file_path.endswith(COLLECTION_EXTENSION):
+        file_path += COLLECTION_EXTENSION
+    collection_data = {
+        'files': [{'path': entry.path, 'name': entry.name} for entry in entries],
+        'date_saved': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'version': COLLECTION_VERSION
+    }
+    with metrics.timer('io.write_collection', files=len(entries)), open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(collection_data, f, ensure_ascii=False, indent=2)
+    return file_path
+
+
+def list_collections(collections_dir: str) -> List[str]:
+    """Collection file names in a folder, sorted case-insensitively"""
+    if not os.path.exists(collections_dir):
+        return []
+    collection_files = [f for f in os.listdir(collections_dir) if f.endswith(COLLECTION_EXTENSION)]
+    collection_files.sort(key=lambda x: x.lower())
+    return collection_files
+
+
+def resolve_collection(name: str, collections_dir: str) -> str:
+    """Accept a .pdfcol path, or the name of a collection in collections_dir"""
+    candidates = [name, name + COLLECTION_EXTENSION,
+                  os.path.join(collections_dir, name),
+                  os.path.join(collections_dir, name + COLLECTION_EXTENSION)]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    raise FileNotFoundError(f"Collection not found: {name}")
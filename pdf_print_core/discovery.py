@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from fnmatch import fnmatchcase
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from .metrics import metrics
+
+DEFAULT_INCLUDE = ('*.pdf',)
+
+# Found files are handed over in batches of this size, or sooner when a
+# folder walk is slow, so the first files show up quickly
+DISCOVERY_BATCH_SIZE = 500
+DISCOVERY_BATCH_SECONDS = 0.25
+
+
+def parse_patterns(text: str) -> List[str]:
+    """Split a user-entered pattern list on commas, semicolons and line breaks"""
+    return [pattern.strip() for pattern in re.split(r'[,;\n]', text or '') if pattern.strip()]
+
+
+def split_dropped_paths(paths: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """Sort dropped paths into (PDF files, folders to search); a folder named like a PDF is a folder"""
+    folders = [path for path in paths if os.path.isdir(path)]
+    files = [path for path in paths if path.lower().endswith('.pdf') and os.path.isfile(path)]
+    return files, folders
+
+
+def _matches(name: str, relative_path: str, patterns: Sequence[str]) -> bool:
+    # Patterns with a slash match the path below the import folder, others the name.
+    # Matching ignores case, like the .pdf check elsewhere in the app.
+    for pattern in patterns:
+        if fnmatchcase(relative_path if '/' in pattern else name, pattern):
+            return True
+    return False
+
+
+def discover_pdfs(roots: Sequence[str], include: Sequence[str] = DEFAULT_INCLUDE,
+                  exclude: Sequence[str] = (),
+                  is_cancelled: Optional[Callable[[], bool]] = None,
+                  progress_callback: Optional[Callable[[int, int], None]] = None,
+                  batch_size: int = DISCOVERY_BATCH_SIZE) -> Iterator[List[str]]:
+    """Walk folder trees with os.scandir and yield batches of matching file paths.
+
+    Files are included when their name (or, for patterns containing "/",
+    their path below the root) matches an include pattern. Files and
+    folders matching an exclude pattern are skipped; an excluded folder is
+    not entered. Folders are visited depth-first with entries in name
+    order, and symlinked folders are not followed. Unreadable folders are
+    skipped. progress_callback(folders, files) is called once per folder.
+    """
+    include = [pattern.lower() for pattern in include] or list(DEFAULT_INCLUDE)
+    exclude = [pattern.lower() for pattern in exclude]
+    folders = found = 0
+    batch: List[str] = []
+    last_batch = time.perf_counter()
+    for root in roots:
+        root = os.path.abspath(root)
+        stack = [(root, '')]  # (folder, its path below root with / separators)
+        while stack:
+            if is_cancelled and is_cancelled():
+                return
+            folder, relative_folder = stack.pop()
+            try:
+                with metrics.timer('import.scandir', trace=False), os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda entry: entry.name.lower())
+            except OSError as e:
+                print(f"Skipping folder {folder}: {e}")
+                continue
+            folders += 1
+            subfolders = []
+            for entry in entries:
+                name = entry.name.lower()
+                relative_path = f"{relative_folder}/{name}" if relative_folder else name
+                if exclude and _matches(name, relative_path, exclude):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subfolders.append((entry.path, relative_path))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if _matches(name, relative_path, include):
+                    batch.append(entry.path)
+                    found += 1
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                        last_batch = time.perf_counter()
+            # Reversed, so the stack pops subfolders in name order
+            stack.extend(reversed(subfolders))
+            if progress_callback:
+                progress_callback(folders, found)
+            now = time.perf_counter()
+            if batch and now - last_batch >= DISCOVERY_BATCH_SECONDS:
+                yield batch
+                batch = []
+                last_batch = now
+    if batch:
+        yield batch
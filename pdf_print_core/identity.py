@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import hashlib
+from typing import Dict, List, Optional, Sequence, Set
+
+from .metrics import metrics
+
+# Read size for full-content hashes
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def canonical_path(file_path: str) -> str:
+    """Key under which two spellings of the same path compare equal.
+
+    Absolute, normalized and case-folded where the file system is
+    case-insensitive. No file system access, so it is cheap enough to
+    compute for every row of a large list.
+    """
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def content_hash(file_path: str) -> str:
+    """SHA-1 of the whole file; raises OSError if it can't be read"""
+    with metrics.timer('dedupe.hash', trace=False):
+        hasher = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+
+def content_duplicates(existing: Sequence[str], candidates: Sequence[str],
+                       size_cache: Optional[Dict[str, Optional[int]]] = None) -> Set[str]:
+    """Candidates whose contents match an existing file or an earlier candidate.
+
+    Files are grouped by size first and only hashed when their size
+    collides with another file, so files with a unique size cost one stat.
+    Files that can't be read are never reported as duplicates. Callers
+    checking several batches against the same list can pass a dict as
+    size_cache to stat each listed file only once.
+    """
+    with metrics.timer('dedupe.content', files=len(candidates)):
+        def size_of(file_path: str) -> Optional[int]:
+            if size_cache is not None and file_path in size_cache:
+                return size_cache[file_path]
+            try:
+                size = os.stat(file_path).st_size
+            except OSError:
+                size = None
+            if size_cache is not None:
+                size_cache[file_path] = size
+            return size
+
+        candidate_sizes = {file_path: size_of(file_path) for file_path in candidates}
+        wanted_sizes = {size for size in candidate_sizes.values() if size is not None}
+        by_size: Dict[int, List[str]] = {}  # size -> known files, in order
+        for file_path in existing:
+            size = size_of(file_path)
+            if size in wanted_sizes:
+                by_size.setdefault(size, []).append(file_path)
+
+        hashes: Dict[str, Optional[str]] = {}
+
+        def hash_of(file_path: str) -> Optional[str]:
+            if file_path not in hashes:
+                try:
+                    hashes[file_path] = content_hash(file_path)
+                except OSError:
+                    hashes[file_path] = None
+            return hashes[file_path]
+
+        duplicates = set()
+        for file_path in candidates:
+            size = candidate_sizes[file_path]
+            if size is None:
+                continue
+            same_size = by_size.setdefault(size, [])
+            digest = hash_of(file_path) if same_size else None
+            if digest is not None and any(hash_of(other) == digest for other in same_size):
+                duplicates.add(file_path)
+            else:
+                same_size.append(file_path)
+        return duplicates
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .metrics import metrics
+
+# Default budgets for kept print jobs
+DEFAULT_JOB_CACHE_BYTES = 500 * 1024 * 1024
+DEFAULT_JOB_CACHE_ENTRIES = 50
+
+
+def file_identity(file_path: str) -> Optional[Tuple[str, int, int]]:
+    """(absolute path, size, mtime_ns) of a file, or None if it can't be read"""
+    abs_path = os.path.abspath(file_path)
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return None
+    return abs_path, stat.st_size, stat.st_mtime_ns
+
+
+def identities_key(identities: Sequence[Tuple[str, int, int]], settings: Dict[str, Any]) -> str:
+    """job_key() of files whose identities were taken earlier, e.g. when they were merged"""
+    hasher = hashlib.sha1(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    for abs_path, size, mtime_ns in identities:
+        hasher.update(f"\n{abs_path}|{size}|{mtime_ns}".encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def job_key(file_paths: Sequence[str], settings: Dict[str, Any]) -> Optional[str]:
+    """Key of a print job, or None if an input file can't be read.
+
+    Derived from each input's absolute path, size and mtime, in order, and
+    from the settings that change the merged output, so editing, adding or
+    reordering a file or changing a setting gives a new key.
+    """
+    with metrics.timer('jobs.key', trace=False, files=len(file_paths)):
+        identities = [file_identity(file_path) for file_path in file_paths]
+        if None in identities:
+            return None
+        return identities_key(identities, settings)
+
+
+class MergedJobCache:
+    """Merged print jobs kept on disk, so an identical batch reprints without merging.
+
+    Jobs are keyed by job_key(). A JSON index records each job's size and
+    last use, plus the file list and settings of the last job printed, so
+    it can be reprinted. The cache is bounded by max_bytes and max_entries;
+    the least recently used jobs are evicted first, but the most recently
+    used job is always kept so it can still be printed.
+    """
+
+    INDEX_NAME = "index.json"
+    INDEX_VERSION = 1
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_JOB_CACHE_BYTES,
+                 max_entries: int = DEFAULT_JOB_CACHE_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.index_path = os.path.join(cache_dir, self.INDEX_NAME)
+        self.entries: Dict[str, Dict[str, Any]] = {}  # key -> {'file', 'bytes', 'pages', 'atime'}
+        self.last: Optional[Dict[str, Any]] = None  # {'files', 'settings'} of the last job printed
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.load_index()
+
+    def load_index(self) -> None:
+        data = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.INDEX_VERSION:
+                data = {}
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            print(f"Error reading print job cache index, starting fresh: {e}")
+        with self.lock:
+            self.entries = data.get('entries', {})
+            self.last = data.get('last')
+            self.total_bytes = sum(entry.get('bytes', 0) for entry in self.entries.values())
+
+    def save_index(self) -> None:
+        with self.lock:
+            data = {'version': self.INDEX_VERSION, 'entries': dict(self.entries), 'last': self.last}
+        try:
+            temp_path = f"{self.index_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving print job cache index: {e}")
+
+    def path_for_key(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"job_{key}.pdf")
+
+    def temp_path_for_key(self, key: str) -> str:
+        """Where to build a job before store(); on the cache's disk so storing is a rename"""
+        return os.path.join(self.cache_dir, f"job_{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    def lookup(self, key: Optional[str]) -> Optional[str]:
+        """Path of the merged job for key if it is cached, else None"""
+        with self.lock:
+            entry = self.entries.get(key) if key else None
+            if entry is not None and not os.path.exists(self.path_for_key(key)):
+                self.remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                metrics.count('jobs.miss')
+                return None
+            self.hits += 1
+            metrics.count('jobs.hit')
+            entry['atime'] = time.time()
+            return self.path_for_key(key)
+
+    def store(self, key: str, merged_path: str, pages: int = 0) -> str:
+        """Move a freshly merged job into the cache and return its new path"""
+        path = self.path_for_key(key)
+        os.replace(merged_path, path)
+        with self.lock:
+            old_entry = self.entries.get(key)
+            if old_entry:
+                self.total_bytes -= old_entry.get('bytes', 0)
+            job_bytes = os.path.getsize(path)
+            self.entries[key] = {'file': os.path.basename(path), 'bytes': job_bytes,
+                                 'pages': pages, 'atime': time.time()}
+            self.total_bytes += job_bytes
+        self.evict()
+        return path
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            self.total_bytes -= entry.get('bytes', 0)
+        try:
+            os.remove(self.path_for_key(key))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error removing cached print job {key}: {e}")
+
+    def evict(self) -> int:
+        """Evict least recently used jobs, except the latest, until both budgets are met"""
+        with self.lock:
+            by_age = sorted(self.entries.items(), key=lambda item: item[1].get('atime', 0))[:-1]
+            victims = []
+            total_bytes = self.total_bytes
+            count = len(self.entries)
+            for key, entry in by_age:
+                if total_bytes <= self.max_bytes and count <= self.max_entries:
+                    break
+                victims.append(key)
+                total_bytes -= entry.get('bytes', 0)
+                count -= 1
+        with metrics.timer('jobs.evict', jobs=len(victims)):
+            for key in victims:
+                self.remove(key)
+        self.save_index()
+        return len(victims)
+
+    def set_last_job(self, file_paths: Sequence[str], settings: Dict[str, Any]) -> None:
+        with self.lock:
+            self.last = {'files': list(file_paths), 'settings': dict(settings)}
+        self.save_index()
+
+    def last_job(self) -> Optional[Dict[str, Any]]:
+        """{'files': [...], 'settings': {...}} of the last job printed, or None"""
+        with self.lock:
+            return self.last
+
+    def remove_orphans(self) -> None:
+        """Delete jobs the index doesn't know about, e.g. left by a merge that crashed"""
+        with self.lock:
+            known = {entry['file'] for entry in self.entries.values()}
+        known.add(self.INDEX_NAME)
+        cutoff = time.time() - 60
+        for file in os.listdir(self.cache_dir):
+            if file in known:
+                continue
+            file_path = os.path.join(self.cache_dir, file)
+            try:
+                # Leave temp files alone while a merge may still be writing them
+                if file.endswith('.tmp') and os.path.getmtime(file_path) > cutoff:
+                    continue
+                os.remove(file_path)
+            except Exception as e:
+                print(f"Error removing print job file: {e}")
+
+    def clear(self) -> None:
+        """Remove all cached jobs; the last job can still be reprinted by merging again"""
+        with self.lock:
+            for key in list(self.entries):
+                self.remove(key)
+        self.save_index()
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.total_bytes,
+                    'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import List, Sequence, Tuple
+
+from .metrics import metrics
+
+# File list kept next to the application between sessions
+LIST_FILE_NAME = 'pdf_list.json'
+
+# Changes since the last full write are appended here, one JSON object per line
+JOURNAL_SUFFIX = '.journal'
+
+# Smaller lists are always rewritten in full; a journal wouldn't save anything
+JOURNAL_MIN_FILES = 1000
+
+# A journal already folded into a full write is renamed to this until the write lands
+REPLAYED_SUFFIX = '.replayed'
+
+
+def load_file_list(list_path: str) -> List[str]:
+    """Return the saved list of PDF paths.
+
+    A missing list is an empty library; unreadable JSON raises ValueError.
+    """
+    try:
+        with metrics.timer('io.load_list'), open(list_path, 'r', encoding='utf-8') as f:
+            pdf_files = json.load(f)
+    except FileNotFoundError:
+        return []
+    if not isinstance(pdf_files, list):
+        raise ValueError("Invalid PDF list format")
+    return pdf_files
+
+
+def write_temp_list(list_path: str, pdf_files: Sequence[str]) -> str:
+    """Write the list to <list>.tmp and flush it to disk; returns the temporary path"""
+    temp_path = list_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(list(pdf_files), f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    return temp_path
+
+
+def save_file_list(list_path: str, pdf_files: Sequence[str]) -> None:
+    """Write the list of PDF paths.
+
+    The list is written to a temporary file and renamed over the old one,
+    so a crash mid-write leaves the previous list intact.
+    """
+    with metrics.timer('io.save_list', files=len(pdf_files)):
+        os.replace(write_temp_list(list_path, pdf_files), list_path)
+
+
+class FileListStore:
+    """The saved file list, with an optional append-only journal.
+
+    With the journal, appended files and removed rows are recorded as one
+    short line each in <list>.journal instead of rewriting the whole list.
+    load() replays the journal on top of the list. Once the journal holds
+    more than half as many paths as the list, the next change compacts it:
+    the full list is written (atomically) and the journal is deleted.
+
+    A full write renames the journal to <list>.journal.replayed before the
+    new list replaces the old one, so a journal is never replayed on top of
+    a list that already holds its changes. If the app stops in between,
+    load() finishes the write from the flushed <list>.tmp.
+
+    Not thread-safe; the app calls it from a single writer thread.
+    """
+
+    def __init__(self, list_path: str, use_journal: bool = True):
+        self.list_path = list_path
+        self.journal_path = list_path + JOURNAL_SUFFIX
+        self.replayed_path = self.journal_path + REPLAYED_SUFFIX
+        self.use_journal = use_journal
+        self.list_size = 0  # paths in the last full write
+        self.journal_size = 0  # paths and rows recorded in the journal since then
+        self.compact_next = False  # set when the journal ends in a torn line
+
+    def load(self) -> List[str]:
+        """The saved list with journaled changes applied; ValueError if the list is unreadable"""
+        self.finish_save()
+        pdf_files = load_file_list(self.list_path)
+        self.list_size = len(pdf_files)
+        self.journal_size = 0
+        try:
+            with metrics.timer('io.replay_journal'), open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        change = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash mid-append; appending after
+                        # it would hide later changes, so rewrite on the next save
+                        self.compact_next = True
+                        break
+                    added = change.get('add', [])
+                    removed = change.get('remove', [])
+                    if removed:
+                        removed_rows = set(removed)
+                        pdf_files = [path for row, path in enumerate(pdf_files) if row not in removed_rows]
+                    pdf_files.extend(added)
+                    self.journal_size += len(added) + len(removed)
+        except FileNotFoundError:
+            pass
+        return pdf_files
+
+    def set_aside(self) -> str:
+        """Rename an unreadable list (and its journal) so saving can't overwrite it; returns the new name"""
+        corrupt_path = self.list_path + '.corrupt'
+        os.replace(self.list_path, corrupt_path)
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, corrupt_path + JOURNAL_SUFFIX)
+        return corrupt_path
+
+    def save(self, pdf_files: Sequence[str]) -> None:
+        """Write the full list and drop the journal"""
+        with metrics.timer('io.save_list', files=len(pdf_files)):
+            temp_path = write_temp_list(self.list_path, pdf_files)
+            # From here the flushed .tmp holds every journaled change
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, self.replayed_path)
+            os.replace(temp_path, self.list_path)
+        self.list_size = len(pdf_files)
+        self.journal_size = 0
+        self.compact_next = False
+        if os.path.exists(self.replayed_path):
+            os.remove(self.replayed_path)
+
+    def finish_save(self) -> None:
+        """Complete a full write that was cut off after its journal was set aside"""
+        if not os.path.exists(self.replayed_path):
+            return
+        temp_path = self.list_path + '.tmp'
+        if os.path.exists(temp_path):
+            # The list was flushed before the journal was renamed, so it is whole
+            os.replace(temp_path, self.list_path)
+        os.remove(self.replayed_path)
+
+    def record(self, pdf_files: Sequence[str],
+               changes: Sequence[Tuple[Sequence[str], Sequence[int]]]) -> None:
+        """Persist a batch of changes to the list.
+
+        pdf_files is the list after all of them. Each change is (added,
+        removed_rows): rows removed from the list as it was before that
+        change, then paths appended at the end. Falls back to a full write
+        when the journal is off, the list is small or the journal is due
+        for compaction.
+        """
+        journal_size = self.journal_size + sum(len(added) + len(removed) for added, removed in changes)
+        if (not self.use_journal or self.compact_next or len(pdf_files) < JOURNAL_MIN_FILES
+                or journal_size > max(len(pdf_files), self.list_size) // 2):
+            self.save(pdf_files)
+            return
+        lines = []
+        for added, removed_rows in changes:
+            change = {}
+            if removed_rows:
+                change['remove'] = list(removed_rows)
+            if added:
+                change['add'] = list(added)
+            lines.append(json.dumps(change, ensure_ascii=False) + '\n')
+        with metrics.timer('io.journal_list', changes=len(changes)):
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        self.journal_size = journal_size
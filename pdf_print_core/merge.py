@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import os
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .metadata import DocumentInfo, MetadataIndex, inspect_pdf
+from .metrics import metrics
+from .job_cache import file_identity
+from .mupdf import fitz_lock
+
+# Documents merged in memory before they are flushed to the output file
+DEFAULT_CHUNK_SIZE = 25
+
+# Below this many files pre-flight runs inline; starting workers would cost more
+PARALLEL_PREFLIGHT_MIN_FILES = 16
+
+
+class PreflightReport:
+    """Summary of a print batch, built before any merging starts"""
+
+    def __init__(self, infos: List[DocumentInfo], add_blank_pages: bool):
+        self.infos = infos  # in the same order as the input files
+        self.add_blank_pages = add_blank_pages
+        self.valid = [info for info in infos if info['ok']]
+        self.broken = [info for info in infos if not info['ok']]
+        self.total_pages = sum(info['page_count'] for info in self.valid)
+        self.padding_pages = (sum(1 for info in self.valid if info['page_count'] % 2 != 0)
+                              if add_blank_pages else 0)
+
+    @property
+    def valid_files(self) -> List[str]:
+        return [info['path'] for info in self.valid]
+
+    @property
+    def estimated_sheets(self) -> int:
+        # Blank-page padding is for double-sided printing, two pages per sheet
+        pages = self.total_pages + self.padding_pages
+        return (pages + 1) // 2 if self.add_blank_pages else pages
+
+    def summary(self) -> str:
+        return (f"{len(self.valid)} files, {self.total_pages} pages"
+                f" + {self.padding_pages} blank, about {self.estimated_sheets} sheets")
+
+
+def preflight(file_paths: Sequence[str], add_blank_pages: bool = True,
+              max_workers: Optional[int] = None,
+              progress_callback: Optional[Callable[[int, int], Optional[bool]]] = None,
+              index: Optional[MetadataIndex] = None) -> Optional[PreflightReport]:
+    """Inspect all files concurrently and return a PreflightReport.
+
+    With a MetadataIndex, files whose entry is still current cost only a
+    stat; the rest are opened and their results stored back in the index.
+    progress_callback(done, total) is called as results arrive; returning
+    False cancels the pre-flight, in which case None is returned.
+    """
+    with metrics.timer('merge.preflight', files=len(file_paths)):
+        total = len(file_paths)
+        infos = [None] * total
+        to_inspect = []
+        for i, file_path in enumerate(file_paths):
+            entry = index.get(file_path) if index is not None else None
+            if entry is not None:
+                infos[i] = entry
+            else:
+                to_inspect.append(i)
+        done = total - len(to_inspect)
+        metrics.count('merge.preflight_index_hits', done)
+        if progress_callback and done and progress_callback(done, total) is False:
+            return None
+
+        def store(i, info):
+            infos[i] = info
+            if index is not None:
+                index.update(info)
+
+        def inspect_inline(indexes):
+            nonlocal done
+            for i in indexes:
+                store(i, inspect_pdf(file_paths[i]))
+                done += 1
+                if progress_callback and progress_callback(done, total) is False:
+                    return False
+            return True
+
+        if len(to_inspect) < PARALLEL_PREFLIGHT_MIN_FILES:
+            if not inspect_inline(to_inspect):
+                return None
+            return PreflightReport(infos, add_blank_pages)
+
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        max_workers = max_workers or os.cpu_count() or 1
+        executor = None
+        try:
+            executor = ProcessPoolExecutor(max_workers=min(max_workers, len(to_inspect)),
+                                           mp_context=multiprocessing.get_context("spawn"))
+            futures = {executor.submit(inspect_pdf, file_paths[i]): i for i in to_inspect}
+            for future in as_completed(futures):
+                # inspect_pdf() reports a bad file in its result, so an exception
+                # here means the pool itself failed (a worker died, or spawn
+                # couldn't start one); handled below
+                store(futures[future], future.result())
+                done += 1
+                if progress_callback and progress_callback(done, total) is False:
+                    return None
+        except Exception as e:
+            print(f"Parallel pre-flight failed, checking the remaining files here: {e}")
+            metrics.count('merge.preflight_pool_failed')
+            if not inspect_inline([i for i in to_inspect if infos[i] is None]):
+                return None
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        return PreflightReport(infos, add_blank_pages)
+
+
+def append_document(doc, file_path: str, add_blank_pages: bool = True) -> int:
+    """Append one PDF to an open fitz document, plus a blank page if needed.
+
+    Returns the pages added; raises on failure, leaving doc as it was.
+    """
+    import fitz
+    with fitz_lock:
+        src = fitz.open(file_path)
+        try:
+            start = doc.page_count
+            try:
+                doc.insert_pdf(src)
+                # Add blank page if enabled and document has odd number of pages
+                if add_blank_pages and src.page_count % 2 != 0:
+                    doc.new_page(-1,  # Insert at end
+                                 width=src[0].rect.width,  # Match first page dimensions
+                                 height=src[0].rect.height)
+            except Exception:
+                # Don't leave a half-inserted document in the job
+                if doc.page_count > start:
+                    doc.delete_pages(start, doc.page_count - 1)
+                raise
+        finally:
+            src.close()
+        return doc.page_count - start
+
+
+class StreamingMergeJob:
+    """Builds a combined print PDF without holding the whole job in memory.
+
+    Documents are inserted into an in-memory chunk. Every chunk_size
+    documents the chunk is written to output_path (the first time with a
+    full save, afterwards with an incremental save), the document is closed
+    and reopened from disk. The reopened document only loads objects on
+    demand, so peak memory is bounded by one chunk rather than the job.
+    With output_path None the job is built in memory and never touches the
+    disk; finish() leaves the document's bytes in data.
+    """
+
+    def __init__(self, output_path: Optional[str], add_blank_pages: bool = True,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.output_path = output_path
+        self.add_blank_pages = add_blank_pages
+        self.chunk_size = max(1, chunk_size)
+        import fitz  # PyMuPDF, imported on first use to keep startup fast
+        with fitz_lock:
+            self.doc = fitz.open()
+        self.on_disk = False  # True once output_path holds the first chunk
+        self.docs_in_chunk = 0
+        self.page_count = 0
+        self.document_count = 0
+        self.data: Optional[bytes] = None
+
+    def add(self, file_path: str) -> None:
+        """Append one PDF (plus a blank page if needed); raises on failure"""
+        with metrics.timer('merge.add'):
+            # Counted here rather than read back, so no PyMuPDF call runs outside the lock
+            self.page_count += append_document(self.doc, file_path, self.add_blank_pages)
+            self.document_count += 1
+            self.docs_in_chunk += 1
+            if self.docs_in_chunk >= self.chunk_size and self.output_path is not None:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the pending chunk to disk and release its memory"""
+        if self.docs_in_chunk == 0 and self.on_disk:
+            return
+        with metrics.timer('merge.flush', documents=self.docs_in_chunk), fitz_lock:
+            if self.on_disk:
+                self.doc.saveIncr()
+            else:
+                self.doc.save(self.output_path)
+                self.on_disk = True
+            self.doc.close()
+            import fitz
+            self.doc = fitz.open(self.output_path)
+            self.docs_in_chunk = 0
+
+    def finish(self) -> Optional[str]:
+        """Flush the last chunk and close the job; returns the output path"""
+        try:
+            if self.page_count and self.output_path is None:
+                with metrics.timer('merge.to_bytes', pages=self.page_count), fitz_lock:
+                    self.data = self.doc.tobytes()
+            elif self.page_count:
+                self.flush()
+        finally:
+            with fitz_lock:
+                self.doc.close()
+        return self.output_path
+
+    def abort(self) -> None:
+        """Close the job and delete any partial output"""
+        with fitz_lock:
+            if not self.doc.is_closed:
+                self.doc.close()
+        if self.on_disk and os.path.exists(self.output_path):
+            try:
+                os.remove(self.output_path)
+            except Exception as e:
+                print(f"Error removing partial print job: {e}")
+
+
+class IncrementalMergeJob:
+    """A merged document kept in memory and in step with an edited file list.
+
+    sync() brings the document in line with a new ordered file list. The
+    longest run of leading files that were already merged, unchanged (same
+    size and mtime) and in the same order, is kept; the pages after it are
+    deleted and the rest of the list is merged again. Appending files
+    therefore only merges the new ones, and removing or moving a file only
+    rebuilds from that file on. Files that fail to merge are skipped and
+    listed in failed. Unlike StreamingMergeJob the whole job stays in
+    memory.
+
+    Not thread-safe; SpeculativeMerger drives one from a single thread.
+    """
+
+    def __init__(self, add_blank_pages: bool = True):
+        import fitz
+        with fitz_lock:
+            self.doc = fitz.open()
+        self.add_blank_pages = add_blank_pages
+        # Per file of the last sync: (identity, first page, error or None if merged)
+        self.entries: List[Tuple[Tuple[str, int, int], int, Optional[str]]] = []
+
+    @staticmethod
+    def identity(file_path: str) -> Tuple[str, int, int]:
+        # Unreadable files get a placeholder identity, which changes once they can be read
+        return file_identity(file_path) or (os.path.abspath(file_path), -1, -1)
+
+    @property
+    def page_count(self) -> int:
+        with fitz_lock:
+            return self.doc.page_count
+
+    @property
+    def merged_identities(self) -> List[Tuple[str, int, int]]:
+        """file_identity() of each file whose pages are in the document, as merged, in order"""
+        return [identity for identity, _, error in self.entries if error is None]
+
+    @property
+    def failed(self) -> List[Tuple[str, str]]:
+        """(file path, error message) of the files that were skipped"""
+        return [(identity[0], error) for identity, _, error in self.entries if error is not None]
+
+    def sync(self, file_paths: Sequence[str], is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Rebuild the document for file_paths; False if cancelled part way.
+
+        A cancelled sync leaves a consistent document for a prefix of
+        file_paths, which the next sync carries on from.
+        """
+        wanted = [self.identity(file_path) for file_path in file_paths]
+        keep = 0
+        while (keep < len(self.entries) and keep < len(wanted)
+               and self.entries[keep][0] == wanted[keep]):
+            keep += 1
+        with metrics.timer('merge.sync', kept=keep, merged=len(wanted) - keep):
+            if keep < len(self.entries):
+                first_page = self.entries[keep][1]
+                with fitz_lock:
+                    if first_page < self.doc.page_count:
+                        self.doc.delete_pages(first_page, self.doc.page_count - 1)
+                del self.entries[keep:]
+            start = self.page_count
+            for identity in wanted[keep:]:
+                if is_cancelled and is_cancelled():
+                    return False
+                try:
+                    added = append_document(self.doc, identity[0], self.add_blank_pages)
+                    self.entries.append((identity, start, None))
+                    start += added
+                except Exception as e:
+                    self.entries.append((identity, start, str(e)))
+                    metrics.count('merge.failed')
+        return True
+
+    def save(self, output_path: str) -> None:
+        with metrics.timer('merge.save_incremental', pages=self.page_count), fitz_lock:
+            # Pages deleted by earlier syncs leave unused objects behind
+            self.doc.save(output_path, garbage=1)
+
+    def to_bytes(self) -> bytes:
+        """The document as a PDF in memory, for printing without a file"""
+        with metrics.timer('merge.to_bytes', pages=self.page_count), fitz_lock:
+            return self.doc.tobytes(garbage=1)
+
+    def close(self) -> None:
+        with fitz_lock:
+            self.doc.close()
+
+
+class MergeResult:
+    """Outcome of merge_files(): the output path (or bytes), its page count and skipped files"""
+
+    def __init__(self, output_path: Optional[str], page_count: int,
+                 failed: List[Tuple[str, str]], data: Optional[bytes] = None):
+        self.output_path = output_path  # None when nothing could be merged or merged in memory
+        self.page_count = page_count
+        self.failed = failed  # (file path, error message)
+        self.data = data  # the merged PDF when merged in memory
+
+
+def merge_files(file_paths: Sequence[str], output_path: Optional[str], add_blank_pages: bool = True,
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                progress_callback: Optional[Callable[[int, int, str], Optional[bool]]] = None
+                ) -> Optional[MergeResult]:
+    """Merge file_paths into output_path with a StreamingMergeJob.
+
+    With output_path None the job is merged in memory and returned in the
+    result's data. Files that fail to merge are skipped and reported in
+    the result.
+    progress_callback(done, total, file_path) is called before each file;
+    returning False cancels the merge, deletes the partial output and
+    returns None.
+    """
+    job = StreamingMergeJob(output_path, add_blank_pages=add_blank_pages, chunk_size=chunk_size)
+    failed = []
+    try:
+        for i, file_path in enumerate(file_paths):
+            if progress_callback and progress_callback(i, len(file_paths), file_path) is False:
+                job.abort()
+                return None
+            try:
+                job.add(file_path)
+            except Exception as e:
+                failed.append((file_path, str(e)))
+                metrics.count('merge.failed')
+        if not job.page_count:
+            job.abort()
+            return MergeResult(None, 0, failed)
+        job.finish()
+    except BaseException:
+        job.abort()
+        raise
+    return MergeResult(output_path, job.page_count, failed, job.data)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from .metrics import metrics
+from .mupdf import fitz_lock
+
+# An inspect_pdf() result; see empty_info() for the keys
+DocumentInfo = Dict[str, Any]
+
+
+def empty_info(file_path: str, error: Optional[str] = None) -> DocumentInfo:
+    return {'path': file_path, 'ok': False, 'error': error, 'size': 0, 'mtime_ns': 0,
+            'page_count': 0, 'width': 0, 'height': 0, 'encrypted': False}
+
+
+def document_info(doc, file_path: str, stat: os.stat_result) -> DocumentInfo:
+    """Describe an open fitz document; stat is taken before the file was opened"""
+    info = empty_info(file_path)
+    info['size'], info['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+    info['encrypted'] = bool(doc.is_encrypted)
+    if doc.needs_pass:
+        info['error'] = "password protected"
+        return info
+    info['page_count'] = doc.page_count
+    if doc.page_count == 0:
+        info['error'] = "document has no pages"
+        return info
+    rect = doc[0].rect
+    info['width'], info['height'] = rect.width, rect.height
+    info['ok'] = True
+    return info
+
+
+def inspect_pdf(file_path: str) -> DocumentInfo:
+    """Open a PDF and report what the merge needs to know about it.
+
+    Runs inside worker processes, so it only returns plain dicts.
+    """
+    import fitz  # PyMuPDF
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return empty_info(file_path, "file not found")
+    except OSError as e:
+        return empty_info(file_path, str(e))
+    doc = None
+    with fitz_lock:
+        try:
+            doc = fitz.open(file_path)
+            return document_info(doc, file_path, stat)
+        except Exception as e:
+            info = empty_info(file_path, str(e))
+            info['size'], info['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+            return info
+        finally:
+            if doc:
+                doc.close()
+
+
+class MetadataIndex:
+    """Persistent per-document facts, so known files need only a stat.
+
+    Entries hold size, mtime, page count, first-page size, encryption flag
+    and the preview cache key. An entry is only returned while the file's
+    size and mtime still match, so edited files are re-inspected.
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.entries: Dict[str, DocumentInfo] = {}  # path -> info dict plus 'thumbnail_key' and its scheme
+        self.dirty = False
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with metrics.timer('io.load_document_index'), open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.INDEX_VERSION:
+                self.entries = data.get('entries', {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            print(f"Error reading document index, starting fresh: {e}")
+            self.entries = {}
+
+    def save(self) -> None:
+        """Write the index if it changed since the last save"""
+        if not self.dirty:
+            return
+        try:
+            with metrics.timer('io.save_document_index', entries=len(self.entries)):
+                temp_path = self.index_path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': self.INDEX_VERSION, 'entries': self.entries},
+                              f, ensure_ascii=False)
+                os.replace(temp_path, self.index_path)
+            self.dirty = False
+        except Exception as e:
+            print(f"Error saving document index: {e}")
+
+    def get(self, file_path: str, stat: Optional[os.stat_result] = None) -> Optional[DocumentInfo]:
+        """Return the entry for file_path if it is still current, else None.
+
+        Costs one stat unless the caller passes one in. A missing file
+        returns None as well.
+        """
+        entry = self.entries.get(file_path)
+        if entry is None:
+            return None
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+        if entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            return None
+        return entry
+
+    def peek(self, file_path: str) -> Optional[DocumentInfo]:
+        """Return the stored entry without checking it against the file"""
+        return self.entries.get(file_path)
+
+    def update(self, info: DocumentInfo, thumbnail_key: Optional[str] = None,
+               key_scheme: Optional[str] = None) -> None:
+        """Store an inspect_pdf() style result, with the preview key and its PreviewCache.key_scheme"""
+        if not info.get('mtime_ns'):
+            return
+        entry = dict(info)
+        old = self.entries.get(info['path'])
+        if thumbnail_key is None and old and old['size'] == info['size'] and old['mtime_ns'] == info['mtime_ns']:
+            thumbnail_key = old.get('thumbnail_key')
+            key_scheme = old.get('thumbnail_scheme')
+        entry['thumbnail_key'] = thumbnail_key
+        entry['thumbnail_scheme'] = key_scheme
+        self.entries[info['path']] = entry
+        self.dirty = True
+
+    def remove(self, file_path: str) -> None:
+        if self.entries.pop(file_path, None) is not None:
+            self.dirty = True
+
+    def retain(self, file_paths: Iterable[str]) -> None:
+        """Drop entries for files that are no longer listed"""
+        keep = set(file_paths)
+        for file_path in [p for p in self.entries if p not in keep]:
+            del self.entries[file_path]
+            self.dirty = True
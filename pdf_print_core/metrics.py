@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Recent samples kept per histogram for percentiles
+HISTOGRAM_SAMPLES = 2048
+
+# Timed spans kept for the Chrome trace export
+TRACE_EVENTS = 20000
+
+
+class Histogram:
+    """Durations of one operation: all-time count/total/max plus recent samples"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=HISTOGRAM_SAMPLES)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self) -> Dict[str, float]:
+        """Milliseconds, rounded for display and export"""
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class Metrics:
+    """Counters, duration histograms and a trace of recent timed spans.
+
+    Safe to use from any thread. Recording costs a lock and a deque append,
+    so hot paths can be instrumented permanently; very frequent operations
+    pass trace=False to keep them out of the span buffer.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        # (name, start seconds since origin, duration seconds, thread id, args)
+        self.events: Deque[Tuple[str, float, float, int, Optional[Dict[str, Any]]]] = deque(maxlen=TRACE_EVENTS)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float, start: Optional[float] = None,
+                trace: bool = True, args: Optional[Dict[str, Any]] = None) -> None:
+        """Record a duration; start is a perf_counter() value, defaulting to now - seconds"""
+        if start is None:
+            start = time.perf_counter() - seconds
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+            if trace:
+                self.events.append((name, start - self.origin, seconds, threading.get_ident(), args))
+
+    @contextmanager
+    def timer(self, name: str, trace: bool = True, **args: Any) -> Iterator[None]:
+        """Time the enclosed block under name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, start, trace, args or None)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+            self.events.clear()
+            self.origin = time.perf_counter()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and histogram summaries as plain data"""
+        with self.lock:
+            return {
+                'counters': dict(sorted(self.counters.items())),
+                'histograms': {name: histogram.summary()
+                               for name, histogram in sorted(self.histograms.items())},
+            }
+
+    def export_json(self, file_path: str) -> None:
+        data = self.snapshot()
+        data['date'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def export_chrome_trace(self, file_path: str) -> None:
+        """Write the recorded spans in the Trace Event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self.lock:
+            # Spans may start before the origin (startup milestones); keep timestamps positive
+            base = min([0.0] + [event[1] for event in self.events])
+            events: List[Dict[str, Any]] = [
+                {'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                 'ts': round((start - base) * 1e6, 1), 'dur': round(duration * 1e6, 1), 'args': args or {}}
+                for name, start, duration, tid, args in self.events
+            ]
+            counters = dict(self.counters)
+        end = round((time.perf_counter() - self.origin - base) * 1e6, 1)
+        events.extend({'name': name, 'ph': 'C', 'pid': pid, 'tid': 0, 'ts': end, 'args': {'value': value}}
+                      for name, value in counters.items())
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+# Process-wide instance used by the core and the app
+metrics = Metrics()
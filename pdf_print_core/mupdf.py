@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import threading
+
+# PyMuPDF is not thread-safe: every thread of a process shares MuPDF's
+# context. The core holds this lock around each PyMuPDF call that may run
+# while another thread uses PyMuPDF too (the background merge, the print
+# render thread and the GUI thread's pre-flight and merge). Each hold is
+# short, one document appended or one page rendered, so nobody waits long.
+# Worker processes have their own copy of MuPDF and never contend for it.
+fitz_lock = threading.RLock()
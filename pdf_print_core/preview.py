@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import os
+from typing import Optional, Tuple
+
+from .metadata import DocumentInfo, document_info, empty_info
+
+# Scale used for first-page thumbnails (kept small for speed and disk usage)
+PREVIEW_ZOOM = 0.2
+
+
+def render_preview(file_path: str, preview_path: str) -> Tuple[str, bool, Optional[str], DocumentInfo]:
+    """Render the first page of a PDF to a PNG thumbnail.
+
+    Runs inside worker processes, so it must stay free of Qt imports and only
+    return picklable values: (file_path, success, error_message, info), where
+    info is the document's MetadataIndex entry gathered from the same open.
+    """
+    import fitz  # PyMuPDF, loaded in the worker on first use
+    doc = None
+    try:
+        stat = os.stat(file_path)
+        doc = fitz.open(file_path)
+        info = document_info(doc, file_path, stat)
+        if not info['ok']:
+            return file_path, False, info['error'], info
+        page = doc[0]
+        matrix = fitz.Matrix(PREVIEW_ZOOM, PREVIEW_ZOOM)
+        # Disable alpha and use RGB colorspace for smaller files
+        pix = page.get_pixmap(matrix=matrix, alpha=False, colorspace="rgb")
+        # Write to a temp name first so readers never see a half-written PNG
+        temp_path = f"{preview_path}.{os.getpid()}.tmp"
+        pix.save(temp_path, output="png")
+        os.replace(temp_path, preview_path)
+        return file_path, True, None, info
+    except Exception as e:
+        return file_path, False, str(e), empty_info(file_path, str(e))
+    finally:
+        if doc:
+            doc.close()
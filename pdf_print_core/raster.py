@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Union
+
+from .metrics import metrics
+from .mupdf import fitz_lock
+
+# Resolution pages are printed at as images (PDF pages are 72 points per inch)
+DEFAULT_RASTER_DPI = 144
+
+# 'mono' is rendered in grayscale; the back-end dithers it to black and white
+COLOR_MODES = ('rgb', 'gray', 'mono')
+
+# Pages rendered ahead of the printer; each one waiting is a full-page raster in memory
+DEFAULT_LOOKAHEAD = 4
+
+
+class RasterPage(NamedTuple):
+    """One rendered page, rows stride bytes apart.
+
+    Samples are 3 bytes per pixel in 'rgb' mode and 1 byte (gray) in
+    'gray' and 'mono' modes.
+    """
+    number: int  # 0-based page number
+    width: float  # page size in points
+    height: float
+    samples: bytes
+    pixel_width: int
+    pixel_height: int
+    stride: int
+    color_mode: str = 'rgb'
+    image: Any = None  # the back-end's converted copy, see PrinterBackend.prepare()
+
+
+def render_page(doc, number: int, dpi: int = DEFAULT_RASTER_DPI, color_mode: str = 'rgb') -> RasterPage:
+    """Rasterize one page of an open fitz document"""
+    if color_mode not in COLOR_MODES:
+        raise ValueError(f"Unknown color mode: {color_mode}")
+    with metrics.timer('print.render_page', trace=False, dpi=dpi, mode=color_mode), fitz_lock:
+        page = doc[number]
+        pix = page.get_pixmap(dpi=dpi, alpha=False, colorspace="rgb" if color_mode == 'rgb' else "gray")
+        return RasterPage(number, page.rect.width, page.rect.height, pix.samples,
+                          pix.width, pix.height, pix.stride, color_mode)
+
+
+def open_document(source: Union[str, bytes]):
+    """Open a PDF from its path or, for jobs kept in memory, from its bytes"""
+    import fitz
+    with fitz_lock:
+        if isinstance(source, (bytes, bytearray)):
+            return fitz.open(stream=source, filetype="pdf")
+        return fitz.open(source)
+
+
+def page_count(source: Union[str, bytes]) -> int:
+    with fitz_lock, open_document(source) as doc:
+        return doc.page_count
+
+
+def rasterize_pages(source: Union[str, bytes], dpi: int = DEFAULT_RASTER_DPI, color_mode: str = 'rgb',
+                    lookahead: int = DEFAULT_LOOKAHEAD,
+                    prepare: Optional[Callable[[RasterPage], RasterPage]] = None
+                    ) -> Iterator[RasterPage]:
+    """Yield every page of a PDF (path or bytes) as a RasterPage, in page order.
+
+    Pages are rendered in order on one background thread, at most
+    lookahead pages ahead of the consumer, so rendering overlaps whatever
+    the consumer does with earlier pages while memory stays bounded. A
+    single render thread is used because PyMuPDF is not thread-safe. With
+    lookahead 0 pages are rendered one at a time on the calling thread.
+    Closing the generator early stops the render thread. prepare, if
+    given, is applied to each page on the render thread.
+    """
+    if lookahead <= 0:
+        doc = open_document(source)
+        try:
+            with fitz_lock:
+                pages = doc.page_count
+            for number in range(pages):
+                page = render_page(doc, number, dpi, color_mode)
+                yield prepare(page) if prepare else page
+        finally:
+            with fitz_lock:
+                doc.close()
+        return
+
+    # One slot per page rendered ahead; the thread blocks when all are full
+    rendered = queue.Queue(maxsize=lookahead)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                rendered.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def render_all():
+        try:
+            doc = open_document(source)
+            try:
+                with fitz_lock:
+                    pages = doc.page_count
+                for number in range(pages):
+                    if stopped.is_set():
+                        return
+                    page = render_page(doc, number, dpi, color_mode)
+                    put(prepare(page) if prepare else page)
+            finally:
+                with fitz_lock:
+                    doc.close()
+            put(None)  # End of document
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=render_all, name='raster', daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                item = rendered.get_nowait()
+            except queue.Empty:
+                with metrics.timer('print.wait_render', trace=False):
+                    item = rendered.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
+class PrinterBackend:
+    """Destination for rasterized pages, called from one thread in page order.
+
+    print_raster() calls start() with the first page, new_page() before
+    each later page, draw() for every page and finally finish(), or abort()
+    if the job is cancelled or fails. prepare() is the exception: it runs
+    on the render thread, ahead of the printer, and can convert the
+    samples into whatever draw() wants. Subclasses talk to a real printer;
+    the app's QPrinter back-end also writes PDF files, for testing.
+    """
+
+    def prepare(self, page: RasterPage) -> RasterPage:
+        return page
+
+    def start(self, page: RasterPage) -> None:
+        pass
+
+    def new_page(self, page: RasterPage) -> None:
+        pass
+
+    def draw(self, page: RasterPage) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        self.finish()
+
+
+def print_raster(source: Union[str, bytes], backend: PrinterBackend, dpi: int = DEFAULT_RASTER_DPI,
+                 color_mode: str = 'rgb', lookahead: int = DEFAULT_LOOKAHEAD,
+                 progress_callback: Optional[Callable[[int, int], Optional[bool]]] = None
+                 ) -> Optional[int]:
+    """Print every page of a PDF (path or bytes) as an image through backend.
+
+    Pages are rendered ahead by rasterize_pages() at dpi in color_mode
+    (one of COLOR_MODES) while the back-end spools earlier ones.
+    progress_callback(done, total) is called before each page; returning
+    False cancels the job, in which case the back-end is aborted and None
+    is returned. Otherwise returns the pages printed.
+    """
+    total = page_count(source)
+    with metrics.timer('print.raster', pages=total, lookahead=lookahead, dpi=dpi, mode=color_mode):
+        pages = rasterize_pages(source, dpi, color_mode, lookahead, backend.prepare)
+        done = 0
+        started = False  # the back-end has a job open that must be finished or aborted
+        try:
+            for page in pages:
+                if progress_callback and progress_callback(done, total) is False:
+                    if started:
+                        backend.abort()
+                    return None
+                with metrics.timer('print.spool_page', trace=False):
+                    if not started:
+                        backend.start(page)
+                        started = True
+                    else:
+                        backend.new_page(page)
+                    backend.draw(page)
+                done += 1
+        except BaseException:
+            if started:
+                backend.abort()
+            raise
+        finally:
+            pages.close()
+        if started:
+            backend.finish()
+        if progress_callback:
+            progress_callback(done, total)
+        return done
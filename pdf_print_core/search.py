@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from .metrics import metrics
+
+# Query syntax, shown as the search bar's tooltip
+QUERY_HELP = ("Words must all match the file name.\n"
+              "A word with / matches the folder path, e.g. labels/2024\n"
+              "~word matches letters in order, e.g. ~inv24 finds invoice_2024")
+
+
+def parse_query(query: str) -> List[Tuple[str, str]]:
+    """Split a query into (mode, text) tokens; mode is 'name', 'path' or 'fuzzy'"""
+    tokens = []
+    for word in query.lower().split():
+        if word.startswith('~') and len(word) > 1:
+            tokens.append(('fuzzy', word[1:]))
+        elif '/' in word or '\\' in word:
+            tokens.append(('path', word.replace('\\', '/')))
+        else:
+            tokens.append(('name', word))
+    return tokens
+
+
+class SearchIndex:
+    """Lower-cased file names and paths kept in step with a list's rows.
+
+    search() returns the matching row numbers in list order. When a query
+    only extends the previous one (the usual case while typing), only the
+    previous matches are scanned again, so each keystroke gets cheaper.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []  # lower-case basename per row
+        self.paths: List[str] = []  # lower-case path with / separators per row
+        self.last_tokens: Optional[List[Tuple[str, str]]] = None
+        self.last_rows: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _keys(file_path: str) -> Tuple[str, str]:
+        lowered = file_path.lower()
+        return os.path.basename(lowered), lowered.replace('\\', '/')
+
+    def rebuild(self, file_paths: Sequence[str]) -> None:
+        keys = [self._keys(file_path) for file_path in file_paths]
+        self.names = [name for name, _ in keys]
+        self.paths = [path for _, path in keys]
+        self.invalidate()
+
+    def extend(self, file_paths: Sequence[str]) -> None:
+        for file_path in file_paths:
+            name, path = self._keys(file_path)
+            self.names.append(name)
+            self.paths.append(path)
+        self.invalidate()
+
+    def delete(self, first: int, last: int) -> None:
+        """Drop rows first..last inclusive"""
+        del self.names[first:last + 1]
+        del self.paths[first:last + 1]
+        self.invalidate()
+
+    def reorder(self, order: Sequence[int]) -> None:
+        """Rearrange rows so that row i becomes previous row order[i]"""
+        self.names = [self.names[row] for row in order]
+        self.paths = [self.paths[row] for row in order]
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self.last_tokens = None
+        self.last_rows = None
+
+    def _narrows(self, tokens: List[Tuple[str, str]]) -> bool:
+        """True if every match of tokens is also a match of the previous query"""
+        if self.last_tokens is None or len(tokens) < len(self.last_tokens):
+            return False
+        for (old_mode, old_text), (mode, text) in zip(self.last_tokens, tokens):
+            if old_mode != mode or old_text not in text:
+                return False
+        return True
+
+    def search(self, query: str) -> Optional[List[int]]:
+        """Matching rows, or None when the query is empty (everything matches)"""
+        tokens = parse_query(query)
+        if not tokens:
+            self.invalidate()
+            return None
+        with metrics.timer('search.query', trace=False):
+            rows = self.last_rows if self._narrows(tokens) else range(len(self.names))
+            for mode, text in tokens:
+                if mode == 'name':
+                    names = self.names
+                    rows = [row for row in rows if text in names[row]]
+                elif mode == 'path':
+                    paths = self.paths
+                    rows = [row for row in rows if text in paths[row]]
+                else:
+                    # a[^b]*b[^c]*c: letters in order, without regex backtracking
+                    pattern = re.escape(text[0]) + ''.join(
+                        f"[^{re.escape(char)}]*{re.escape(char)}" for char in text[1:])
+                    search = re.compile(pattern).search
+                    names = self.names
+                    rows = [row for row in rows if search(names[row])]
+            rows = list(rows)
+            self.last_tokens, self.last_rows = tokens, rows
+            return rows
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .merge import IncrementalMergeJob
+from .job_cache import identities_key, job_key
+
+
+class SpeculativeMerger:
+    """Builds the next print job in the background while the selection is edited.
+
+    request() names the files the next print will most likely contain. A
+    worker thread brings an IncrementalMergeJob in line with the latest
+    request, skipping requests that were superseded before it got to them,
+    and saves the result to a file in output_dir, or keeps it as bytes if
+    output_dir is None. take() hands the result over if it was built from
+    exactly the given files, unchanged since, with the same settings, so
+    printing needs no merge.
+    """
+
+    def __init__(self, output_dir: Optional[str]):
+        self.output_dir = output_dir
+        self.condition = threading.Condition()
+        self.wanted: Optional[Tuple[List[str], bool]] = None  # request not yet picked up
+        self.building: Optional[Tuple[List[str], bool]] = None  # request being built
+        self.ready: Optional[Tuple[str, Union[str, bytes], int]] = None  # (job key, path or bytes, pages)
+        self.closed = False
+        self.saves = 0
+        self.job: Optional[IncrementalMergeJob] = None  # only touched by the worker thread
+        self.thread: Optional[threading.Thread] = None
+
+    def request(self, file_paths: Sequence[str], add_blank_pages: bool = True) -> None:
+        """Start (or redirect) the background build towards file_paths"""
+        with self.condition:
+            if self.closed:
+                return
+            self.wanted = (list(file_paths), add_blank_pages)
+            self.condition.notify_all()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='speculative-merge', daemon=True)
+                self.thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no build is requested or running; False if timeout ran out first"""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.closed or (self.wanted is None and self.building is None), timeout)
+
+    def take(self, file_paths: Sequence[str], add_blank_pages: bool = True
+             ) -> Optional[Tuple[Union[str, bytes], int]]:
+        """Hand over the built job for file_paths as (path or bytes, page count), or None.
+
+        Never waits: while a build is requested or running this returns
+        None, so call wait() first. The requested files may differ from
+        file_paths only by files that fail to merge, which the build skips
+        too. The caller owns the returned file.
+        """
+        key = job_key(file_paths, {'add_blank_pages': add_blank_pages})
+        if key is None:
+            return None
+        with self.condition:
+            if self.wanted is not None or self.building is not None:
+                return None
+            if self.ready is None or self.ready[0] != key:
+                return None
+            _, merged, page_count = self.ready
+            self.ready = None
+            return merged, page_count
+
+    def shutdown(self) -> None:
+        """Stop the worker; the in-memory job and any unclaimed file are discarded"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+            thread = self.thread
+        if thread is not None:
+            thread.join()
+
+    def _superseded(self) -> bool:
+        return self.wanted is not None or self.closed
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                while self.wanted is None and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    break
+                self.building, self.wanted = self.wanted, None
+            try:
+                self._build(*self.building)
+            except Exception as e:
+                print(f"Error merging in the background: {e}")
+            finally:
+                with self.condition:
+                    self.building = None
+                    self.condition.notify_all()
+        if self.job is not None:
+            self.job.close()
+        with self.condition:
+            self._set_ready(None)
+
+    def _build(self, file_paths: List[str], add_blank_pages: bool) -> None:
+        if self.job is not None and (not file_paths or self.job.add_blank_pages != add_blank_pages):
+            self.job.close()
+            self.job = None
+        if not file_paths:
+            with self.condition:
+                self._set_ready(None)
+            return
+        if self.job is None:
+            self.job = IncrementalMergeJob(add_blank_pages)
+        if not self.job.sync(file_paths, is_cancelled=self._superseded):
+            return
+        if not self.job.page_count:
+            with self.condition:
+                self._set_ready(None)
+            return
+        key = identities_key(self.job.merged_identities, {'add_blank_pages': add_blank_pages})
+        with self.condition:
+            if self.ready is not None and self.ready[0] == key:
+                return  # Already saved and not taken yet
+        self.saves += 1
+        if self.output_dir is None:
+            merged = self.job.to_bytes()
+        else:
+            merged = os.path.join(self.output_dir, f"speculative_{os.getpid()}_{self.saves}.tmp")
+            self.job.save(merged)
+        with self.condition:
+            self._set_ready((key, merged, self.job.page_count))
+
+    def _set_ready(self, ready: Optional[Tuple[str, Union[str, bytes], int]]) -> None:
+        # Called with the condition held; deletes the file being replaced
+        old, self.ready = self.ready, ready
+        if old is not None and isinstance(old[1], str):
+            try:
+                os.remove(old[1])
+            except OSError as e:
+                print(f"Error removing background merge file: {e}")
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import os
+import sys
+import stat
+import shutil
+import getpass
+import tempfile
+import threading
+from typing import Dict, List, Optional, Union
+
+from .metrics import metrics
+
+# Spool roots with less free space than this are passed over
+DEFAULT_MIN_FREE_BYTES = 256 * 1024 * 1024
+
+# Job files handed to an external viewer that are kept while the app runs
+DEFAULT_HANDED_OFF_JOBS = 5
+
+SPOOL_DIR_NAME = "pdf_print_station"
+
+# Job states; a job leaves the spool when it reaches one of the final states
+JOB_BUILDING = 'building'
+JOB_READY = 'ready'
+JOB_PRINTING = 'printing'
+JOB_HANDED_OFF = 'handed_off'  # given to another program, which may still be reading the file
+JOB_DONE = 'done'
+JOB_CANCELLED = 'cancelled'
+JOB_FAILED = 'failed'
+JOB_FINAL_STATES = (JOB_DONE, JOB_CANCELLED, JOB_FAILED)
+
+
+def free_bytes(path: str) -> int:
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return 0
+
+
+def is_ram_disk(path: str) -> bool:
+    """True if path is on a tmpfs or ramfs mount (Linux; elsewhere always False)"""
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return False
+    path = os.path.realpath(path)
+    best, best_type = '', None
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        inside = path == mount_point or path.startswith(mount_point.rstrip('/') + '/')
+        if inside and len(mount_point) >= len(best):
+            best, best_type = mount_point, fs_type
+    return best_type in ('tmpfs', 'ramfs')
+
+
+def fast_temp_dir(min_free_bytes: int = DEFAULT_MIN_FREE_BYTES) -> str:
+    """A RAM-backed (tmpfs) directory with room to spare, else the system temp directory.
+
+    XDG_RUNTIME_DIR (per user) and /dev/shm are used if they are writable
+    tmpfs mounts, as on most Linux systems; elsewhere the local temp
+    directory is used.
+    """
+    for candidate in (os.environ.get('XDG_RUNTIME_DIR'), '/dev/shm'):
+        if (candidate and os.path.isdir(candidate) and os.access(candidate, os.W_OK | os.X_OK)
+                and is_ram_disk(candidate) and free_bytes(candidate) >= min_free_bytes):
+            return candidate
+    return tempfile.gettempdir()
+
+
+def user_id() -> str:
+    return str(os.getuid()) if hasattr(os, 'getuid') else getpass.getuser()
+
+
+def private_dir(path: str) -> bool:
+    """Create path readable by the current user only; False if it exists and isn't such a folder.
+
+    Guards a predictable name in a shared folder such as /dev/shm, which
+    another user could have created first.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        return False  # A file or a symlink planted in its place
+    if hasattr(os, 'getuid') and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+        return False
+    return True
+
+
+def process_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Someone else's process
+    return True
+
+
+class SpoolJob:
+    """One print job on its way to the printer.
+
+    The merged document is either a file (path) or held in memory (data).
+    owned is False for files that belong to someone else, such as the
+    merged job cache, which the spool never deletes.
+    """
+
+    def __init__(self, job_id: int, key: Optional[str] = None):
+        self.id = job_id
+        self.key = key
+        self.path: Optional[str] = None
+        self.data: Optional[bytes] = None
+        self.pages = 0
+        self.owned = False
+        self.state = JOB_BUILDING
+
+    @property
+    def source(self) -> Union[str, bytes, None]:
+        """What to print from: the document's bytes if in memory, else its path"""
+        return self.data if self.data is not None else self.path
+
+    def __repr__(self):
+        where = f"{len(self.data)} bytes in memory" if self.data is not None else self.path
+        return f"SpoolJob({self.id}, {self.state}, {where})"
+
+
+class SpoolManager:
+    """Print job files in a private directory on a fast local disk.
+
+    Each running app gets its own session directory, made by mkdtemp()
+    in a folder only this user can use under root (by default
+    fast_temp_dir()), so job files are private and concurrent jobs and
+    instances never share a file name. Jobs are tracked by state rather than by age: a job's file
+    and memory are released as soon as it is done, cancelled or failed.
+    Files handed to another program (a viewer that prints them) stay until
+    more than max_handed_off newer ones exist or the app exits, and
+    sessions left behind by processes that are gone are removed by
+    remove_stale_sessions().
+    """
+
+    def __init__(self, root: Optional[str] = None, max_handed_off: int = DEFAULT_HANDED_OFF_JOBS):
+        self.root = os.path.join(root or fast_temp_dir(), f"{SPOOL_DIR_NAME}-{user_id()}")
+        self.session_dir: Optional[str] = None  # created with the first job file
+        self.max_handed_off = max_handed_off
+        self.jobs: Dict[int, SpoolJob] = {}
+        self.handed_off: List[int] = []  # oldest first
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def new_job(self, key: Optional[str] = None) -> SpoolJob:
+        """Register a job that is about to be built; see set_ready()"""
+        with self.lock:
+            job = SpoolJob(self.next_id, key)
+            self.next_id += 1
+            self.jobs[job.id] = job
+        metrics.count('spool.jobs')
+        return job
+
+    def add_job(self, source: Union[str, bytes], key: Optional[str] = None, pages: int = 0,
+                owned: bool = False) -> SpoolJob:
+        """Register a document that is already built; see set_ready()"""
+        job = self.new_job(key)
+        self.set_ready(job, source, pages, owned)
+        return job
+
+    def session(self) -> str:
+        """This app's session directory, created on first use"""
+        with self.lock:
+            if self.session_dir is None:
+                parent = self.root
+                if not private_dir(parent):
+                    # Someone else owns the name; mkdtemp is still safe in the shared folder
+                    print(f"Print spool folder {parent} is not private, not using it")
+                    parent = os.path.dirname(self.root)
+                self.session_dir = tempfile.mkdtemp(prefix=f"session_{os.getpid()}_", dir=parent)
+            return self.session_dir
+
+    def job_path(self, job: SpoolJob) -> str:
+        """A file name for job in the session directory, unique to the job"""
+        return os.path.join(self.session(), f"job_{job.id}.pdf")
+
+    def set_ready(self, job: SpoolJob, source: Union[str, bytes], pages: int = 0,
+                  owned: bool = False) -> None:
+        """The job's document is built: a file path (deleted with the job if owned) or bytes"""
+        if isinstance(source, str):
+            job.path, job.data, job.owned = source, None, owned
+        else:
+            job.path, job.data = None, source
+        job.pages = pages
+        self.set_state(job, JOB_READY)
+
+    def file_for(self, job: SpoolJob) -> str:
+        """A path to the job's document, writing it into the session directory if held in memory"""
+        if job.path is not None and job.data is None:
+            return job.path
+        path = self.job_path(job)
+        with metrics.timer('spool.write', bytes=len(job.data)):
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(job.data)
+            os.replace(temp_path, path)
+        job.path, job.data, job.owned = path, None, True
+        return path
+
+    def set_state(self, job: SpoolJob, state: str) -> None:
+        release = []
+        with self.lock:
+            job.state = state
+            if state in JOB_FINAL_STATES:
+                self.jobs.pop(job.id, None)
+                release.append(job)
+            elif state == JOB_HANDED_OFF:
+                self.handed_off.append(job.id)
+                while len(self.handed_off) > self.max_handed_off:
+                    old = self.jobs.pop(self.handed_off.pop(0), None)
+                    if old is not None:
+                        release.append(old)
+        for old in release:
+            self.release(old)
+
+    def release(self, job: SpoolJob) -> None:
+        """Drop the job's memory and delete its file if the spool owns it"""
+        job.data = None
+        if job.owned and job.path is not None:
+            try:
+                os.remove(job.path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error removing spooled print job: {e}")
+
+    def active_jobs(self) -> List[SpoolJob]:
+        with self.lock:
+            return list(self.jobs.values())
+
+    def remove_stale_sessions(self) -> int:
+        """Delete session directories of app instances that are no longer running"""
+        removed = 0
+        if not os.path.isdir(self.root) or not private_dir(self.root):
+            return 0
+        for name in os.listdir(self.root):
+            parts = name.split('_')
+            if len(parts) < 2 or parts[0] != "session" or not parts[1].isdigit():
+                continue
+            pid = parts[1]
+            if int(pid) == os.getpid():
+                continue
+            if process_alive(int(pid)):
+                continue
+            try:
+                shutil.rmtree(os.path.join(self.root, name))
+                removed += 1
+            except Exception as e:
+                print(f"Error removing old print spool {name}: {e}")
+        return removed
+
+    def shutdown(self) -> None:
+        """Release every job; files handed to other programs are left for the next start"""
+        with self.lock:
+            jobs = [job for job in self.jobs.values() if job.state != JOB_HANDED_OFF]
+            for job in jobs:
+                self.jobs.pop(job.id)
+            keep = bool(self.jobs)
+        for job in jobs:
+            self.release(job)
+        if not keep and self.session_dir is not None:
+            shutil.rmtree(self.session_dir, ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return {'jobs': len(jobs), 'handed_off': sum(job.state == JOB_HANDED_OFF for job in jobs),
+                'memory_bytes': sum(len(job.data) for job in jobs if job.data is not None)}
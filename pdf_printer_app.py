@@ -1,24 +1,63 @@
+import time
+# Reference point for the startup trace, taken before the heavy imports
+STARTUP_TIME = time.perf_counter()
+
 import sys
+
+# "python -m pdf_printer_app print ..." runs the headless batch printer
+# before any Qt module is loaded. It runs as __main__ itself, so the
+# pre-flight worker processes re-import batch_print rather than this module.
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "print":
+    import runpy
+    del sys.argv[1]
+    runpy.run_module('batch_print', run_name='__main__', alter_sys=True)
+    sys.exit(0)
+
+# --profile-startup: time every import from here on (main process only)
+IMPORT_PROFILER = None
+if __name__ == "__main__" and '--profile-startup' in sys.argv:
+    from startup_profile import ImportProfiler
+    IMPORT_PROFILER = ImportProfiler()
+    IMPORT_PROFILER.install()
+
 import os
-import json
-import fitz  # PyMuPDF
+import threading
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QPushButton, QFileDialog, QLabel, QScrollArea, QListWidget,
+                             QPushButton, QFileDialog, QLabel, QListView, QListWidget,
                              QListWidgetItem, QCheckBox, QGridLayout, QStyledItemDelegate, QLineEdit,
-                             QProgressDialog, QDialog, QMessageBox, QSizePolicy, QGroupBox)
-from PyQt5.QtGui import QPixmap, QImage, QDragEnterEvent, QDropEvent, QPainter, QIcon, QFontMetrics
-from PyQt5.QtCore import Qt, PYQT_VERSION_STR, QTimer, pyqtSlot, QSize, QEvent
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-import time
-
+                             QProgressDialog, QDialog, QMessageBox, QSizePolicy, QGroupBox, QSpinBox,
+                             QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView, QComboBox)
+from PyQt5.QtGui import (QPixmap, QPixmapCache, QImage, QDragEnterEvent, QDropEvent, QPainter, QIcon,
+                         QFontMetrics, QColor, QPageSize)
+from PyQt5.QtCore import (Qt, PYQT_VERSION_STR, QTimer, pyqtSlot, pyqtSignal, QSize, QEvent, QObject,
+                          QAbstractListModel, QAbstractProxyModel, QModelIndex, QPersistentModelIndex, QRect,
+                          QRectF, QSizeF, QSettings)
+
+from pdf_print_core import (render_preview, PreviewCache, preflight, merge_files, MetadataIndex,
+                            empty_info, LIST_FILE_NAME, FileListStore,
+                            CollectionEntry, read_collection, write_collection, list_collections,
+                            SearchIndex, QUERY_HELP, canonical_path, content_duplicates,
+                            DEFAULT_INCLUDE, parse_patterns, split_dropped_paths, discover_pdfs,
+                            DEFAULT_RASTER_DPI, COLOR_MODES, DEFAULT_LOOKAHEAD, PrinterBackend,
+                            print_raster, job_key, MergedJobCache, SpeculativeMerger, SpoolManager,
+                            JOB_PRINTING, JOB_HANDED_OFF, JOB_DONE, JOB_CANCELLED, JOB_FAILED, metrics)
+
+# PyMuPDF, QtPrintSupport and the updater's network modules are imported on
+# first use, so they don't delay the first window
 try:
-    from updater import check_for_updates, CURRENT_VERSION
-    UPDATER_AVAILABLE = True
+    from updater import check_for_updates, CURRENT_VERSION, dependencies_available
+    UPDATER_AVAILABLE = dependencies_available()
 except ImportError:
     UPDATER_AVAILABLE = False
     CURRENT_VERSION = "0.0.1"
+if not UPDATER_AVAILABLE:
     print("Update checker not available - some features will be disabled")
 
+# Preview grid geometry
+PREVIEW_SIZE = 160
+PREVIEW_SPACING = 7
+PREVIEW_MARGIN = 7
+
 # Custom widget for PDF list items
 class PDFListItem(QWidget):
     def __init__(self, filename, parent=None):
@@ -59,11 +98,663 @@ class PDFListItem(QWidget):
     def sizeHint(self):
         return QSize(480, 30)  # Adjusted width
 
+# Renders previews on a pool of worker processes and reports back to the GUI thread
+class PreviewRenderPool(QObject):
+    preview_ready = pyqtSignal(str, str, bool, object)  # file path, cache key, success, document info
+    pending_changed = pyqtSignal(int)  # number of previews still rendering
+
+    # Internal: carries finished futures from the executor thread to the GUI thread
+    _future_done = pyqtSignal(object)
+
+    # Times a preview is resubmitted after the worker pool broke under it
+    MAX_POOL_RETRIES = 2
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = None
+        self.pending = {}  # file path -> Future
+        self.given_up = {}  # file path -> cache key whose renders kept killing the pool
+        self._future_done.connect(self._on_future_done)
+
+    def start_executor(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        # PyMuPDF is not thread-safe, so render in separate processes.
+        # Spawn keeps workers independent of the Qt state in this process.
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"))
+
+    def gave_up(self, file_path, key):
+        """True if rendering this version of the file kept breaking the pool"""
+        given_up_key = self.given_up.get(file_path)
+        if given_up_key is not None and given_up_key != key:
+            del self.given_up[file_path]  # The file changed; try it again
+            return False
+        return given_up_key is not None
+
+    def submit(self, file_path, key, preview_path, attempt=0):
+        if file_path in self.pending:
+            return
+        from concurrent.futures.process import BrokenProcessPool
+        if self.executor is None:
+            self.start_executor()
+        try:
+            future = self.executor.submit(render_preview, file_path, preview_path)
+        except BrokenProcessPool:
+            # A worker died (crash or out-of-memory kill); start a fresh pool
+            self.start_executor()
+            future = self.executor.submit(render_preview, file_path, preview_path)
+        future.executor = self.executor
+        future.file_path = file_path
+        future.key = key
+        future.preview_path = preview_path
+        future.attempt = attempt
+        future.submitted = time.perf_counter()
+        self.pending[file_path] = future
+        self.pending_changed.emit(len(self.pending))
+        # Callback runs on an executor thread; the signal is queued to the GUI thread
+        future.add_done_callback(self._future_done.emit)
+
+    @pyqtSlot(object)
+    def _on_future_done(self, future):
+        file_path = future.file_path
+        if self.pending.get(file_path) is future:
+            del self.pending[file_path]
+        if future.cancelled():
+            # Cancelled with the pool, not rendered; the tile asks again when painted
+            self.pending_changed.emit(len(self.pending))
+            return
+        from concurrent.futures.process import BrokenProcessPool
+        if isinstance(future.exception(), BrokenProcessPool):
+            # The pool failed, not this file: every pending render fails with it.
+            # Render them again on a new pool instead of reporting them as broken.
+            if self.executor is future.executor:
+                print("Preview worker process died, restarting the pool")
+                self.start_executor()
+            metrics.count('preview.pool_broken')
+            if future.attempt < self.MAX_POOL_RETRIES:
+                self.submit(file_path, future.key, future.preview_path, future.attempt + 1)
+            else:
+                # Keep the file; it just has no thumbnail until it changes
+                print(f"Giving up on the preview for {file_path}: the worker process keeps dying")
+                self.given_up[file_path] = future.key
+            self.pending_changed.emit(len(self.pending))
+            return
+        success = False
+        info = empty_info(file_path)
+        # Queue wait plus render time, as seen from the GUI
+        metrics.observe('preview.render', time.perf_counter() - future.submitted, future.submitted,
+                        args={'file': os.path.basename(file_path)})
+        try:
+            _, success, error, info = future.result()
+            if not success:
+                print(f"Error generating preview for {file_path}: {error}")
+        except Exception as e:
+            print(f"Error generating preview for {file_path}: {e}")
+        metrics.count('preview.rendered' if success else 'preview.failed')
+        self.preview_ready.emit(file_path, future.key, success, info)
+        self.pending_changed.emit(len(self.pending))
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()
+
+# List model behind the preview grid; thumbnails are decoded lazily for visible tiles only.
+# Scaled thumbnails live in QPixmapCache keyed by preview cache key, in front of the disk cache.
+class PreviewListModel(QAbstractListModel):
+    # Decoded thumbnails kept in QPixmapCache (a 160 px tile is roughly 100 KB)
+    MAX_LOADED_PIXMAPS = 300
+    # Thumbnails decoded per event-loop pass, so scrolling stays smooth
+    LOAD_BATCH_SIZE = 16
+
+    def __init__(self, key_resolver, path_for_key, parent=None):
+        super().__init__(parent)
+        self.key_resolver = key_resolver  # file path -> cache key of a rendered thumbnail, or None
+        self.path_for_key = path_for_key  # cache key -> thumbnail path on disk
+        self.files = []
+        self.rows = {}  # file path -> row
+        self.keys = {}  # file path -> cache key, so painting needs no stat calls
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), self.MAX_LOADED_PIXMAPS * 100))
+        self.load_queue = []
+        self.queued = set()
+        self.load_timer = QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.setInterval(0)
+        self.load_timer.timeout.connect(self.process_load_queue)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        file_path = self.files[index.row()]
+        if role == Qt.DecorationRole:
+            key = self.keys.get(file_path)
+            pixmap = QPixmapCache.find(self.pixmap_cache_key(key)) if key else None
+            if pixmap is not None:
+                return pixmap
+            # The view only asks for visible rows, so this is the lazy load trigger
+            self.request_load(file_path)
+            return None
+        if role == Qt.ToolTipRole:
+            return file_path
+        if role == Qt.UserRole:
+            return file_path
+        return None
+
+    def set_files(self, files):
+        """Sync rows with files using row-level inserts and removes where possible"""
+        with metrics.timer('grid.set_files', files=len(files)):
+            wanted = set(files)
+            # Remove rows that left the list, in contiguous blocks from the end
+            row = len(self.files) - 1
+            while row >= 0:
+                if self.files[row] in wanted:
+                    row -= 1
+                    continue
+                last = row
+                while row >= 0 and self.files[row] not in wanted:
+                    row -= 1
+                self.beginRemoveRows(QModelIndex(), row + 1, last)
+                for file_path in self.files[row + 1:last + 1]:
+                    self.keys.pop(file_path, None)
+                del self.files[row + 1:last + 1]
+                self.endRemoveRows()
+
+            if self.files == files[:len(self.files)]:
+                # Common case: new files were appended
+                if len(files) > len(self.files):
+                    self.beginInsertRows(QModelIndex(), len(self.files), len(files) - 1)
+                    self.files.extend(files[len(self.files):])
+                    self.endInsertRows()
+            else:
+                self.beginResetModel()
+                self.files = list(files)
+                self.endResetModel()
+            self.rows = {file_path: row for row, file_path in enumerate(self.files)}
+
+    def request_load(self, file_path):
+        if file_path in self.queued:
+            return
+        self.queued.add(file_path)
+        self.load_queue.append(file_path)
+        # Drop the oldest requests; they were for tiles scrolled past long ago
+        if len(self.load_queue) > self.MAX_LOADED_PIXMAPS:
+            for stale in self.load_queue[:-self.MAX_LOADED_PIXMAPS]:
+                self.queued.discard(stale)
+            del self.load_queue[:-self.MAX_LOADED_PIXMAPS]
+        self.load_timer.start()
+
+    def process_load_queue(self):
+        with metrics.timer('grid.load_batch'):
+            for _ in range(min(self.LOAD_BATCH_SIZE, len(self.load_queue))):
+                # Newest requests first: they belong to the tiles currently on screen
+                file_path = self.load_queue.pop()
+                self.queued.discard(file_path)
+                row = self.rows.get(file_path)
+                if row is None:
+                    continue
+                key = self.key_resolver(file_path)
+                if key is None or not self.load_pixmap(key):
+                    continue
+                self.keys[file_path] = key
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+            if self.load_queue:
+                self.load_timer.start()
+
+    @staticmethod
+    def pixmap_cache_key(key):
+        return f"preview:{key}"
+
+    def load_pixmap(self, key):
+        """Make sure the scaled thumbnail for key is in QPixmapCache"""
+        if QPixmapCache.find(self.pixmap_cache_key(key)) is not None:
+            return True
+        with metrics.timer('grid.decode_thumbnail', trace=False):
+            pixmap = QPixmap(self.path_for_key(key))
+            if pixmap.isNull():
+                return False
+            scaled = pixmap.scaled(PREVIEW_SIZE, PREVIEW_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return QPixmapCache.insert(self.pixmap_cache_key(key), scaled)
+
+    def refresh(self, file_path):
+        """Reload a file's thumbnail, e.g. after its background render finished"""
+        self.keys.pop(file_path, None)
+        row = self.rows.get(file_path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def clear_pixmaps(self):
+        QPixmapCache.clear()
+        self.keys.clear()
+        self.load_queue.clear()
+        self.queued.clear()
+        if self.files:
+            self.dataChanged.emit(self.index(0), self.index(len(self.files) - 1), [Qt.DecorationRole])
+
+# Paints one preview tile: the thumbnail centred on a dark square, or a placeholder
+class PreviewTileDelegate(QStyledItemDelegate):
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = QRect(option.rect.x(), option.rect.y(), PREVIEW_SIZE, PREVIEW_SIZE)
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            painter.fillRect(rect, QColor("#2b2b2b"))
+            painter.drawPixmap(rect.x() + (rect.width() - pixmap.width()) // 2,
+                               rect.y() + (rect.height() - pixmap.height()) // 2,
+                               pixmap)
+        else:
+            painter.fillRect(rect, QColor("#333333"))
+            painter.setPen(QColor("#888888"))
+            painter.drawText(rect, Qt.AlignCenter, "Loading...")
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(PREVIEW_SIZE, PREVIEW_SIZE)
+
+# List model behind a file list, stored as compact parallel arrays: the paths,
+# and a label per row that is None unless it differs from the file name.
+# A count per canonical path gives O(1) membership checks that ignore how a
+# path was spelled, and a SearchIndex is kept in step with the rows.
+class FileListModel(QAbstractListModel):
+    def __init__(self, tooltip_provider=None, parent=None):
+        super().__init__(parent)
+        self.tooltip_provider = tooltip_provider  # file path -> tooltip text
+        # Lists are only changed in place, so a proxy can hold on to them
+        self.paths = []
+        self.names = []
+        self.counts = {}  # canonical path -> rows holding it
+        self.search_index = SearchIndex()
+
+    def __contains__(self, file_path):
+        return canonical_path(file_path) in self.counts
+
+    def unique_entries(self, entries, skip_listed=True):
+        """Entries without repeats among themselves, and (by default) not in the list yet"""
+        seen = set(self.counts) if skip_listed else set()
+        unique = []
+        for entry in entries:
+            key = canonical_path(entry[0])
+            if key not in seen:
+                seen.add(key)
+                unique.append(entry)
+        return unique
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self.name(row)
+        if role == Qt.UserRole:
+            return self.paths[row]
+        if role == Qt.ToolTipRole:
+            # Built on hover only, so large lists cost nothing up front
+            file_path = self.paths[row]
+            return self.tooltip_provider(file_path) if self.tooltip_provider else file_path
+        return None
+
+    def name(self, row):
+        return self.names[row] or os.path.basename(self.paths[row])
+
+    def entries(self, rows=None):
+        """(path, name) for the given rows, or every row, in order"""
+        rows = range(len(self.paths)) if rows is None else rows
+        return [(self.paths[row], self.name(row)) for row in rows]
+
+    def records(self, rows):
+        """(path, label) for the given rows; label is None when it is the file name"""
+        return [(self.paths[row], self.names[row]) for row in rows]
+
+    @staticmethod
+    def _label(path, name):
+        return name if name and name != os.path.basename(path) else None
+
+    def append(self, entries):
+        """Add (path, name) entries at the end with a single insert; name may be None"""
+        entries = list(entries)
+        if not entries:
+            return
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        for path, name in entries:
+            self.paths.append(path)
+            self.names.append(self._label(path, name))
+            key = canonical_path(path)
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.search_index.extend(self.paths[first:])
+        self.endInsertRows()
+
+    def reset(self, entries):
+        """Replace all rows with (path, name) entries"""
+        self.beginResetModel()
+        self.paths[:] = [path for path, _ in entries]
+        self.names[:] = [self._label(path, name) for path, name in entries]
+        self.counts = {}
+        for path in self.paths:
+            key = canonical_path(path)
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.search_index.rebuild(self.paths)
+        self.endResetModel()
+
+    def remove_rows(self, rows):
+        """Remove rows, one notification per contiguous block, from the end"""
+        rows = sorted(set(rows), reverse=True)
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            while i + 1 < len(rows) and rows[i + 1] == first - 1:
+                i += 1
+                first = rows[i]
+            i += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for path in self.paths[first:last + 1]:
+                key = canonical_path(path)
+                if self.counts[key] == 1:
+                    del self.counts[key]
+                else:
+                    self.counts[key] -= 1
+            del self.paths[first:last + 1]
+            del self.names[first:last + 1]
+            self.search_index.delete(first, last)
+            self.endRemoveRows()
+
+    def remove_paths(self, file_paths):
+        file_paths = {file_path for file_path in file_paths if file_path in self}
+        if file_paths:
+            self.remove_rows([row for row, file_path in enumerate(self.paths) if file_path in file_paths])
+
+    def sort(self, column=0, order=Qt.AscendingOrder):
+        """Sort rows by file name in place; selections follow their rows"""
+        keys = self.search_index.names  # lower-case file names
+        new_order = sorted(range(len(self.paths)), key=keys.__getitem__,
+                           reverse=order == Qt.DescendingOrder)
+        self.layoutAboutToBeChanged.emit()
+        self.paths[:] = [self.paths[row] for row in new_order]
+        self.names[:] = [self.names[row] for row in new_order]
+        self.search_index.reorder(new_order)
+        new_rows = [0] * len(new_order)
+        for new_row, old_row in enumerate(new_order):
+            new_rows[old_row] = new_row
+        old_indexes = self.persistentIndexList()
+        self.changePersistentIndexList(old_indexes, [self.index(new_rows[index.row()]) for index in old_indexes])
+        self.layoutChanged.emit()
+
+# Shows the rows of a FileListModel that match the search query.
+# Matches come from the model's SearchIndex as a list of source rows, so a new
+# query is one reset of this proxy instead of a filter callback per row.
+class FileSearchProxy(QAbstractProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query = ''
+        self.rows = None  # matching source rows, or None when not filtering
+        self.proxy_rows = None  # source row -> proxy row, built on demand
+        self.source_paths = []
+        self.saved_indexes = self.saved_sources = []  # persistent indexes during a layout change
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        self.source_paths = model.paths
+        # Without a query rows map one to one, so inserts and removes are passed
+        # through and the view keeps its selection and scroll position
+        model.rowsAboutToBeInserted.connect(
+            lambda parent, first, last: self.rows is None and self.beginInsertRows(QModelIndex(), first, last))
+        model.rowsInserted.connect(lambda: self.endInsertRows() if self.rows is None else self.refilter())
+        model.rowsAboutToBeRemoved.connect(
+            lambda parent, first, last: self.rows is None and self.beginRemoveRows(QModelIndex(), first, last))
+        model.rowsRemoved.connect(lambda: self.endRemoveRows() if self.rows is None else self.refilter())
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(lambda: self.refilter(notify=False))
+        model.layoutAboutToBeChanged.connect(self.on_source_layout_about_to_change)
+        model.layoutChanged.connect(self.on_source_layout_changed)
+        model.dataChanged.connect(self.on_source_data_changed)
+
+    def set_query(self, query):
+        self.query = query
+        self.refilter()
+
+    def refilter(self, notify=True):
+        if notify:
+            self.beginResetModel()
+        self.rows = self.sourceModel().search_index.search(self.query)
+        self.proxy_rows = None
+        self.endResetModel()
+
+    def on_source_layout_about_to_change(self):
+        # Remember which source row each persistent index (e.g. the selection) points at
+        self.layoutAboutToBeChanged.emit()
+        self.saved_indexes = self.persistentIndexList()
+        self.saved_sources = [QPersistentModelIndex(self.mapToSource(index)) for index in self.saved_indexes]
+
+    def on_source_layout_changed(self):
+        # Rows were reordered (sorted); match them again and move the persistent indexes along
+        self.rows = self.sourceModel().search_index.search(self.query)
+        self.proxy_rows = None
+        self.changePersistentIndexList(self.saved_indexes,
+                                       [self.mapFromSource(QModelIndex(source)) for source in self.saved_sources])
+        self.saved_indexes = self.saved_sources = []
+        self.layoutChanged.emit()
+
+    def on_source_data_changed(self, top_left, bottom_right, roles=()):
+        if self.rows is None:
+            self.dataChanged.emit(self.index(top_left.row()), self.index(bottom_right.row()), roles)
+        elif self.rows:
+            self.dataChanged.emit(self.index(0), self.index(len(self.rows) - 1), roles)
+
+    # rowCount() and index() run once per row whenever the view lays out, so
+    # they read the source rows directly rather than going through Qt calls
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return len(self.source_paths if self.rows is None else self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        rows = self.source_paths if self.rows is None else self.rows
+        if 0 <= row < len(rows) and column == 0 and not parent.isValid():
+            return self.createIndex(row, 0)
+        return QModelIndex()
+
+    def parent(self, index):
+        return QModelIndex()
+
+    def source_rows(self, rows):
+        """Source rows for a list of proxy rows"""
+        return list(rows) if self.rows is None else [self.rows[row] for row in rows]
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        row = proxy_index.row()
+        if self.rows is not None:
+            if row >= len(self.rows):
+                return QModelIndex()
+            row = self.rows[row]
+        return self.sourceModel().index(row, 0)
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self.rows is None:
+            return self.index(source_index.row(), 0)
+        if self.proxy_rows is None:
+            self.proxy_rows = {source_row: row for row, source_row in enumerate(self.rows)}
+        row = self.proxy_rows.get(source_index.row())
+        return QModelIndex() if row is None else self.index(row, 0)
+
+# Records named startup milestones, in seconds since the process started
+class StartupTrace:
+    def __init__(self, start=STARTUP_TIME):
+        self.start = start
+        self.marks = {}
+
+    def mark(self, name):
+        """Record a milestone the first time it is reached"""
+        if name in self.marks:
+            return
+        self.marks[name] = time.perf_counter() - self.start
+        metrics.observe(f'startup.{name}', self.marks[name], self.start)
+        print(f"Startup trace: {name} at {self.marks[name]:.3f}s")
+
+    def summary(self):
+        return ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.marks.items())
+
+# Stats saved file paths on a background thread and reports them in batches
+class FileStatWorker(QObject):
+    batch_ready = pyqtSignal(object)  # list of (file path, os.stat_result or None)
+    finished = pyqtSignal()
+
+    BATCH_SIZE = 200
+
+    def start(self, file_paths):
+        threading.Thread(target=self._run, args=(list(file_paths),), daemon=True).start()
+
+    def _run(self, file_paths):
+        batch = []
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                stat = None
+            batch.append((file_path, stat))
+            if len(batch) >= self.BATCH_SIZE:
+                self.batch_ready.emit(batch)
+                batch = []
+        if batch:
+            self.batch_ready.emit(batch)
+        self.finished.emit()
+
+# Walks folder trees on a background thread and reports the PDFs it finds in batches
+class FolderImportWorker(QObject):
+    batch_ready = pyqtSignal(object)  # list of file paths
+    progress = pyqtSignal(int, int)  # folders scanned, PDFs found
+    finished = pyqtSignal(bool)  # True if cancelled
+
+    # Progress updates are throttled to this interval
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancelled = threading.Event()
+        # GUI-side state of the import
+        self.added = 0
+        self.size_cache = {}  # for content de-duplication across batches
+        self.progress_dialog = None
+
+    def start(self, folders, include, exclude):
+        threading.Thread(target=self._run, args=(list(folders), include, exclude), daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self, folders, include, exclude):
+        last_progress = 0.0
+
+        def report(folders_scanned, found):
+            nonlocal last_progress
+            now = time.perf_counter()
+            if now - last_progress >= self.PROGRESS_INTERVAL:
+                last_progress = now
+                self.progress.emit(folders_scanned, found)
+
+        try:
+            with metrics.timer('import.walk', folders=len(folders)):
+                for batch in discover_pdfs(folders, include, exclude,
+                                           is_cancelled=self.cancelled.is_set, progress_callback=report):
+                    self.batch_ready.emit(batch)
+        except Exception as e:
+            print(f"Error importing folders: {e}")
+        self.finished.emit(self.cancelled.is_set())
+
+# Paints rasterized pages onto a QPrinter: a real printer, or a PDF file when the
+# printer's output format is QPrinter.PdfFormat (handy for testing the print path)
+class QPrinterBackend(PrinterBackend):
+    def __init__(self, printer):
+        self.printer = printer
+        self.painter = None
+
+    def prepare(self, page):
+        # Runs on the render thread; QImage conversions release the GIL
+        if page.color_mode == 'rgb':
+            image = QImage(page.samples, page.pixel_width, page.pixel_height, page.stride, QImage.Format_RGB888)
+        else:
+            image = QImage(page.samples, page.pixel_width, page.pixel_height, page.stride, QImage.Format_Grayscale8)
+            if page.color_mode == 'mono':
+                # Ordered dithering: cheaper than error diffusion, and its regular
+                # pattern compresses far better in the spooled job
+                image = image.convertToFormat(QImage.Format_Mono, Qt.MonoOnly | Qt.OrderedDither)
+        # The print engines convert images to 32 bits per pixel before spooling;
+        # doing it here takes that work off the printing thread
+        image = image.convertToFormat(QImage.Format_RGB32)
+        return page._replace(image=image)
+
+    def set_page_size(self, page):
+        self.printer.setPageSize(QPageSize(QSizeF(page.width, page.height), QPageSize.Point))
+
+    def start(self, page):
+        self.set_page_size(page)
+        if page.color_mode != 'rgb':
+            self.printer.setColorMode(self.printer.GrayScale)
+        # One painter for the whole job; ending it ends the job
+        self.painter = QPainter()
+        if not self.painter.begin(self.printer):
+            self.painter = None
+            raise RuntimeError("Could not start printing")
+        if page.color_mode == 'mono':
+            # JPEG-compressing a dithered image makes it bigger and smears the dots
+            self.painter.setRenderHint(QPainter.LosslessImageRendering)
+
+    def new_page(self, page):
+        self.set_page_size(page)
+        if not self.printer.newPage():
+            raise RuntimeError("Could not start a new page")
+
+    def draw(self, page):
+        # Scale the image to the printable area of the page
+        self.painter.drawImage(QRectF(self.painter.viewport()), page.image)
+
+    def finish(self):
+        if self.painter is not None:
+            self.painter.end()
+            self.painter = None
+
+    def abort(self):
+        self.printer.abort()
+        self.finish()
+
 # Main application class
 class PDFPrinterApp(QMainWindow):
-    def __init__(self):
+    # Settings dialog choices kept between runs: attribute -> (QSettings key, type)
+    SAVED_SETTINGS = {
+        'print_dpi': ('print/dpi', int),
+        'print_color_mode': ('print/color_mode', str),
+        'print_lookahead': ('print/lookahead', int),
+        'dedupe_by_content': ('files/dedupe_by_content', bool),
+        'import_include': ('files/import_include', str),
+        'import_exclude': ('files/import_exclude', str),
+    }
+
+    def __init__(self, data_dir=None):
         super().__init__()
+        # Saved list, indexes, previews and collections live here (the app folder by default)
+        self.data_dir = data_dir or os.path.dirname(os.path.abspath(__file__))
         print("PDFPrinterApp.__init__ started")
+        self.startup_trace = StartupTrace()
+        self.startup_validation_done = False
         self.setWindowTitle("PDF Print Station")
         self.setGeometry(100, 100, 1200, 800)
         self.setAcceptDrops(True)  # Enable drag and drop for the main window
@@ -85,35 +776,71 @@ class PDFPrinterApp(QMainWindow):
         self.pdf_files = []
         self.preview_update_timer = QTimer()
         self.preview_update_timer.setSingleShot(True)
+        self.preview_update_timer.setInterval(100)  # Batch bursts of finished previews
         self.preview_update_timer.timeout.connect(self.update_preview)
 
-        self.pdf_previews = {}  # Dictionary to store previews
+        # Background preview rendering on all cores
+        self.preview_pool = PreviewRenderPool(parent=self)
+        self.preview_pool.preview_ready.connect(self.on_preview_ready)
+        self.preview_pool.pending_changed.connect(self.on_preview_pending_changed)
 
         # Set up temp folder for previews
         self.setup_temp_folder()
 
+        # Page counts, page sizes and thumbnail keys, kept next to pdf_list.json
+        self.metadata_index = MetadataIndex(
+            os.path.join(self.data_dir, 'pdf_index.json'))
+
+        # Merged print jobs, kept so identical batches reprint without merging
+        self.job_cache = MergedJobCache(os.path.join(self.data_dir, 'print_jobs'))
+
+        # Settings dialog choices from earlier runs (per user, see main() for the names)
+        self.settings = QSettings()
+        self.load_settings()
+
+        # Jobs on their way to the printer, on a RAM disk where there is one
+        self.spool = SpoolManager()
+        stale = self.spool.remove_stale_sessions()
+        if stale:
+            print(f"Removed {stale} print spool folders left by earlier runs")
+
+        # Folder imports still running
+        self.import_workers = set()
+
         # Set up collections directory BEFORE UI initialization
-        self.collections_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'collections')
+        self.collections_dir = os.path.join(self.data_dir, 'collections')
         if not os.path.exists(self.collections_dir):
             os.makedirs(self.collections_dir)
 
+        # Saved file list; bursts of changes are coalesced and written on a background thread
+        self.list_store = FileListStore(os.path.join(self.data_dir, LIST_FILE_NAME))
+        self.list_changes = []  # (added paths, removed rows) not yet written, or None for a full write
+        self.list_writer = None
+        self.list_save_timer = QTimer(self)
+        self.list_save_timer.setSingleShot(True)
+        self.list_save_timer.setInterval(500)
+        self.list_save_timer.timeout.connect(self.flush_pdf_list)
+
+        # Optional background merge of the selection, started once edits pause
+        self.speculative_merger = None
+        self.speculative_timer = QTimer(self)
+        self.speculative_timer.setSingleShot(True)
+        self.speculative_timer.setInterval(1000)
+        self.speculative_timer.timeout.connect(self.request_speculative_merge)
+
         # Initialize basic UI components
         self.init_ui()
         
         # Load saved PDFs and update collections list
+        self.startup_files = []
         self.load_pdf_list()
+        self.startup_trace.mark('list_loaded')
         self.update_collections_list()  # Make sure collections are loaded
         self.apply_dark_theme()
         print("PDFPrinterApp.__init__ completed")
 
         self.installEventFilter(self)
 
-        # Add a timer for debouncing resize events
-        self.resize_timer = QTimer()
-        self.resize_timer.setSingleShot(True)
-        self.resize_timer.setInterval(200)  # 200ms delay
-        self.resize_timer.timeout.connect(self.update_preview)
-
         # Check for updates on startup
         if UPDATER_AVAILABLE:
             QTimer.singleShot(2000, lambda: check_for_updates(self))
@@ -127,20 +854,15 @@ class PDFPrinterApp(QMainWindow):
             return True
         elif event.type() == QEvent.KeyPress and event.key() == Qt.Key_Delete:
             # Handle Delete key press
-            if obj == self.all_files_list and self.all_files_list.hasFocus():
+            if obj == self.all_files_view and self.all_files_view.hasFocus():
                 self.remove_pdf()
                 return True
-            elif obj == self.selected_files_list and self.selected_files_list.hasFocus():
+            elif obj == self.selected_files_view and self.selected_files_view.hasFocus():
                 self.remove_from_selection()
                 return True
             elif obj == self.collections_list and self.collections_list.hasFocus():
                 self.delete_collection()
                 return True
-            
-        # Handle other events (keep existing event handling)
-        elif obj == self.scroll_area.viewport() and event.type() == QEvent.Resize:
-            self.resize_timer.start()
-            return True
         
         return super().eventFilter(obj, event)
 
@@ -153,9 +875,15 @@ class PDFPrinterApp(QMainWindow):
             event.ignore()
 
     def dropEvent(self, event: QDropEvent):
-        files = [u.toLocalFile() for u in event.mimeData().urls() if u.toLocalFile().lower().endswith('.pdf')]
+        paths = [u.toLocalFile() for u in event.mimeData().urls() if u.toLocalFile()]
+        files, folders = split_dropped_paths(paths)
         print(f"Dropped files: {files}")
-        
+
+        # Dropped folders are searched for PDFs in the background
+        if folders:
+            print(f"Dropped folders: {folders}")
+            self.import_folders(folders)
+
         if files:
             temp_label = QLabel("Processing dropped files...", self)
             temp_label.setStyleSheet("background-color: #3a3a3a; color: white; padding: 10px;")
@@ -192,18 +920,29 @@ class PDFPrinterApp(QMainWindow):
         selected_header.addStretch()
         left_layout.addLayout(selected_header)
 
-        self.selected_files_list = QListWidget()
-        self.selected_files_list.setSelectionMode(QListWidget.ExtendedSelection)
-        self.selected_files_list.setFixedWidth(fixed_width)
-        self.selected_files_list.setMinimumHeight(200)  # Set consistent height
-        left_layout.addWidget(self.selected_files_list)
+        self.selected_files_model = FileListModel(self.describe_file, self)
+        for signal in (self.selected_files_model.rowsInserted, self.selected_files_model.rowsRemoved,
+                       self.selected_files_model.modelReset, self.selected_files_model.layoutChanged):
+            signal.connect(self.schedule_speculative_merge)
+        self.selected_files_view = self.create_file_list_view(self.selected_files_model, fixed_width)
+        left_layout.addWidget(self.selected_files_view)
 
-        # Print button
+        # Print and reprint buttons
+        print_button_layout = QHBoxLayout()
         self.print_button = QPushButton("Print Selected")
         self.print_button.clicked.connect(self.print_pdf)
-        self.print_button.setFixedWidth(fixed_width)
+        self.print_button.setFixedWidth(fixed_width - 42)
         self.print_button.setFixedHeight(32)  # Fixed height for consistency
-        left_layout.addWidget(self.print_button)
+        print_button_layout.addWidget(self.print_button)
+
+        self.reprint_button = QPushButton("↻")
+        self.reprint_button.setToolTip("Reprint the last job (instant if its files haven't changed)")
+        self.reprint_button.clicked.connect(self.reprint_last_job)
+        self.reprint_button.setFixedWidth(32)
+        self.reprint_button.setFixedHeight(32)
+        self.reprint_button.setEnabled(self.job_cache.last_job() is not None)
+        print_button_layout.addWidget(self.reprint_button)
+        left_layout.addLayout(print_button_layout)
 
         # Selection buttons
         selection_button_layout = QHBoxLayout()
@@ -254,6 +993,25 @@ class PDFPrinterApp(QMainWindow):
             }
         """)
         header_layout.addWidget(add_pdf_button)
+
+        # Add folder button (Green hover)
+        add_folder_button = QPushButton("📁")
+        add_folder_button.setFixedSize(28, 28)
+        add_folder_button.clicked.connect(lambda: self.import_folders())
+        add_folder_button.setToolTip("Add all PDF files in a folder and its subfolders")
+        add_folder_button.setStyleSheet("""
+            QPushButton {
+                background-color: transparent;
+                border: none;
+                padding: 0px;
+                font-size: 15px;
+                color: #ffffff;
+            }
+            QPushButton:hover {
+                color: #4CAF50;
+            }
+        """)
+        header_layout.addWidget(add_folder_button)
         
         # Remove PDF button (Red hover)
         remove_pdf_button = QPushButton("-")
@@ -276,10 +1034,15 @@ class PDFPrinterApp(QMainWindow):
         
         all_files_layout.addLayout(header_layout)
 
-        # Search bar
+        # Search bar; filtering waits for a pause in typing
         self.search_bar = QLineEdit()
-        self.search_bar.setPlaceholderText("Search files...")
-        self.search_bar.textChanged.connect(self.filter_files)
+        self.search_bar.setPlaceholderText("Search files... (words, folder/, ~fuzzy)")
+        self.search_bar.setToolTip(QUERY_HELP)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(120)
+        self.search_timer.timeout.connect(lambda: self.filter_files(self.search_bar.text()))
+        self.search_bar.textChanged.connect(self.search_timer.start)
         self.search_bar.setFixedWidth(fixed_width)
         self.search_bar.setFixedHeight(32)  # Match height with other elements
         self.search_bar.setStyleSheet("""
@@ -298,13 +1061,13 @@ class PDFPrinterApp(QMainWindow):
         list_layout.setContentsMargins(0, 0, 0, 0)
         list_layout.setSpacing(0)
 
-        # Files list
-        self.all_files_list = QListWidget(self)
-        self.all_files_list.setSelectionMode(QListWidget.ExtendedSelection)
-        self.all_files_list.setFixedWidth(fixed_width)
-        self.all_files_list.setMinimumHeight(200)  # Set consistent height
-        self.all_files_list.itemDoubleClicked.connect(self.on_pdf_double_click)
-        list_layout.addWidget(self.all_files_list, 0, 0, 1, 1)
+        # Files list; the proxy shows only the rows matching the search bar
+        self.all_files_model = FileListModel(self.describe_file, self)
+        self.all_files_proxy = FileSearchProxy(self)
+        self.all_files_proxy.setSourceModel(self.all_files_model)
+        self.all_files_view = self.create_file_list_view(self.all_files_proxy, fixed_width)
+        self.all_files_view.doubleClicked.connect(self.on_pdf_double_click)
+        list_layout.addWidget(self.all_files_view, 0, 0, 1, 1)
 
         # Sort buttons in bottom-right corner
         sort_buttons_widget = QWidget()
@@ -492,23 +1255,26 @@ class PDFPrinterApp(QMainWindow):
         self.preview_label = QLabel("PDF Preview")
         right_layout.addWidget(self.preview_label)
 
-        # Create scroll area for previews
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        right_layout.addWidget(self.scroll_area)
-
-        # Create preview widget and layout
-        self.preview_widget = QWidget()
-        self.preview_layout = QGridLayout(self.preview_widget)
-        self.preview_layout.setSpacing(7)
-        self.preview_layout.setContentsMargins(7, 1, 7, 7)
-        self.preview_layout.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-        self.scroll_area.setWidget(self.preview_widget)
-
-        # Connect resize event
-        self.scroll_area.resizeEvent = self.on_scroll_area_resize
+        # Thumbnail grid; the view only paints (and loads) tiles in the viewport
+        self.preview_model = PreviewListModel(self.resolve_preview_key, self.preview_cache.path_for_key, self)
+        self.preview_view = QListView()
+        self.preview_view.setViewMode(QListView.IconMode)
+        self.preview_view.setMovement(QListView.Static)
+        self.preview_view.setResizeMode(QListView.Adjust)
+        self.preview_view.setFlow(QListView.LeftToRight)
+        self.preview_view.setWrapping(True)
+        self.preview_view.setUniformItemSizes(True)
+        self.preview_view.setGridSize(QSize(PREVIEW_SIZE + PREVIEW_SPACING, PREVIEW_SIZE + PREVIEW_SPACING))
+        self.preview_view.setViewportMargins(PREVIEW_MARGIN, 1, PREVIEW_MARGIN, PREVIEW_MARGIN)
+        self.preview_view.setSelectionMode(QListView.NoSelection)
+        self.preview_view.setFocusPolicy(Qt.NoFocus)
+        self.preview_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.preview_view.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.preview_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.preview_view.setStyleSheet("QListView { border: none; }")
+        self.preview_view.setItemDelegate(PreviewTileDelegate(self.preview_view))
+        self.preview_view.setModel(self.preview_model)
+        right_layout.addWidget(self.preview_view)
 
         # Add widgets to main layout
         main_layout.addWidget(left_widget)
@@ -520,8 +1286,8 @@ class PDFPrinterApp(QMainWindow):
         self.setCentralWidget(central_widget)
 
         # Add event filters for keyboard shortcuts
-        self.all_files_list.installEventFilter(self)
-        self.selected_files_list.installEventFilter(self)
+        self.all_files_view.installEventFilter(self)
+        self.selected_files_view.installEventFilter(self)
         self.collections_list.installEventFilter(self)
 
         # About button (Blue hover)
@@ -543,19 +1309,35 @@ class PDFPrinterApp(QMainWindow):
         """)
         right_layout.addWidget(about_button, alignment=Qt.AlignRight | Qt.AlignTop)
 
-    def on_scroll_area_resize(self, event):
-        # Instead of updating directly, start/restart the timer
-        self.resize_timer.start()
-        event.accept()
+    def create_file_list_view(self, model, width):
+        """List view for one of the file lists"""
+        view = QListView(self)
+        view.setObjectName("fileList")
+        view.setModel(model)
+        # Uniform rows skip measuring each item; batched layout keeps typing
+        # responsive while a long list is laid out
+        view.setUniformItemSizes(True)
+        view.setLayoutMode(QListView.Batched)
+        view.setBatchSize(500)
+        view.setSelectionMode(QListView.ExtendedSelection)
+        view.setEditTriggers(QListView.NoEditTriggers)
+        view.setFixedWidth(width)
+        view.setMinimumHeight(200)  # Set consistent height
+        return view
 
     def show_settings(self):
         dialog = QDialog(self)
         dialog.setWindowTitle("Settings")
-        dialog.setFixedSize(400, 400)  # Reduced height since removing collections
+        dialog.setFixedSize(640, 860)
         
         layout = QVBoxLayout(dialog)
         layout.setSpacing(20)
         layout.setContentsMargins(20, 20, 20, 20)
+
+        tabs = QTabWidget()
+        general_tab = QWidget()
+        general_layout = QVBoxLayout(general_tab)
+        general_layout.setSpacing(20)
         
         # Print Settings Group
         print_group = QGroupBox("Print Settings")
@@ -568,8 +1350,103 @@ class PDFPrinterApp(QMainWindow):
         self.double_sided_cb.setChecked(getattr(self, 'add_blank_pages', True))
         self.double_sided_cb.stateChanged.connect(self.update_print_settings)
         print_layout.addWidget(self.double_sided_cb)
-        
-        layout.addWidget(print_group)
+
+        # Merge in the background so Print can start right away
+        speculative_cb = QCheckBox("Merge the selection in the background while it is edited")
+        speculative_cb.setToolTip("Print Selected then only has to hand over the finished job.\n"
+                                  "Keeps the merged job in memory while the selection is kept.")
+        speculative_cb.setChecked(self.speculative_merger is not None)
+        speculative_cb.stateChanged.connect(self.update_speculative_settings)
+        print_layout.addWidget(speculative_cb)
+
+        # Print straight from memory, skipping the disk for new merges
+        memory_cb = QCheckBox("Keep merged jobs in memory instead of writing them to disk")
+        memory_cb.setToolTip("Direct printing reads the job from memory; viewers get a file on a RAM disk.\n"
+                             "Jobs merged this way are not kept for reprinting.")
+        memory_cb.setChecked(getattr(self, 'print_from_memory', False))
+        memory_cb.stateChanged.connect(self.update_memory_settings)
+        print_layout.addWidget(memory_cb)
+
+        # Direct printing (Windows) sends pages as images, rendered ahead on a background thread
+        lookahead_layout = QHBoxLayout()
+        lookahead_layout.addWidget(QLabel("Pages rendered ahead when printing:"))
+        lookahead_spin = QSpinBox()
+        lookahead_spin.setRange(0, 32)
+        lookahead_spin.setValue(getattr(self, 'print_lookahead', DEFAULT_LOOKAHEAD))
+        lookahead_spin.setToolTip("More pages keep the printer busy on slow documents but use more memory.\n"
+                                  "0 renders each page only when the printer is ready for it.")
+        lookahead_spin.valueChanged.connect(lambda value: self.save_setting('print_lookahead', value))
+        lookahead_layout.addWidget(lookahead_spin)
+        lookahead_layout.addStretch()
+        print_layout.addLayout(lookahead_layout)
+
+        # Merged jobs are kept so identical batches reprint without merging
+        job_cache_layout = QHBoxLayout()
+        job_cache_layout.addWidget(QLabel("Keep merged jobs for reprinting, up to (MB):"))
+        job_cache_spin = QSpinBox()
+        job_cache_spin.setRange(0, 100000)
+        job_cache_spin.setSingleStep(100)
+        job_cache_spin.setValue(self.job_cache.max_bytes // (1024 * 1024))
+        job_cache_spin.setToolTip("The last job is always kept; 0 keeps only that one")
+        job_cache_spin.valueChanged.connect(self.update_job_cache_budget)
+        job_cache_layout.addWidget(job_cache_spin)
+        job_cache_layout.addStretch()
+        print_layout.addLayout(job_cache_layout)
+
+        # Lower resolution and fewer colours make smaller, faster print jobs
+        raster_layout = QHBoxLayout()
+        raster_layout.addWidget(QLabel("Resolution (dpi):"))
+        dpi_spin = QSpinBox()
+        dpi_spin.setRange(72, 600)
+        dpi_spin.setSingleStep(25)
+        dpi_spin.setValue(getattr(self, 'print_dpi', DEFAULT_RASTER_DPI))
+        dpi_spin.setToolTip("Match the printer, e.g. 203 or 300 for thermal label printers")
+        dpi_spin.valueChanged.connect(lambda value: self.save_setting('print_dpi', value))
+        raster_layout.addWidget(dpi_spin)
+        raster_layout.addWidget(QLabel("Colour:"))
+        color_combo = QComboBox()
+        for mode, label in zip(COLOR_MODES, ["Colour", "Grayscale", "Black and white (dithered)"]):
+            color_combo.addItem(label, mode)
+        color_combo.setCurrentIndex(COLOR_MODES.index(getattr(self, 'print_color_mode', 'rgb')))
+        color_combo.setToolTip("Black and white suits thermal and laser label printers")
+        color_combo.currentIndexChanged.connect(
+            lambda index: self.save_setting('print_color_mode', color_combo.itemData(index)))
+        raster_layout.addWidget(color_combo)
+        raster_layout.addStretch()
+        print_layout.addLayout(raster_layout)
+        
+        general_layout.addWidget(print_group)
+
+        # File List Group
+        list_group = QGroupBox("File List")
+        list_layout = QVBoxLayout(list_group)
+        list_layout.setSpacing(10)
+        list_layout.setContentsMargins(10, 20, 10, 10)
+
+        # Files already listed (by path) are always skipped; this also compares contents
+        dedupe_cb = QCheckBox("Skip files identical to a listed file when adding")
+        dedupe_cb.setToolTip("Compares file contents, so copies under other names are skipped too")
+        dedupe_cb.setChecked(getattr(self, 'dedupe_by_content', False))
+        dedupe_cb.stateChanged.connect(self.update_dedupe_settings)
+        list_layout.addWidget(dedupe_cb)
+
+        # File name patterns for folder imports
+        patterns_layout = QGridLayout()
+        patterns_layout.addWidget(QLabel("Folder import, include:"), 0, 0)
+        include_edit = QLineEdit(getattr(self, 'import_include', ", ".join(DEFAULT_INCLUDE)))
+        include_edit.setToolTip("File name patterns to add, e.g. *.pdf, label_*.pdf\n"
+                                "Patterns with / match the path below the folder, e.g. 2024/*.pdf")
+        include_edit.textChanged.connect(lambda text: self.save_setting('import_include', text))
+        patterns_layout.addWidget(include_edit, 0, 1)
+        patterns_layout.addWidget(QLabel("Exclude:"), 1, 0)
+        exclude_edit = QLineEdit(getattr(self, 'import_exclude', ""))
+        exclude_edit.setPlaceholderText("e.g. .*, old, *_draft.pdf")
+        exclude_edit.setToolTip("Files and folders to skip; a skipped folder is not searched")
+        exclude_edit.textChanged.connect(lambda text: self.save_setting('import_exclude', text))
+        patterns_layout.addWidget(exclude_edit, 1, 1)
+        list_layout.addLayout(patterns_layout)
+
+        general_layout.addWidget(list_group)
         
         # Cache Management Group
         cache_group = QGroupBox("Cache Management")
@@ -578,21 +1455,48 @@ class PDFPrinterApp(QMainWindow):
         cache_layout.setContentsMargins(10, 20, 10, 10)
         
         # Cache info
-        cache_size = self.get_cache_size()
-        cache_info = QLabel(f"Cache Size: {cache_size:.2f} MB")
+        cache_info = QLabel(self.get_cache_summary())
         cache_layout.addWidget(cache_info)
+
+        # Cache budgets; least recently used previews are evicted beyond these
+        budget_layout = QHBoxLayout()
+        budget_layout.addWidget(QLabel("Max size (MB):"))
+        max_mb_spin = QSpinBox()
+        max_mb_spin.setRange(10, 10000)
+        max_mb_spin.setValue(self.preview_cache.max_bytes // (1024 * 1024))
+        max_mb_spin.valueChanged.connect(
+            lambda value: self.update_cache_budget(max_bytes=value * 1024 * 1024))
+        budget_layout.addWidget(max_mb_spin)
+        budget_layout.addWidget(QLabel("Max previews:"))
+        max_entries_spin = QSpinBox()
+        max_entries_spin.setRange(100, 1000000)
+        max_entries_spin.setSingleStep(1000)
+        max_entries_spin.setValue(self.preview_cache.max_entries)
+        max_entries_spin.valueChanged.connect(
+            lambda value: self.update_cache_budget(max_entries=value))
+        budget_layout.addWidget(max_entries_spin)
+        cache_layout.addLayout(budget_layout)
+
+        # Share thumbnails between identical files instead of keying by path
+        content_hash_cb = QCheckBox("Identify previews by file content")
+        content_hash_cb.setChecked(self.preview_cache.use_content_hash)
+        content_hash_cb.stateChanged.connect(self.update_cache_settings)
+        cache_layout.addWidget(content_hash_cb)
         
         # Clear cache button
         clear_cache_button = QPushButton("Clear Preview Cache")
         clear_cache_button.setFixedHeight(32)
         clear_cache_button.clicked.connect(self.clear_cache)
-        clear_cache_button.clicked.connect(lambda: cache_info.setText(f"Cache Size: {self.get_cache_size():.2f} MB"))
+        clear_cache_button.clicked.connect(lambda: cache_info.setText(self.get_cache_summary()))
         cache_layout.addWidget(clear_cache_button)
         
-        layout.addWidget(cache_group)
+        general_layout.addWidget(cache_group)
         
         # Add stretch to push everything to the top
-        layout.addStretch()
+        general_layout.addStretch()
+        tabs.addTab(general_tab, "General")
+        tabs.addTab(self.create_performance_tab(), "Performance")
+        layout.addWidget(tabs)
         
         # Close button
         close_button = QPushButton("Close")
@@ -646,53 +1550,138 @@ class PDFPrinterApp(QMainWindow):
                 left: 10px;
                 padding: 0 3px 0 3px;
             }
+            QTabWidget::pane {
+                border: 1px solid #555555;
+            }
+            QTabBar::tab {
+                background-color: #3a3a3a;
+                color: #ffffff;
+                padding: 5px 12px;
+            }
+            QTabBar::tab:selected {
+                background-color: #4a4a4a;
+            }
+            QTableWidget {
+                background-color: #2b2b2b;
+                color: #ffffff;
+                gridline-color: #444444;
+                font-size: 10pt;
+            }
+            QHeaderView::section {
+                background-color: #3a3a3a;
+                color: #ffffff;
+                border: none;
+                padding: 3px;
+            }
         """)
         
         dialog.exec_()
 
-    def get_cache_size(self):
-        """Get the size of the preview cache in MB"""
-        total_size = 0
+    def create_performance_tab(self):
+        """Settings tab listing the timing histograms and counters"""
+        tab = QWidget()
+        tab_layout = QVBoxLayout(tab)
+
+        table = QTableWidget(0, 7)
+        table.setHorizontalHeaderLabels(["Metric", "Count", "Total ms", "Mean ms", "p50 ms", "p95 ms", "Max ms"])
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in range(1, 7):
+            table.horizontalHeader().setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        tab_layout.addWidget(table)
+        self.fill_performance_table(table)
+
+        buttons_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(lambda: self.fill_performance_table(table))
+        buttons_layout.addWidget(refresh_button)
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(lambda: (metrics.reset(), self.fill_performance_table(table)))
+        buttons_layout.addWidget(reset_button)
+        export_json_button = QPushButton("Export JSON...")
+        export_json_button.clicked.connect(lambda: self.export_metrics(chrome_trace=False))
+        buttons_layout.addWidget(export_json_button)
+        export_trace_button = QPushButton("Export Trace...")
+        export_trace_button.setToolTip("Chrome trace file, for chrome://tracing or ui.perfetto.dev")
+        export_trace_button.clicked.connect(lambda: self.export_metrics(chrome_trace=True))
+        buttons_layout.addWidget(export_trace_button)
+        tab_layout.addLayout(buttons_layout)
+        return tab
+
+    def fill_performance_table(self, table):
+        snapshot = metrics.snapshot()
+        rows = [(name, [summary['count'], summary['total_ms'], summary['mean_ms'],
+                        summary['p50_ms'], summary['p95_ms'], summary['max_ms']])
+                for name, summary in snapshot['histograms'].items()]
+        rows += [(name, [value]) for name, value in snapshot['counters'].items()]
+        table.setRowCount(len(rows))
+        for row, (name, values) in enumerate(rows):
+            table.setItem(row, 0, QTableWidgetItem(name))
+            for column, value in enumerate(values, 1):
+                item = QTableWidgetItem(f"{value:g}" if isinstance(value, float) else str(value))
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+
+    def export_metrics(self, chrome_trace=False):
+        if chrome_trace:
+            file_name, _ = QFileDialog.getSaveFileName(
+                self, "Export Trace", "pdf_print_station_trace.json", "Chrome Trace (*.json)")
+        else:
+            file_name, _ = QFileDialog.getSaveFileName(
+                self, "Export Metrics", "pdf_print_station_metrics.json", "JSON (*.json)")
+        if not file_name:
+            return
         try:
-            for file in os.listdir(self.temp_dir):
-                file_path = os.path.join(self.temp_dir, file)
-                if os.path.isfile(file_path):
-                    total_size += os.path.getsize(file_path)
+            if chrome_trace:
+                metrics.export_chrome_trace(file_name)
+            else:
+                metrics.export_json(file_name)
         except Exception as e:
-            print(f"Error calculating cache size: {e}")
-        return total_size / (1024 * 1024)  # Convert to MB
+            self.show_error_dialog("Export Error", f"Failed to export metrics: {str(e)}")
+
+    def get_cache_size(self):
+        """Get the size of the preview cache in MB"""
+        return self.preview_cache.total_bytes / (1024 * 1024)  # Convert to MB
+
+    def get_cache_summary(self):
+        """Get cache size and hit/miss counts for the settings dialog"""
+        stats = self.preview_cache.stats()
+        return (f"Cache Size: {self.get_cache_size():.2f} MB ({stats['entries']} previews)\n"
+                f"Hits: {stats['hits']}   Misses: {stats['misses']}   "
+                f"Evicted: {stats['evictions']}")
+
+    def update_cache_budget(self, max_bytes=None, max_entries=None):
+        if max_bytes is not None:
+            self.preview_cache.max_bytes = max_bytes
+            self.settings.setValue('cache/preview_max_mb', max_bytes // (1024 * 1024))
+        if max_entries is not None:
+            self.preview_cache.max_entries = max_entries
+            self.settings.setValue('cache/preview_max_entries', max_entries)
+        self.preview_cache.evict_in_background()
 
     def clear_cache(self):
         try:
-            for file in os.listdir(self.temp_dir):
-                try:
-                    os.remove(os.path.join(self.temp_dir, file))
-                except Exception as e:
-                    print(f"Error removing temp file {file}: {e}")
+            self.preview_cache.clear()
+            # Drop decoded thumbnails and re-render the previews of listed files
+            self.preview_model.clear_pixmaps()
+            for file_path in self.all_files_model.paths:
+                self.generate_preview(file_path)
             self.update_preview()  # Refresh the preview after clearing cache
         except Exception as e:
             print(f"Error clearing cache: {e}")
 
     def clear_old_previews(self, max_age_days=7):
-        """Clear previews older than max_age_days"""
+        """Clear previews not used in the last max_age_days"""
         try:
-            current_time = time.time()
-            for file in os.listdir(self.temp_dir):
-                file_path = os.path.join(self.temp_dir, file)
-                if os.path.isfile(file_path):
-                    file_age = current_time - os.path.getmtime(file_path)
-                    if file_age > (max_age_days * 24 * 60 * 60):
-                        try:
-                            os.remove(file_path)
-                        except Exception as e:
-                            print(f"Error removing old preview {file}: {e}")
+            self.preview_cache.evict_older_than(max_age_days * 24 * 60 * 60)
         except Exception as e:
             print(f"Error clearing old previews: {e}")
 
     # Add selected PDFs to the print selection
     def add_to_selection(self):
-        selected_items = self.all_files_list.selectedItems()  # Get all selected items
-        if not selected_items:
+        selected_rows = self.selected_rows(self.all_files_view)
+        if not selected_rows:
             return
 
         # Show loading indicator
@@ -703,17 +1692,9 @@ class PDFPrinterApp(QMainWindow):
         QApplication.processEvents()
 
         try:
-            # Get list of files already in selection
-            existing_items = [self.selected_files_list.item(i).data(Qt.UserRole) 
-                             for i in range(self.selected_files_list.count())]
-            
-            # Add new items without updating preview for each one
-            for item in selected_items:
-                file_path = item.data(Qt.UserRole)
-                if file_path not in existing_items:
-                    new_item = QListWidgetItem(item.text())
-                    new_item.setData(Qt.UserRole, file_path)
-                    self.selected_files_list.addItem(new_item)
+            # Skip files already in selection; new ones are inserted in one batch
+            records = self.all_files_model.records(selected_rows)
+            self.selected_files_model.append(self.selected_files_model.unique_entries(records))
         finally:
             loading_label.hide()
             loading_label.deleteLater()
@@ -723,8 +1704,7 @@ class PDFPrinterApp(QMainWindow):
 
     # Remove PDFs from the print selection
     def remove_from_selection(self):
-        for item in self.selected_files_list.selectedItems():
-            self.selected_files_list.takeItem(self.selected_files_list.row(item))
+        self.selected_files_model.remove_rows(self.selected_rows(self.selected_files_view))
         self.update_preview()
 
     # Add new PDFs to the application
@@ -735,149 +1715,240 @@ class PDFPrinterApp(QMainWindow):
         if not file_names:
             return
         
-        progress = QProgressDialog("Processing PDF files...", "Cancel", 0, len(file_names), self)
-        progress.setWindowModality(Qt.WindowModal)
-        
-        try:
-            for i, file_name in enumerate(file_names):
-                if progress.wasCanceled():
-                    break
-                
-                progress.setValue(i)
-                if os.path.exists(file_name) and file_name.lower().endswith('.pdf'):
-                    if self.generate_preview(file_name):
-                        item = QListWidgetItem(os.path.basename(file_name))
-                        item.setData(Qt.UserRole, file_name)
-                        self.all_files_list.addItem(item)
-        finally:
-            progress.setValue(len(file_names))
-            self.save_pdf_list()
+        # Items appear immediately; previews render in the background
+        with metrics.timer('ui.add_files', files=len(file_names)):
+            new_entries = self.new_library_entries(
+                [(file_name, None) for file_name in file_names
+                 if os.path.isfile(file_name) and file_name.lower().endswith('.pdf')])
+            self.all_files_model.append(new_entries)
+            for file_name, _ in new_entries:
+                self.generate_preview(file_name)
+        if new_entries:
+            self.save_pdf_list(added=[file_name for file_name, _ in new_entries])
+
+    def new_library_entries(self, entries, replace=False, size_cache=None):
+        """Drop entries already in All PDF Files (unless replacing it) or repeated in entries.
+
+        With dedupe_by_content, files with the same contents as a listed
+        file or an earlier entry are dropped as well.
+        """
+        unique = self.all_files_model.unique_entries(entries, skip_listed=not replace)
+        if getattr(self, 'dedupe_by_content', False) and unique:
+            existing = [] if replace else self.all_files_model.paths
+            duplicates = content_duplicates(existing, [path for path, _ in unique], size_cache)
+            unique = [entry for entry in unique if entry[0] not in duplicates]
+        if len(unique) < len(entries):
+            print(f"Skipped {len(entries) - len(unique)} duplicate files")
+        return unique
+
+    def import_folders(self, folders=None):
+        """Add every PDF below the given folders; they are found on a background thread"""
+        if not folders:
+            folder = QFileDialog.getExistingDirectory(self, "Add Folder")
+            if not folder:
+                return
+            folders = [folder]
+        include = parse_patterns(getattr(self, 'import_include', '')) or list(DEFAULT_INCLUDE)
+        exclude = parse_patterns(getattr(self, 'import_exclude', ''))
+
+        # Not modal: found files appear in the list while the search goes on
+        progress = QProgressDialog("Looking for PDF files...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Adding Folder")
+        progress.setWindowModality(Qt.NonModal)
+        progress.setMinimumDuration(500)
+
+        worker = FolderImportWorker(self)
+        worker.progress_dialog = progress
+        worker.batch_ready.connect(lambda batch: self.on_import_batch(worker, batch))
+        worker.progress.connect(lambda folders_scanned, found: self.on_import_progress(worker, folders_scanned, found))
+        worker.finished.connect(lambda cancelled: self.on_import_finished(worker, cancelled))
+        progress.canceled.connect(worker.cancel)
+        self.import_workers.add(worker)
+        worker.start(folders, include, exclude)
+
+    def on_import_batch(self, worker, batch):
+        if worker.cancelled.is_set():
+            return  # Batches already queued when Cancel was pressed
+        with metrics.timer('ui.import_batch', files=len(batch)):
+            new_entries = self.new_library_entries([(file_path, None) for file_path in batch],
+                                                   size_cache=worker.size_cache)
+            self.all_files_model.append(new_entries)
+            for file_path, _ in new_entries:
+                self.generate_preview(file_path)
+        if new_entries:
+            worker.added += len(new_entries)
+            self.save_pdf_list(added=[file_path for file_path, _ in new_entries])
+
+    def on_import_progress(self, worker, folders_scanned, found):
+        if worker.progress_dialog is not None:
+            worker.progress_dialog.setLabelText(
+                f"Looking for PDF files...\n{folders_scanned} folders searched, "
+                f"{found} PDFs found, {worker.added} added")
+
+    def on_import_finished(self, worker, cancelled):
+        self.import_workers.discard(worker)
+        if worker.progress_dialog is not None:
+            worker.progress_dialog.close()
+            worker.progress_dialog.deleteLater()
+            worker.progress_dialog = None
+        print(f"Folder import {'cancelled' if cancelled else 'finished'}: added {worker.added} files")
+        worker.deleteLater()
 
     # Remove PDFs from the application
     def remove_pdf(self):
-        for item in self.all_files_list.selectedItems():
-            self.all_files_list.takeItem(self.all_files_list.row(item))
-        self.save_pdf_list()
+        rows = self.selected_rows(self.all_files_view)
+        if rows:
+            self.all_files_model.remove_rows(rows)
+            self.save_pdf_list(removed_rows=rows)
+
+    def selected_rows(self, view):
+        """File list model rows selected in a view, in list order"""
+        # Read the selection as ranges; selectedRows() builds an index per row
+        rows = []
+        for selection_range in view.selectionModel().selection():
+            rows.extend(range(selection_range.top(), selection_range.bottom() + 1))
+        if isinstance(view.model(), FileSearchProxy):
+            rows = view.model().source_rows(rows)
+        return sorted(set(rows))
 
     # Update the PDF preview
     def update_preview(self):
+        """Sync the preview grid with the selection; only changed rows are touched"""
         try:
-            # Clear previous previews
-            for i in reversed(range(self.preview_layout.count())): 
-                widget = self.preview_layout.itemAt(i).widget()
-                if widget:
-                    widget.setParent(None)
-                    widget.deleteLater()
-            
-            import gc
-            gc.collect()
-
-            # Fixed sizes and spacing
-            preview_size = 160
-            spacing = 7
-            side_margin = 7
-            top_margin = 1
-            
-            # Calculate number of columns based on viewport width
-            viewport_width = self.scroll_area.viewport().width()
-            item_width = preview_size + spacing
-            columns = max(1, (viewport_width - 2 * side_margin) // item_width)
-            
-            # Configure grid layout
-            self.preview_layout.setSpacing(spacing)
-            self.preview_layout.setContentsMargins(side_margin, top_margin, side_margin, side_margin)
-            self.preview_layout.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-            
-            # Force the preview widget to use at least the viewport width
-            self.preview_widget.setMinimumWidth(viewport_width - 20)
-            
-            # Add previews to grid
-            row = col = 0
-            for i in range(self.selected_files_list.count()):
-                file_name = self.selected_files_list.item(i).data(Qt.UserRole)
-                preview_path = os.path.join(self.temp_dir, f"preview_{os.path.basename(file_name)}.png")
-                
-                if os.path.exists(preview_path):
-                    label = QLabel()
-                    label.setFixedSize(preview_size, preview_size)
-                    pixmap = QPixmap(preview_path)
-                    scaled_pixmap = pixmap.scaled(preview_size, preview_size,
-                                                Qt.KeepAspectRatio, 
-                                                Qt.SmoothTransformation)
-                    
-                    label.setPixmap(scaled_pixmap)
-                    label.setAlignment(Qt.AlignCenter)
-                    label.setStyleSheet("QLabel { background-color: #2b2b2b; }")
-                    
-                    self.preview_layout.addWidget(label, row, col)
-                    
-                    col += 1
-                    if col >= columns:
-                        col = 0
-                        row += 1
-                
+            self.preview_model.set_files(self.selected_files_model.paths)
         except Exception as e:
             print(f"Error updating preview: {e}")
 
+    def resolve_preview_key(self, file_path):
+        """Get the cache key of a tile's thumbnail, re-queueing a render if it was evicted"""
+        key = self.get_preview_key(file_path)
+        if key is None or self.preview_pool.gave_up(file_path, key):
+            return None
+        if self.preview_cache.lookup(key) is None:
+            self.generate_preview(file_path)
+            return None
+        return key
+
     # Filter PDF files based on search text
     def filter_files(self, text):
-        for i in range(self.all_files_list.count()):
-            item = self.all_files_list.item(i)
-            file_name = item.data(Qt.UserRole)
-            item.setHidden(text.lower() not in os.path.basename(file_name).lower())
+        # The search index narrows the previous matches while the query grows
+        with metrics.timer('ui.filter'):
+            self.all_files_proxy.set_query(text)
 
     # Save the list of PDFs to a JSON file
-    def save_pdf_list(self):
+    def save_pdf_list(self, added=None, removed_rows=None):
+        """Schedule a write of the file list; changes made in quick succession are written together.
+
+        Passing the appended paths or the removed rows lets the list store
+        journal the change instead of rewriting the whole list.
+        """
+        if (added is None and removed_rows is None) or self.list_changes is None:
+            self.list_changes = None
+        else:
+            self.list_changes.append((list(added or ()), list(removed_rows or ())))
+        self.list_save_timer.start()
+
+    def flush_pdf_list(self):
+        """Hand pending list changes to the writer thread"""
+        self.list_save_timer.stop()
+        changes, self.list_changes = self.list_changes, []
+        if changes == []:
+            return
+        if self.list_writer is None:
+            from concurrent.futures import ThreadPoolExecutor
+            # One thread, so writes land in the order they were made
+            self.list_writer = ThreadPoolExecutor(max_workers=1)
+        # The writer gets its own copy; the model keeps changing on this thread
+        self.list_writer.submit(self.write_pdf_list, list(self.all_files_model.paths), changes)
+
+    def write_pdf_list(self, pdf_files, changes):
+        # Runs on the writer thread
         try:
-            pdf_files = [self.all_files_list.item(i).data(Qt.UserRole) 
-                         for i in range(self.all_files_list.count())]
-            save_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_list.json')
-            with open(save_path, 'w', encoding='utf-8') as f:
-                json.dump(pdf_files, f, ensure_ascii=False)
+            if changes is None:
+                self.list_store.save(pdf_files)
+            else:
+                self.list_store.record(pdf_files, changes)
         except Exception as e:
             print(f"Error saving PDF list: {e}")
 
     # Load the list of PDFs from a JSON file
     def load_pdf_list(self):
         try:
-            pdf_list_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_list.json')
-            if not os.path.exists(pdf_list_path):
-                return
+            pdf_files = self.list_store.load()
                 
-            with open(pdf_list_path, 'r', encoding='utf-8') as f:
-                pdf_files = json.load(f)
+            # Show the saved list as-is; files are checked once the window is up
+            with metrics.timer('ui.load_list', files=len(pdf_files)):
+                self.all_files_model.reset([(file_path, None) for file_path in pdf_files])
+            self.startup_files = pdf_files
                 
-            # Show loading indicator
-            loading_label = QLabel("Loading previews...", self)
-            loading_label.setStyleSheet("background-color: #3a3a3a; padding: 10px; border-radius: 5px;")
-            loading_label.move(self.rect().center() - loading_label.rect().center())
-            loading_label.show()
-            QApplication.processEvents()
-            
+        except ValueError:
+            # Keep the unreadable list for recovery rather than overwriting it with the next save
             try:
-                for file_path in pdf_files:
-                    if not os.path.exists(file_path):
-                        continue
-                        
-                    if self.generate_preview(file_path):
-                        item = QListWidgetItem(os.path.basename(file_path))
-                        item.setData(Qt.UserRole, file_path)
-                        self.all_files_list.addItem(item)
-            finally:
-                loading_label.hide()
-                loading_label.deleteLater()
-                
-        except FileNotFoundError:
-            print("No saved PDF list found. Starting with an empty list.")
-        except json.JSONDecodeError:
+                corrupt_path = self.list_store.set_aside()
+            except OSError as e:
+                corrupt_path = None
+                print(f"Error moving the unreadable file list aside: {e}")
             print("Error reading the saved file list. Starting with an empty list.")
+            if corrupt_path:
+                QTimer.singleShot(0, lambda: QMessageBox.warning(
+                    self, "File List",
+                    f"The saved file list could not be read and was kept as:\n{corrupt_path}\n\n"
+                    "Starting with an empty list."))
         except Exception as e:
             print(f"An error occurred while loading the PDF list: {e}")
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if 'window_shown' not in self.startup_trace.marks:
+            self.startup_trace.mark('window_shown')
+            if IMPORT_PROFILER is not None:
+                print(IMPORT_PROFILER.report())
+            # Let the window paint before starting background validation
+            QTimer.singleShot(0, self.start_startup_validation)
+
+    def start_startup_validation(self):
+        """Stat the saved files in the background and queue missing previews"""
+        file_paths = getattr(self, 'startup_files', [])
+        self.startup_files = []
+        self.startup_missing = set()
+        self.startup_worker = FileStatWorker(self)
+        self.startup_worker.batch_ready.connect(self.on_startup_stats)
+        self.startup_worker.finished.connect(self.on_startup_validation_finished)
+        self.startup_worker.start(file_paths)
+
+    def on_startup_stats(self, batch):
+        # One stat per file: it checks existence and validates the
+        # document index entry, which holds the thumbnail key
+        for file_path, stat in batch:
+            if stat is None:
+                self.startup_missing.add(file_path)
+            else:
+                self.generate_preview(file_path, stat)
+
+    def on_startup_validation_finished(self):
+        if self.startup_missing:
+            # Saved files that no longer exist are dropped, as before
+            self.all_files_model.remove_paths(self.startup_missing)
+            print(f"Removed {len(self.startup_missing)} missing files from the list")
+            self.save_pdf_list()
+        self.startup_trace.mark('files_validated')
+        self.startup_validation_done = True
+        if not self.preview_pool.pending:
+            self.startup_trace.mark('all_thumbnails')
+
     # Print selected PDFs
     def print_pdf(self):
-        selected_files = [self.selected_files_list.item(i).data(Qt.UserRole) 
-                          for i in range(self.selected_files_list.count())]
+        self.print_files(list(self.selected_files_model.paths), getattr(self, 'add_blank_pages', True))
+
+    def reprint_last_job(self):
+        """Print the last job again; instant if its files haven't changed since"""
+        last = self.job_cache.last_job()
+        if last is None:
+            self.show_error_dialog("Nothing to Reprint", "No job has been printed yet.")
+            return
+        self.print_files(last['files'], last['settings'].get('add_blank_pages', True))
+
+    def print_files(self, selected_files, add_blank_pages):
         if not selected_files:
             self.show_error_dialog("No Files Selected", "Please select PDF files to print.")
             return
@@ -888,87 +1959,26 @@ class PDFPrinterApp(QMainWindow):
             progress.setWindowModality(Qt.WindowModal)
             progress.setWindowTitle("Processing PDFs")
             progress.setMinimumDuration(0)  # Show immediately
-            
-            # Create a PDF document containing all selected PDFs
-            combined_pdf = fitz.open()
-            failed_files = []
-            
-            for i, pdf_file in enumerate(selected_files):
-                if progress.wasCanceled():
-                    return
-                
-                progress.setValue(i)
-                progress.setLabelText(f"Processing: {os.path.basename(pdf_file)}")
-                
-                if not os.path.exists(pdf_file):
-                    failed_files.append(f"{os.path.basename(pdf_file)} (file not found)")
-                    continue
-                
-                try:
-                    doc = fitz.open(pdf_file)
-                    # Insert the PDF
-                    combined_pdf.insert_pdf(doc)
-                    
-                    # Add blank page if enabled and document has odd number of pages
-                    if getattr(self, 'add_blank_pages', True) and doc.page_count % 2 != 0:
-                        combined_pdf.new_page(-1,  # Insert at end
-                                               width=doc[0].rect.width,  # Match first page dimensions
-                                               height=doc[0].rect.height)
-                    
-                except Exception as e:
-                    failed_files.append(f"{os.path.basename(pdf_file)} ({str(e)})")
-                    continue
-                finally:
-                    doc.close()
-            
-            progress.setValue(len(selected_files))
-            
-            if failed_files:
-                self.show_error_dialog("Print Errors", 
-                    "The following files had errors:\n" + "\n".join(failed_files))
-                if not combined_pdf.page_count:
+
+            # An identical batch (same files, unchanged, same settings) was merged before
+            settings = {'add_blank_pages': add_blank_pages}
+            key = job_key(selected_files, settings)
+            kept_path = self.job_cache.lookup(key)
+            if kept_path is not None:
+                print(f"Printing kept job for {len(selected_files)} files, no merge needed")
+                job = self.spool.add_job(kept_path, key)
+            else:
+                job = self.merge_print_job(selected_files, settings, key, progress)
+                if job is None:
                     return
-            
-            # Save the combined PDF to a temporary file
-            progress.setLabelText("Creating combined PDF file...")
-            temp_pdf_path = os.path.join(os.path.dirname(selected_files[0]), "temp_combined.pdf")
-            combined_pdf.save(temp_pdf_path)
-            combined_pdf.close()
-            
-            # Platform-specific print handling
-            if sys.platform == "darwin":  # macOS
-                os.system(f"open -a 'Preview' '{temp_pdf_path}'")
-            elif sys.platform == "win32":  # Windows
-                # Use native Windows print dialog
-                printer = QPrinter(QPrinter.HighResolution)
-                print_dialog = QPrintDialog(printer, self)
-                if print_dialog.exec_() == QDialog.Accepted:
-                    progress.setLabelText("Printing...")
-                    # Open and print the PDF using PyMuPDF
-                    doc = fitz.open(temp_pdf_path)
-                    for page_num in range(doc.page_count):
-                        if progress.wasCanceled():
-                            break
-                        progress.setValue(page_num)
-                        progress.setLabelText(f"Printing page {page_num + 1} of {doc.page_count}")
-                        
-                        page = doc[page_num]
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                        img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-                        if page_num == 0:
-                            printer.setPageSize(QPageSize(QSizeF(page.rect.width, page.rect.height), QPageSize.Point))
-                        
-                        painter = QPainter(printer)
-                        painter.drawImage(printer.pageRect(), img)
-                        if page_num < doc.page_count - 1:
-                            printer.newPage()
-                        painter.end()
-                    doc.close()
-            else:  # Linux
-                os.system(f"xdg-open '{temp_pdf_path}'")
-            
-            # Clean up the temporary file after a delay
-            QTimer.singleShot(30000, lambda: os.remove(temp_pdf_path) if os.path.exists(temp_pdf_path) else None)
+            self.job_cache.set_last_job(selected_files, settings)
+            self.reprint_button.setEnabled(True)
+
+            try:
+                self.send_to_printer(job, progress)
+            except Exception:
+                self.spool.set_state(job, JOB_FAILED)
+                raise
             
         except Exception as e:
             self.show_error_dialog("Print Error", f"An error occurred while printing: {str(e)}")
@@ -976,6 +1986,146 @@ class PDFPrinterApp(QMainWindow):
         finally:
             progress.close()
 
+    def send_to_printer(self, job, progress):
+        """Print a spooled job and move it on to its next state"""
+        # Platform-specific print handling
+        if sys.platform == "win32":  # Windows
+            from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
+            # Use native Windows print dialog
+            printer = QPrinter(QPrinter.HighResolution)
+            print_dialog = QPrintDialog(printer, self)
+            if print_dialog.exec_() != QDialog.Accepted:
+                self.spool.set_state(job, JOB_CANCELLED)
+                return
+            # Printed straight from memory when the job was merged in memory
+            self.spool.set_state(job, JOB_PRINTING)
+            pages = self.print_rasterized(job.source, QPrinterBackend(printer), progress)
+            self.spool.set_state(job, JOB_CANCELLED if pages is None else JOB_DONE)
+            return
+
+        # Viewers run in their own process and need a file
+        pdf_path = self.spool.file_for(job)
+        self.spool.set_state(job, JOB_HANDED_OFF)
+        if sys.platform == "darwin":  # macOS
+            os.system(f"open -a 'Preview' '{pdf_path}'")
+        else:  # Linux
+            os.system(f"xdg-open '{pdf_path}'")
+
+    def merge_print_job(self, selected_files, settings, key, progress):
+        """Pre-flight and merge a print job; returns its spool job, or None if not printing.
+
+        Merged jobs are stored in the job cache, or kept in memory only if
+        print_from_memory is set.
+        """
+        # Pre-flight: inspect every file in parallel before merging anything
+        add_blank_pages = settings['add_blank_pages']
+        progress.setLabelText("Checking PDFs...")
+
+        def preflight_progress(done, total):
+            progress.setValue(done)
+            return not progress.wasCanceled()
+
+        report = preflight(selected_files, add_blank_pages, progress_callback=preflight_progress,
+                           index=self.metadata_index)
+        self.metadata_index.save()
+        if report is None:
+            return None
+        print(f"Print pre-flight: {report.summary()}, {len(report.broken)} with errors")
+
+        if report.broken:
+            failed_files = [f"{os.path.basename(info['path'])} ({info['error']})" for info in report.broken]
+            if not report.valid:
+                self.show_error_dialog("Print Errors", 
+                    "The following files had errors:\n" + "\n".join(failed_files))
+                return None
+            reply = QMessageBox.question(
+                self, "Print Errors",
+                "The following files had errors and will be skipped:\n" + "\n".join(failed_files) +
+                f"\n\nPrint the remaining {report.summary()}?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+            )
+            if reply != QMessageBox.Yes:
+                return None
+
+        # A file that can't be read (and so has no key) was skipped; key the job by what is merged
+        valid_files = report.valid_files
+        key = key or job_key(valid_files, settings)
+        if key is None:
+            self.show_error_dialog("Print Errors", "Some files changed or disappeared while printing.")
+            return None
+
+        # The background merge may already have built exactly this job
+        if self.speculative_merger is not None:
+            progress.setLabelText("Finishing background merge...")
+            if self.speculative_timer.isActive():
+                self.request_speculative_merge()
+            # Wait in short slices, so the dialog repaints and Cancel works
+            while not self.speculative_merger.wait(0.05):
+                QApplication.processEvents()
+                if progress.wasCanceled():
+                    return None
+            taken = self.speculative_merger.take(valid_files, add_blank_pages)
+            if taken is not None:
+                merged, page_count = taken
+                print(f"Using background merge of {len(valid_files)} files")
+                if isinstance(merged, str):
+                    merged = self.job_cache.store(key, merged, page_count)
+                return self.spool.add_job(merged, key, page_count)
+
+        # Stream the validated PDFs into a combined file chunk by chunk, or into memory
+        in_memory = getattr(self, 'print_from_memory', False)
+        temp_pdf_path = None if in_memory else self.job_cache.temp_path_for_key(key)
+        job = self.spool.new_job(key)
+        progress.setMaximum(len(valid_files))
+
+        def merge_progress(done, total, pdf_file):
+            progress.setValue(done)
+            progress.setLabelText(f"Merging {report.summary()}\n{os.path.basename(pdf_file)}")
+            return not progress.wasCanceled()
+
+        try:
+            result = merge_files(valid_files, temp_pdf_path, add_blank_pages=add_blank_pages,
+                                 progress_callback=merge_progress)
+        except Exception:
+            self.spool.set_state(job, JOB_FAILED)
+            raise
+        if result is None:
+            self.spool.set_state(job, JOB_CANCELLED)
+            return None
+        progress.setValue(len(valid_files))
+        
+        if result.failed:
+            failed_files = [f"{os.path.basename(pdf_file)} ({error})" for pdf_file, error in result.failed]
+            self.show_error_dialog("Print Errors", 
+                "The following files had errors:\n" + "\n".join(failed_files))
+        if not result.page_count:
+            self.spool.set_state(job, JOB_FAILED)
+            return None
+        if in_memory:
+            self.spool.set_ready(job, result.data, result.page_count)
+        else:
+            # Kept for reprinting; the cache budget decides when it is deleted
+            self.spool.set_ready(job, self.job_cache.store(key, result.output_path, result.page_count),
+                                 result.page_count)
+        return job
+
+    def print_rasterized(self, source, backend, progress):
+        """Print a PDF (path or bytes) page by page as images, rendering ahead while earlier pages spool"""
+        progress.setLabelText("Printing...")
+
+        def print_progress(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            if done < total:
+                progress.setLabelText(f"Printing page {done + 1} of {total}")
+            return not progress.wasCanceled()
+
+        return print_raster(source, backend,
+                            dpi=getattr(self, 'print_dpi', DEFAULT_RASTER_DPI),
+                            color_mode=getattr(self, 'print_color_mode', 'rgb'),
+                            lookahead=getattr(self, 'print_lookahead', DEFAULT_LOOKAHEAD),
+                            progress_callback=print_progress)
+
     # Apply dark theme to the application
     def apply_dark_theme(self):
         self.setStyleSheet("""
@@ -994,7 +2144,7 @@ class PDFPrinterApp(QMainWindow):
             QPushButton:hover {
                 background-color: #4a4a4a;
             }
-            QLineEdit, QListWidget {
+            QLineEdit, QListWidget, QListView#fileList {
                 background-color: #3a3a3a;
                 border: 1px solid #555555;
             }
@@ -1019,87 +2169,133 @@ class PDFPrinterApp(QMainWindow):
 
     def cleanup_resources(self):
         # Clear temp preview files that aren't in use
+        # Previews of files not in the current list are kept for later
+        # collections; the cache budget decides what gets evicted.
         if hasattr(self, 'temp_dir') and os.path.exists(self.temp_dir):
-            current_files = set()
-            # Collect currently used preview files
-            for i in range(self.all_files_list.count()):
-                file_name = self.all_files_list.item(i).data(Qt.UserRole)
-                preview_name = f"preview_{os.path.basename(file_name)}.png"
-                current_files.add(preview_name)
-            
-            # Remove only unused preview files
-            for file in os.listdir(self.temp_dir):
-                if file not in current_files:
-                    try:
-                        os.remove(os.path.join(self.temp_dir, file))
-                    except Exception as e:
-                        print(f"Error removing temp file: {e}")
+            try:
+                self.preview_cache.evict()
+                self.preview_cache.remove_orphans()
+                self.preview_cache.save_index()
+            except Exception as e:
+                print(f"Error cleaning preview cache: {e}")
+        try:
+            self.job_cache.remove_orphans()
+        except Exception as e:
+            print(f"Error cleaning print job cache: {e}")
 
     # Call this method when closing the application
     def closeEvent(self, event):
+        for worker in list(self.import_workers):
+            worker.cancel()
+        if self.speculative_merger is not None:
+            self.speculative_merger.shutdown()
+        self.spool.shutdown()
+        self.preview_pool.shutdown()
         self.cleanup_resources()
-        self.save_pdf_list()
+        # Write any pending list changes before the window goes away
+        self.flush_pdf_list()
+        if self.list_writer is not None:
+            self.list_writer.shutdown(wait=True)
+            self.list_writer = None
+        # Keep index entries only for files still in one of the lists
+        listed = self.all_files_model.paths + self.selected_files_model.paths
+        self.metadata_index.retain(listed)
+        self.metadata_index.save()
         event.accept()
 
-    def generate_preview(self, file_path):
-        preview_filename = f"preview_{os.path.basename(file_path)}.png"
-        preview_path = os.path.join(self.temp_dir, preview_filename)
-        
-        if not os.path.exists(preview_path):
-            doc = None
-            try:
-                doc = fitz.open(file_path)
-                if doc.page_count > 0:
-                    page = doc[0]
-                    # Reduced matrix size for better performance
-                    matrix = fitz.Matrix(0.2, 0.2)
-                    # Disable alpha and use RGB colorspace for smaller files
-                    pix = page.get_pixmap(matrix=matrix, alpha=False, colorspace="rgb")
-                    pix.save(preview_path, output="png", jpg_quality=85)
-                else:
-                    print(f"Warning: {file_path} has no pages")
-                    return False
-            except Exception as e:
-                print(f"Error generating preview for {file_path}: {e}")
-                return False
-            finally:
-                if doc:
-                    doc.close()
-        return True
+    def get_preview_key(self, file_path, stat=None):
+        """Get the preview cache key for a PDF, from the document index when current"""
+        entry = self.metadata_index.get(file_path, stat)
+        # A key stored under the other scheme (content vs path) would bypass the toggle
+        if (entry is not None and entry.get('thumbnail_key')
+                and entry.get('thumbnail_scheme') == self.preview_cache.key_scheme):
+            return entry['thumbnail_key']
+        return self.preview_cache.make_key(file_path)
+
+    def get_preview_path(self, file_path):
+        """Get the cached thumbnail path for a PDF, or None if not rendered yet"""
+        key = self.get_preview_key(file_path)
+        return self.preview_cache.lookup(key) if key else None
+
+    def generate_preview(self, file_path, stat=None):
+        """Queue a background render unless an up-to-date preview is cached.
+
+        Returns True when the preview is ready now, False when it is pending.
+        """
+        key = self.get_preview_key(file_path, stat)
+        if key is None:
+            return False
+        if self.preview_cache.lookup(key):
+            return True
+        if self.preview_pool.gave_up(file_path, key):
+            return False
+        self.preview_pool.submit(file_path, key, self.preview_cache.path_for_key(key))
+        return False
+
+    def describe_file(self, file_path):
+        """Tooltip text from the document index (not re-validated, to avoid a stat)"""
+        entry = self.metadata_index.peek(file_path)
+        if entry is None or not entry.get('ok'):
+            return file_path
+        # Page sizes are stored in points; show millimetres
+        width_mm = entry['width'] * 25.4 / 72
+        height_mm = entry['height'] * 25.4 / 72
+        pages = "1 page" if entry['page_count'] == 1 else f"{entry['page_count']} pages"
+        details = f"{pages}, {width_mm:.0f} × {height_mm:.0f} mm"
+        if entry.get('encrypted'):
+            details += ", encrypted"
+        return f"{file_path}\n{details}"
+
+    def on_preview_ready(self, file_path, key, success, info):
+        self.metadata_index.update(info, thumbnail_key=key if success else None,
+                                   key_scheme=self.preview_cache.key_scheme if success else None)
+        if success:
+            # The file lists build tooltips on hover, so they pick up the
+            # page count and size from the index without a refresh
+            self.preview_cache.add(key, file_path)
+            self.preview_cache.evict_in_background()
+        else:
+            # Drop files that can't be rendered, as before previews went async
+            if file_path in self.all_files_model:
+                self.all_files_model.remove_paths([file_path])
+                self.save_pdf_list()
+            if file_path in self.selected_files_model:
+                self.selected_files_model.remove_paths([file_path])
+                self.update_preview()
+            return
+        # Only the preview grid shows thumbnails; fill in the file's tile if it has one
+        self.preview_model.refresh(file_path)
+
+    def on_preview_pending_changed(self, pending):
+        if pending:
+            self.preview_label.setText(f"PDF Preview (rendering {pending} previews...)")
+        else:
+            self.preview_label.setText("PDF Preview")
+            if self.startup_validation_done:
+                self.startup_trace.mark('all_thumbnails')
+            # Persist the indexes once a burst of renders has finished
+            self.preview_cache.save_index()
+            self.metadata_index.save()
 
     def setup_temp_folder(self):
-        # Create temp folder in the same directory as the script
-        self.temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_previews')
+        # Create temp folder in the data folder
+        self.temp_dir = os.path.join(self.data_dir, 'temp_previews')
         if not os.path.exists(self.temp_dir):
             os.makedirs(self.temp_dir)
+        self.preview_cache = PreviewCache(self.temp_dir)
 
     def show_error_dialog(self, title, message):
         QMessageBox.critical(self, title, message)
 
     # Add this new method to handle sorting
     def sort_files(self, ascending=True):
-        # Get all items data from the list
-        items_data = []
-        for i in range(self.all_files_list.count()):
-            item = self.all_files_list.item(i)
-            items_data.append({
-                'text': item.text(),
-                'data': item.data(Qt.UserRole)
-            })
-        
-        # Sort items based on filename
-        items_data.sort(key=lambda x: os.path.basename(x['data']).lower(), 
-                       reverse=not ascending)
-        
-        # Clear and re-add items in sorted order
-        self.all_files_list.clear()
-        for item_data in items_data:
-            new_item = QListWidgetItem(item_data['text'])
-            new_item.setData(Qt.UserRole, item_data['data'])
-            self.all_files_list.addItem(new_item)
-        
-        # Save the sorted list
-        self.save_pdf_list()
+        with metrics.timer('ui.sort'):
+            # Sort rows in place by filename; the search filter and the
+            # selection follow the moved rows
+            self.all_files_model.sort(0, Qt.AscendingOrder if ascending else Qt.DescendingOrder)
+
+            # Save the sorted list
+            self.save_pdf_list()
 
     # Add these new methods for collection management
     def save_collection(self):
@@ -1115,25 +2311,9 @@ class PDFPrinterApp(QMainWindow):
             if not file_name:
                 return
                 
-            # Add .pdfcol extension if not present
-            if not file_name.endswith('.pdfcol'):
-                file_name += '.pdfcol'
-            
-            # Save collection
-            collection_data = {
-                'files': [
-                    {
-                        'path': self.all_files_list.item(i).data(Qt.UserRole),
-                        'name': self.all_files_list.item(i).text()
-                    }
-                    for i in range(self.all_files_list.count())
-                ],
-                'date_saved': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'version': '1.0'
-            }
-            
-            with open(file_name, 'w', encoding='utf-8') as f:
-                json.dump(collection_data, f, ensure_ascii=False, indent=2)
+            # Save collection (write_collection adds the .pdfcol extension if missing)
+            write_collection(file_name, [CollectionEntry(path, name)
+                                         for path, name in self.all_files_model.entries()])
                 
             self.update_collections_list()
             QMessageBox.information(self, "Success", "Collection saved successfully!")
@@ -1154,12 +2334,7 @@ class PDFPrinterApp(QMainWindow):
                 return
                 
             # Load collection data
-            with open(file_path, 'r', encoding='utf-8') as f:
-                collection_data = json.load(f)
-                
-            # Verify version compatibility
-            if 'version' not in collection_data:
-                raise ValueError("Invalid collection file format")
+            entries = read_collection(file_path)
                 
             # Ask user about loading behavior
             msg_box = QMessageBox()
@@ -1176,20 +2351,26 @@ class PDFPrinterApp(QMainWindow):
             if clicked_button == cancel_button:
                 return
                 
-            # Clear list if replacing
-            if clicked_button == replace_button:
-                self.all_files_list.clear()
-            
             # Add files from collection
             missing_files = []
-            for file_data in collection_data['files']:
-                if os.path.exists(file_data['path']):
-                    item = QListWidgetItem(file_data['name'])
-                    item.setData(Qt.UserRole, file_data['path'])
-                    self.all_files_list.addItem(item)
-                    self.generate_preview(file_data['path'])
+            with metrics.timer('ui.load_collection', files=len(entries)):
+                found = []
+                for entry in entries:
+                    if os.path.exists(entry.path):
+                        found.append(entry)
+                    else:
+                        missing_files.append(entry.name)
+                # Replace the list, or append to it, without duplicate files
+                replace = clicked_button == replace_button
+                found = self.new_library_entries(found, replace=replace)
+                if replace:
+                    self.all_files_model.reset(found)
+                    self.save_pdf_list()
                 else:
-                    missing_files.append(file_data['name'])
+                    self.all_files_model.append(found)
+                    self.save_pdf_list(added=[entry.path for entry in found])
+                for entry in found:
+                    self.generate_preview(entry.path)
             
             # Report any missing files
             if missing_files:
@@ -1199,24 +2380,86 @@ class PDFPrinterApp(QMainWindow):
                     "The following files were not found:\n" + "\n".join(missing_files)
                 )
             
-            self.save_pdf_list()  # Save the updated list
-            
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load collection: {str(e)}")
 
+    def load_settings(self):
+        """Restore the settings saved by save_setting() in earlier runs"""
+        for attribute, (key, value_type) in self.SAVED_SETTINGS.items():
+            if not self.settings.contains(key):
+                continue
+            try:
+                setattr(self, attribute, self.settings.value(key, type=value_type))
+            except TypeError:
+                print(f"Ignoring unreadable setting {key}")
+        if getattr(self, 'print_color_mode', 'rgb') not in COLOR_MODES:
+            self.print_color_mode = 'rgb'
+        # Cache budgets live on the caches themselves
+        mb = 1024 * 1024
+        self.preview_cache.max_bytes = self.settings.value(
+            'cache/preview_max_mb', self.preview_cache.max_bytes // mb, type=int) * mb
+        self.preview_cache.max_entries = self.settings.value(
+            'cache/preview_max_entries', self.preview_cache.max_entries, type=int)
+        self.preview_cache.use_content_hash = self.settings.value(
+            'cache/content_hash', self.preview_cache.use_content_hash, type=bool)
+        self.job_cache.max_bytes = self.settings.value(
+            'cache/job_max_mb', self.job_cache.max_bytes // mb, type=int) * mb
+
+    def save_setting(self, attribute, value):
+        """Apply a setting and keep it for the next run"""
+        setattr(self, attribute, value)
+        self.settings.setValue(self.SAVED_SETTINGS[attribute][0], value)
+
     def update_print_settings(self, state):
         self.add_blank_pages = bool(state)
+        self.schedule_speculative_merge()
+
+    def update_speculative_settings(self, state):
+        if state and self.speculative_merger is None:
+            self.speculative_merger = SpeculativeMerger(
+                None if getattr(self, 'print_from_memory', False) else self.job_cache.cache_dir)
+            self.request_speculative_merge()
+        elif not state and self.speculative_merger is not None:
+            self.speculative_timer.stop()
+            self.speculative_merger.shutdown()
+            self.speculative_merger = None
+
+    def update_memory_settings(self, state):
+        self.print_from_memory = bool(state)
+        if self.speculative_merger is not None:
+            # Restart the background merge so it builds the right kind of job
+            self.update_speculative_settings(0)
+            self.update_speculative_settings(2)
+
+    def schedule_speculative_merge(self, *args):
+        if self.speculative_merger is not None:
+            self.speculative_timer.start()
+
+    def request_speculative_merge(self):
+        self.speculative_timer.stop()
+        if self.speculative_merger is not None:
+            self.speculative_merger.request(list(self.selected_files_model.paths),
+                                            getattr(self, 'add_blank_pages', True))
+
+    def update_job_cache_budget(self, max_mb):
+        self.job_cache.max_bytes = max_mb * 1024 * 1024
+        self.settings.setValue('cache/job_max_mb', max_mb)
+        self.job_cache.evict()
+
+    def update_dedupe_settings(self, state):
+        self.save_setting('dedupe_by_content', bool(state))
+
+    def update_cache_settings(self, state):
+        self.preview_cache.use_content_hash = bool(state)
+        self.settings.setValue('cache/content_hash', bool(state))
 
     def update_collections_list(self):
         """Update the collections list in main window"""
         if hasattr(self, 'collections_list'):
             self.collections_list.clear()
-            if hasattr(self, 'collections_dir') and os.path.exists(self.collections_dir):
-                # Get all collection files and sort them by name
-                collection_files = [f for f in os.listdir(self.collections_dir) if f.endswith('.pdfcol')]
-                collection_files.sort(key=lambda x: x.lower())  # Sort case-insensitive
-                
-                for file in collection_files:
+            if hasattr(self, 'collections_dir'):
+                # Collection files, sorted by name
+                for file in list_collections(self.collections_dir):
                     # Remove the .pdfcol extension for display
                     display_name = os.path.splitext(file)[0]
                     item = QListWidgetItem(display_name)
@@ -1310,18 +2553,13 @@ class PDFPrinterApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load collection: {str(e)}")
 
-    def on_pdf_double_click(self, item):
+    def on_pdf_double_click(self, index):
         """Handle double-click on PDF item to add it to selection"""
         try:
             # Check if item is already in selected list
-            existing_items = [self.selected_files_list.item(i).data(Qt.UserRole) 
-                         for i in range(self.selected_files_list.count())]
-            
-            file_path = item.data(Qt.UserRole)
-            if file_path not in existing_items:
-                new_item = QListWidgetItem(item.text())
-                new_item.setData(Qt.UserRole, file_path)
-                self.selected_files_list.addItem(new_item)
+            file_path = index.data(Qt.UserRole)
+            if file_path not in self.selected_files_model:
+                self.selected_files_model.append([(file_path, index.data(Qt.DisplayRole))])
                 self.update_preview()
         except Exception as e:
             print(f"Error adding file to selection: {e}")
@@ -1340,6 +2578,9 @@ class PDFPrinterApp(QMainWindow):
 # Main function to run the application
 def main():
     import os
+    # Needed for the preview worker processes in frozen (PyInstaller) builds
+    import multiprocessing
+    multiprocessing.freeze_support()
     os.environ['QT_ACCESSIBILITY'] = '0'
     os.environ['QT_LOGGING_RULES'] = '*.debug=false;qt.accessibility.core=false'
     
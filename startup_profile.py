@@ -0,0 +1,54 @@
+import sys
+import time
+import builtins
+
+
+class ImportProfiler:
+    """Times module imports, for the --profile-startup report.
+
+    Wraps builtins.__import__ and records, for every module imported for the
+    first time, its cumulative time (including the modules it imports) and
+    its self time.
+    """
+
+    def __init__(self):
+        self.records = []  # (module name, nesting depth, cumulative seconds, self seconds)
+        self.stack = []  # time spent in child imports, per active import
+        self.original_import = None
+
+    def install(self):
+        if self.original_import is None:
+            self.original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += elapsed
+            self.records.append((name, len(self.stack), elapsed, elapsed - children))
+
+    def report(self, top=15):
+        """Return the import-time breakdown as printable text"""
+        lines = ["Import time breakdown (cumulative / self, ms):"]
+        top_level = [r for r in self.records if r[1] == 0]
+        total = sum(r[2] for r in top_level)
+        for name, _, cumulative, own in sorted(top_level, key=lambda r: r[2], reverse=True):
+            lines.append(f"  {cumulative * 1000:8.1f} {own * 1000:8.1f}  {name}")
+        lines.append(f"  {total * 1000:8.1f}           total of top-level imports")
+        lines.append(f"Slowest modules by self time (top {top}):")
+        for name, _, cumulative, own in sorted(self.records, key=lambda r: r[3], reverse=True)[:top]:
+            lines.append(f"  {cumulative * 1000:8.1f} {own * 1000:8.1f}  {name}")
+        return "\n".join(lines)
@@ -0,0 +1,113 @@
+"""discover_pdfs() on a temporary folder tree.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_print_core import discover_pdfs, parse_patterns, split_dropped_paths, discovery  # noqa: E402
+
+TREE = [
+    'a.pdf',
+    'B.PDF',
+    'notes.txt',
+    'labels/2024/ups_01.pdf',
+    'labels/2024/ups_02.pdf',
+    'labels/2023/ups_old.pdf',
+    'labels/draft_label.pdf',
+    'archive/old.pdf',
+    'archive/deep/older.pdf',
+    'scans.pdf/page_1.pdf',  # A folder with a .pdf name
+]
+
+
+class DiscoverPdfsTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='pdf_print_test_')
+        for name in TREE:
+            file_path = os.path.join(self.root, *name.split('/'))
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w') as f:
+                f.write('%PDF-1.4')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def found(self, *args, **kwargs):
+        return [os.path.relpath(file_path, self.root).replace(os.sep, '/')
+                for batch in discover_pdfs([self.root], *args, **kwargs) for file_path in batch]
+
+    def test_default_finds_pdfs_in_name_order(self):
+        # A folder's files come before its subfolders, each in name order
+        self.assertEqual(self.found(), [
+            'a.pdf', 'B.PDF', 'archive/old.pdf', 'archive/deep/older.pdf',
+            'labels/draft_label.pdf', 'labels/2023/ups_old.pdf', 'labels/2024/ups_01.pdf',
+            'labels/2024/ups_02.pdf', 'scans.pdf/page_1.pdf'])
+
+    def test_folder_named_pdf_is_walked_not_listed(self):
+        found = self.found()
+        self.assertNotIn('scans.pdf', found)
+        self.assertIn('scans.pdf/page_1.pdf', found)
+
+    def test_include_patterns(self):
+        self.assertEqual(self.found(include=['ups_0?.pdf']),
+                         ['labels/2024/ups_01.pdf', 'labels/2024/ups_02.pdf'])
+        # A pattern with a slash matches the path below the root, ignoring case
+        self.assertEqual(self.found(include=['LABELS/2023/*']), ['labels/2023/ups_old.pdf'])
+        self.assertEqual(self.found(include=['*.txt', '*.PDF'])[:3], ['a.pdf', 'B.PDF', 'notes.txt'])
+
+    def test_exclude_patterns(self):
+        self.assertEqual(self.found(exclude=['draft_*', 'labels/2023']), [
+            'a.pdf', 'B.PDF', 'archive/old.pdf', 'archive/deep/older.pdf',
+            'labels/2024/ups_01.pdf', 'labels/2024/ups_02.pdf', 'scans.pdf/page_1.pdf'])
+
+    def test_excluded_folders_are_not_entered(self):
+        with mock.patch.object(discovery.os, 'scandir', wraps=os.scandir) as scandir:
+            found = self.found(exclude=['archive'])
+        scanned = {os.path.relpath(call.args[0], self.root) for call in scandir.call_args_list}
+        self.assertFalse(any(path.startswith('archive') for path in scanned), scanned)
+        self.assertFalse(any(path.startswith('archive/') for path in found))
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "symlinks not supported")
+    def test_symlinked_folders_are_not_followed(self):
+        try:
+            # A link back to the root would loop forever if it were followed
+            os.symlink(self.root, os.path.join(self.root, 'loop'))
+            os.symlink(os.path.join(self.root, 'labels'), os.path.join(self.root, 'labels_link'))
+        except OSError as e:
+            self.skipTest(f"can't create symlinks: {e}")
+        self.assertFalse(any(path.startswith(('loop/', 'labels_link/')) for path in self.found()))
+
+    def test_batches_and_cancel(self):
+        batches = list(discover_pdfs([self.root], batch_size=4))
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 1])
+        checks = []
+
+        def is_cancelled():
+            checks.append(1)
+            return len(checks) > 2
+
+        self.assertLess(sum(len(batch) for batch in discover_pdfs([self.root], is_cancelled=is_cancelled)), 9)
+
+    def test_dropped_folder_named_pdf(self):
+        # Regression: a dropped folder named scans.pdf was also added as a file
+        root_file = os.path.join(self.root, 'a.pdf')
+        pdf_folder = os.path.join(self.root, 'scans.pdf')
+        text_file = os.path.join(self.root, 'notes.txt')
+        missing = os.path.join(self.root, 'missing.pdf')
+        self.assertEqual(split_dropped_paths([root_file, pdf_folder, text_file, missing]),
+                         ([root_file], [pdf_folder]))
+
+    def test_parse_patterns(self):
+        self.assertEqual(parse_patterns(" *.pdf, labels/*;\n draft_* ,,"), ['*.pdf', 'labels/*', 'draft_*'])
+        self.assertEqual(parse_patterns(None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""FileListModel bookkeeping: duplicate counts, batched removal and in-place sort.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtCore import QCoreApplication, QPersistentModelIndex, Qt
+    import pdf_printer_app
+except ImportError:
+    pdf_printer_app = None
+
+from pdf_print_core import canonical_path  # noqa: E402
+
+
+def expected_counts(paths):
+    counts = {}
+    for path in paths:
+        key = canonical_path(path)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+@unittest.skipIf(pdf_printer_app is None, "PyQt5 is not installed")
+class FileListModelTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.model = pdf_printer_app.FileListModel()
+        self.removed = []  # (first, last) per rowsRemoved notification
+        self.model.rowsRemoved.connect(lambda parent, first, last: self.removed.append((first, last)))
+
+    def check(self, paths):
+        self.assertEqual(self.model.paths, paths)
+        self.assertEqual(self.model.counts, expected_counts(paths))
+        self.assertEqual(self.model.search_index.names, [os.path.basename(p).lower() for p in paths])
+
+    def test_counts_follow_duplicates(self):
+        self.model.append([('/docs/a.pdf', None), ('/docs/b.pdf', 'Label B'), ('/docs/./a.pdf', None)])
+        self.check(['/docs/a.pdf', '/docs/b.pdf', '/docs/./a.pdf'])
+        self.assertEqual(self.model.counts[canonical_path('/docs/a.pdf')], 2)
+        self.assertIn('/docs/x/../a.pdf', self.model)
+        self.model.remove_rows([0])
+        self.assertIn('/docs/a.pdf', self.model)  # One copy is still listed
+        self.model.remove_rows([1])
+        self.assertNotIn('/docs/a.pdf', self.model)
+        self.check(['/docs/b.pdf'])
+        self.assertEqual(self.model.entries(), [('/docs/b.pdf', 'Label B')])
+
+    def test_unique_entries(self):
+        self.model.append([('/docs/a.pdf', None)])
+        entries = [('/docs/a.pdf', None), ('/docs/c.pdf', None), ('/docs/./c.pdf', 'C')]
+        self.assertEqual(self.model.unique_entries(entries), [('/docs/c.pdf', None)])
+        self.assertEqual(self.model.unique_entries(entries, skip_listed=False),
+                         [('/docs/a.pdf', None), ('/docs/c.pdf', None)])
+
+    def test_remove_rows_in_contiguous_blocks(self):
+        paths = [f"/docs/{i:02d}.pdf" for i in range(12)]
+        self.model.append([(path, None) for path in paths])
+        self.model.remove_rows([1, 2, 3, 7, 3, 10, 11])
+        # From the end, so earlier blocks keep their row numbers
+        self.assertEqual(self.removed, [(10, 11), (7, 7), (1, 3)])
+        self.check([paths[row] for row in (0, 4, 5, 6, 8, 9)])
+
+    def test_remove_paths_removes_every_copy(self):
+        paths = ['/docs/a.pdf', '/docs/b.pdf', '/docs/a.pdf', '/docs/c.pdf', '/docs/d.pdf']
+        self.model.append([(path, None) for path in paths])
+        self.model.remove_paths(['/docs/a.pdf', '/docs/d.pdf', '/docs/missing.pdf'])
+        self.assertEqual(self.removed, [(4, 4), (2, 2), (0, 0)])
+        self.check(['/docs/b.pdf', '/docs/c.pdf'])
+        self.removed.clear()
+        self.model.remove_paths(['/docs/missing.pdf'])
+        self.assertEqual(self.removed, [])
+
+    def test_sort_keeps_counts_and_persistent_rows(self):
+        rng = random.Random(1)
+        paths = [f"/docs/{rng.choice('abcdef')}{i % 4}.pdf" for i in range(40)]
+        self.model.append([(path, None) for path in paths])
+        tracked = [QPersistentModelIndex(self.model.index(row)) for row in (0, 17, 39)]
+        tracked_paths = [paths[row] for row in (0, 17, 39)]
+        self.model.sort()
+        self.check(sorted(paths, key=lambda path: os.path.basename(path).lower()))
+        self.assertEqual([self.model.paths[index.row()] for index in tracked], tracked_paths)
+        self.model.sort(order=Qt.DescendingOrder)
+        self.assertEqual(self.model.paths, sorted(paths, key=lambda path: os.path.basename(path).lower(),
+                                                  reverse=True))
+        self.assertEqual([self.model.paths[index.row()] for index in tracked], tracked_paths)
+        # Bookkeeping still matches the rows after removing from the sorted list
+        self.model.remove_paths([self.model.paths[0]])
+        self.check(list(self.model.paths))
+        self.assertEqual(self.model.search_index.search(".pdf"), list(range(len(self.model.paths))))
+
+    def test_random_edits(self):
+        rng = random.Random(2)
+        expected = []
+        for step in range(200):
+            operation = rng.choice(['append', 'remove_rows', 'remove_paths', 'sort', 'reset'])
+            if operation == 'append' or not expected:
+                added = [f"/docs/{rng.randint(0, 30)}.pdf" for _ in range(rng.randint(1, 5))]
+                self.model.append([(path, None) for path in added])
+                expected += added
+            elif operation == 'remove_rows':
+                rows = rng.sample(range(len(expected)), rng.randint(1, min(5, len(expected))))
+                self.model.remove_rows(rows)
+                expected = [path for row, path in enumerate(expected) if row not in rows]
+            elif operation == 'remove_paths':
+                gone = set(rng.sample(expected, 1))
+                self.model.remove_paths(gone)
+                expected = [path for path in expected if path not in gone]
+            elif operation == 'sort':
+                self.model.sort()
+                expected.sort(key=lambda path: os.path.basename(path).lower())
+            elif rng.random() < 0.2:
+                self.model.reset([(path, None) for path in expected])
+            self.check(expected)
+            self.assertEqual(self.model.rowCount(), len(expected), f"step {step} ({operation})")
+
+
+if __name__ == '__main__':
+    unittest.main()
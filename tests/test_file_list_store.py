@@ -0,0 +1,86 @@
+"""FileListStore journal replay, including saves cut off by a crash.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_print_core import FileListStore, LIST_FILE_NAME, library  # noqa: E402
+
+
+class Crash(Exception):
+    pass
+
+
+class FileListStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+        self.list_path = os.path.join(self.folder, LIST_FILE_NAME)
+        self.files = [f"/docs/file{i:04d}.pdf" for i in range(library.JOURNAL_MIN_FILES)]
+        store = FileListStore(self.list_path)
+        store.save(self.files)
+        # Two journaled batches: an append, then a removal of rows 0 and 2
+        self.expected = self.files + ["/docs/new_a.pdf", "/docs/new_b.pdf"]
+        store.record(self.expected, [(["/docs/new_a.pdf", "/docs/new_b.pdf"], [])])
+        self.expected = [path for row, path in enumerate(self.expected) if row not in (0, 2)]
+        store.record(self.expected, [([], [0, 2])])
+        self.assertTrue(os.path.exists(store.journal_path))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_journal_is_replayed(self):
+        self.assertEqual(FileListStore(self.list_path).load(), self.expected)
+
+    def test_crash_after_list_replaced(self):
+        store = FileListStore(self.list_path)
+        store.load()
+        real_remove = os.remove
+
+        def crash_on_replayed(path):
+            if path == store.replayed_path:
+                raise Crash()
+            real_remove(path)
+
+        # The new list is in place but the old journal is still on disk
+        with mock.patch.object(library.os, 'remove', crash_on_replayed):
+            with self.assertRaises(Crash):
+                store.save(self.expected)
+        self.assertEqual(FileListStore(self.list_path).load(), self.expected)
+        self.assertFalse(os.path.exists(store.replayed_path))
+        self.assertFalse(os.path.exists(store.journal_path))
+
+    def test_crash_before_list_replaced(self):
+        store = FileListStore(self.list_path)
+        store.load()
+        real_replace = os.replace
+
+        def crash_on_list(source, target):
+            if target == self.list_path:
+                raise Crash()
+            real_replace(source, target)
+
+        # The journal is set aside but the old list hasn't been replaced yet
+        with mock.patch.object(library.os, 'replace', crash_on_list):
+            with self.assertRaises(Crash):
+                store.save(self.expected)
+        self.assertEqual(FileListStore(self.list_path).load(), self.expected)
+        self.assertFalse(os.path.exists(self.list_path + '.tmp'))
+
+    def test_crash_while_writing_list(self):
+        store = FileListStore(self.list_path)
+        store.load()
+        # A torn temporary list without a replayed journal is ignored
+        with open(self.list_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write('["/docs/fi')
+        self.assertEqual(FileListStore(self.list_path).load(), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Duplicate detection by content and by path spelling.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_print_core import canonical_path, content_duplicates, identity  # noqa: E402
+
+
+class ContentDuplicatesTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, name, data):
+        file_path = os.path.join(self.folder, name)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return file_path
+
+    def test_same_size_different_content(self):
+        existing = self.write('a.pdf', b'%PDF-1.4 aaaa')
+        candidate = self.write('b.pdf', b'%PDF-1.4 bbbb')
+        self.assertEqual(content_duplicates([existing], [candidate]), set())
+
+    def test_identical_copies(self):
+        existing = self.write('a.pdf', b'%PDF-1.4 same')
+        copy = self.write('copy.pdf', b'%PDF-1.4 same')
+        second_copy = self.write('copy2.pdf', b'%PDF-1.4 same')
+        other = self.write('other.pdf', b'%PDF-1.4 different length')
+        self.assertEqual(content_duplicates([existing], [copy, other, second_copy]), {copy, second_copy})
+
+    def test_copies_among_candidates(self):
+        # The first copy is kept, later ones are duplicates of it
+        first = self.write('first.pdf', b'%PDF-1.4 twin')
+        second = self.write('second.pdf', b'%PDF-1.4 twin')
+        self.assertEqual(content_duplicates([], [first, second]), {second})
+
+    def test_unique_sizes_are_not_hashed(self):
+        existing = self.write('a.pdf', b'%PDF-1.4 a')
+        candidate = self.write('b.pdf', b'%PDF-1.4 bb')
+        with mock.patch.object(identity, 'content_hash', wraps=identity.content_hash) as hashed:
+            self.assertEqual(content_duplicates([existing], [candidate]), set())
+        hashed.assert_not_called()
+
+    def test_unreadable_files_are_never_duplicates(self):
+        existing = self.write('a.pdf', b'%PDF-1.4 same')
+        missing = os.path.join(self.folder, 'missing.pdf')
+        self.assertEqual(content_duplicates([existing, missing], [missing]), set())
+
+    def test_size_cache(self):
+        existing = self.write('a.pdf', b'%PDF-1.4 same')
+        copy = self.write('copy.pdf', b'%PDF-1.4 same')
+        sizes = {}
+        self.assertEqual(content_duplicates([existing], [copy], sizes), {copy})
+        self.assertEqual(sizes, {existing: 13, copy: 13})
+
+
+class CanonicalPathTest(unittest.TestCase):
+    def test_spellings_of_the_same_path(self):
+        folder = tempfile.gettempdir()
+        file_path = os.path.join(folder, 'labels', 'a.pdf')
+        spellings = [os.path.join(folder, 'labels', '.', 'a.pdf'),
+                     os.path.join(folder, 'labels', 'sub', '..', 'a.pdf'),
+                     os.path.join(folder, 'labels', '', 'a.pdf'),
+                     os.path.relpath(file_path)]
+        for spelling in spellings:
+            self.assertEqual(canonical_path(spelling), canonical_path(file_path), spelling)
+        self.assertNotEqual(canonical_path(os.path.join(folder, 'labels', 'b.pdf')),
+                            canonical_path(file_path))
+
+    def test_case_follows_the_platform(self):
+        upper = os.path.join(tempfile.gettempdir(), 'A.PDF')
+        lower = os.path.join(tempfile.gettempdir(), 'a.pdf')
+        self.assertEqual(canonical_path(upper) == canonical_path(lower), os.path.normcase('A') == 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""IncrementalMergeJob and SpeculativeMerger against a fresh merge_files() run.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_print_core import IncrementalMergeJob, SpeculativeMerger, merge_files  # noqa: E402
+
+
+def page_texts(doc):
+    return [(page.get_text().strip(), round(page.rect.width)) for page in doc]
+
+
+class IncrementalMergeTest(unittest.TestCase):
+    def setUp(self):
+        import fitz
+        self.folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+        self.files = []
+        for i in range(12):
+            doc = fitz.open()
+            # 1 to 3 pages, so blank-page padding varies; widths tell the files apart
+            for p in range(1 + i % 3):
+                doc.new_page(width=200 + i, height=300).insert_text((10, 20), f"file {i} page {p}")
+            file_path = os.path.join(self.folder, f"file{i:02d}.pdf")
+            doc.save(file_path)
+            doc.close()
+            self.files.append(file_path)
+        self.broken = os.path.join(self.folder, 'broken.pdf')
+        with open(self.broken, 'w') as f:
+            f.write("not a pdf")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def fresh_merge(self, file_paths, add_blank_pages=True):
+        import fitz
+        output_path = os.path.join(self.folder, 'reference.out')
+        result = merge_files(file_paths, output_path, add_blank_pages=add_blank_pages)
+        if result.output_path is None:
+            return []
+        with fitz.open(output_path) as doc:
+            return page_texts(doc)
+
+    def test_random_edits_match_fresh_merge(self):
+        import fitz
+        job = IncrementalMergeJob(add_blank_pages=True)
+        rng = random.Random(1)
+        selection = []
+        try:
+            for step in range(40):
+                operation = rng.choice(['append', 'remove', 'move', 'broken', 'edit'])
+                if operation == 'append' or not selection:
+                    selection = selection + rng.sample(self.files, rng.randint(1, 3))
+                elif operation == 'remove':
+                    selection.pop(rng.randrange(len(selection)))
+                elif operation == 'move':
+                    moved = selection.pop(rng.randrange(len(selection)))
+                    selection.insert(rng.randrange(len(selection) + 1), moved)
+                elif operation == 'broken':
+                    selection.insert(rng.randrange(len(selection) + 1), self.broken)
+                else:
+                    # Edit a file in place; it must be merged again
+                    file_path = rng.choice(selection)
+                    if file_path != self.broken:
+                        with fitz.open(file_path) as doc:
+                            doc[0].insert_text((10, 60), f"edit {step}")
+                            doc.saveIncr()
+                self.assertTrue(job.sync(selection))
+                self.assertEqual(page_texts(job.doc), self.fresh_merge(selection),
+                                 f"step {step} ({operation})")
+            self.assertEqual({file_path for file_path, _ in job.failed},
+                             {self.broken} if self.broken in selection else set())
+        finally:
+            job.close()
+
+    def test_speculative_merge_is_taken_only_when_current(self):
+        import fitz
+        merger = SpeculativeMerger(None)
+        try:
+            valid = self.files[:8]
+            merger.request(valid + [self.broken], True)
+            self.assertTrue(merger.wait(30))
+            # Other settings don't match; the build is kept for the right ones
+            self.assertIsNone(merger.take(valid, False))
+            taken = merger.take(valid, True)
+            self.assertIsNotNone(taken)
+            data, pages = taken
+            with fitz.open(stream=data, filetype='pdf') as doc:
+                self.assertEqual(page_texts(doc), self.fresh_merge(valid))
+                self.assertEqual(doc.page_count, pages)
+            # A build for another selection is never handed over
+            merger.request(self.files[:3], True)
+            self.assertTrue(merger.wait(30))
+            self.assertIsNone(merger.take(valid, True))
+        finally:
+            merger.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
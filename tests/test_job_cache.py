@@ -0,0 +1,114 @@
+"""MergedJobCache eviction and lookup, and job_key() changes.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from itertools import count
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_print_core import MergedJobCache, job_key, job_cache  # noqa: E402
+
+
+class MergedJobCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+        self.cache = MergedJobCache(os.path.join(self.folder, 'jobs'), max_bytes=1000, max_entries=3)
+        # A clock that moves on with every call, so last use is never a tie
+        clock = count(1000)
+        patcher = mock.patch.object(job_cache.time, 'time', lambda: next(clock))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def store(self, key, size):
+        merged_path = self.cache.temp_path_for_key(key)
+        with open(merged_path, 'wb') as f:
+            f.write(b'x' * size)
+        return self.cache.store(key, merged_path, pages=1)
+
+    def test_least_recently_used_is_evicted(self):
+        for key in 'abc':
+            self.store(key, 100)
+        self.assertIsNotNone(self.cache.lookup('a'))  # a is now newer than b
+        self.store('d', 100)
+        self.assertEqual(set(self.cache.entries), {'a', 'c', 'd'})
+        self.assertFalse(os.path.exists(self.cache.path_for_key('b')))
+        self.assertEqual(self.cache.total_bytes, 300)
+
+    def test_latest_job_is_kept_over_budget(self):
+        self.store('a', 100)
+        self.store('big', 5000)
+        self.assertEqual(list(self.cache.entries), ['big'])
+        self.assertEqual(self.cache.lookup('big'), self.cache.path_for_key('big'))
+        # It goes once a newer job is stored
+        self.store('c', 100)
+        self.assertEqual(list(self.cache.entries), ['c'])
+        self.assertEqual(self.cache.total_bytes, 100)
+
+    def test_lookup_drops_entry_whose_file_is_missing(self):
+        path = self.store('a', 100)
+        os.remove(path)
+        self.assertIsNone(self.cache.lookup('a'))
+        self.assertNotIn('a', self.cache.entries)
+        self.assertEqual(self.cache.total_bytes, 0)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+        self.assertIsNone(self.cache.lookup(None))
+
+    def test_index_survives_restart(self):
+        self.store('a', 100)
+        self.cache.set_last_job(['/docs/a.pdf'], {'blank_pages': True})
+        reopened = MergedJobCache(self.cache.cache_dir)
+        self.assertEqual(reopened.lookup('a'), self.cache.path_for_key('a'))
+        self.assertEqual(reopened.last_job(), {'files': ['/docs/a.pdf'], 'settings': {'blank_pages': True}})
+
+
+class JobKeyTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+        self.files = []
+        for name in ('a.pdf', 'b.pdf'):
+            file_path = os.path.join(self.folder, name)
+            with open(file_path, 'wb') as f:
+                f.write(b'%PDF-1.4 ' + name.encode())
+            self.files.append(file_path)
+        self.settings = {'blank_pages': True}
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_key_is_stable(self):
+        self.assertEqual(job_key(self.files, self.settings), job_key(list(self.files), dict(self.settings)))
+
+    def test_key_changes_with_size(self):
+        before = job_key(self.files, self.settings)
+        stat = os.stat(self.files[0])
+        with open(self.files[0], 'ab') as f:
+            f.write(b' more')
+        os.utime(self.files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns))  # Same mtime
+        self.assertNotEqual(job_key(self.files, self.settings), before)
+
+    def test_key_changes_with_mtime(self):
+        before = job_key(self.files, self.settings)
+        stat = os.stat(self.files[0])
+        os.utime(self.files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertNotEqual(job_key(self.files, self.settings), before)
+
+    def test_key_changes_with_order_and_settings(self):
+        before = job_key(self.files, self.settings)
+        self.assertNotEqual(job_key(self.files[::-1], self.settings), before)
+        self.assertNotEqual(job_key(self.files, {'blank_pages': False}), before)
+
+    def test_unreadable_file_has_no_key(self):
+        self.assertIsNone(job_key(self.files + [os.path.join(self.folder, 'missing.pdf')], self.settings))
+
+
+if __name__ == '__main__':
+    unittest.main()
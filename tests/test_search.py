@@ -0,0 +1,111 @@
+"""SearchIndex narrowing against a fresh scan, and the query syntax.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_print_core import SearchIndex, parse_query  # noqa: E402
+
+WORDS = ['invoice', 'label', 'order', 'scan', 'report', '2023', '2024', 'ups', 'dhl']
+FOLDERS = ['/home/ops/Labels/2024', '/home/ops/labels/2023', 'C:\\Scans\\Invoices', '/srv/orders']
+
+
+def random_path(rng):
+    name = '_'.join(rng.sample(WORDS, rng.randint(1, 3))) + f"_{rng.randint(0, 99)}.pdf"
+    folder = rng.choice(FOLDERS)
+    separator = '\\' if folder.startswith('C:') else '/'
+    return folder + separator + (name.upper() if rng.random() < 0.2 else name)
+
+
+def fresh_search(file_paths, query):
+    index = SearchIndex()
+    index.rebuild(file_paths)
+    return index.search(query)
+
+
+class ParseQueryTest(unittest.TestCase):
+    def test_modes(self):
+        self.assertEqual(parse_query("Invoice ~inv24 Labels/2024 scans\\in ~"),
+                         [('name', 'invoice'), ('fuzzy', 'inv24'), ('path', 'labels/2024'),
+                          ('path', 'scans/in'), ('name', '~')])
+        self.assertEqual(parse_query("   "), [])
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.files = ['/home/ops/Labels/2024/invoice_2024_03.pdf',
+                      '/home/ops/labels/2023/ups_label.pdf',
+                      'C:\\Scans\\Invoices\\INVOICE_dhl.pdf',
+                      '/srv/orders/order_invoice.pdf']
+        self.index = SearchIndex()
+        self.index.rebuild(self.files)
+
+    def test_name_words_must_all_match(self):
+        self.assertEqual(self.index.search("invoice"), [0, 2, 3])
+        self.assertEqual(self.index.search("invoice order"), [3])
+        self.assertIsNone(self.index.search(""))
+
+    def test_path_tokens_match_folders(self):
+        # Folder names don't match plain words, only tokens with a separator
+        self.assertEqual(self.index.search("labels"), [])
+        self.assertEqual(self.index.search("labels/"), [0, 1])
+        self.assertEqual(self.index.search("labels/2024"), [0])
+        self.assertEqual(self.index.search("scans\\invoices"), [2])
+
+    def test_fuzzy_matches_letters_in_order(self):
+        self.assertEqual(self.index.search("~inv24"), [0])
+        self.assertEqual(self.index.search("~upl"), [1])
+        self.assertEqual(self.index.search("~dhlinv"), [])
+        self.assertEqual(self.index.search("~in*"), [])  # Regex characters are literal
+        self.assertEqual(self.index.search("~24.pdf"), [0])
+
+    def test_narrows(self):
+        self.index.search("inv")
+        self.assertTrue(self.index._narrows(parse_query("invo")))
+        self.assertTrue(self.index._narrows(parse_query("inv 2024")))
+        self.assertFalse(self.index._narrows(parse_query("in")))
+        self.assertFalse(self.index._narrows(parse_query("~inv")))
+        self.index.search("inv 2024")
+        self.assertFalse(self.index._narrows(parse_query("inv")))
+        self.index.extend(['/tmp/invoice.pdf'])
+        self.assertFalse(self.index._narrows(parse_query("invo")))
+
+    def test_typing_matches_fresh_scan(self):
+        rng = random.Random(1)
+        file_paths = [random_path(rng) for _ in range(300)]
+        index = SearchIndex()
+        index.rebuild(file_paths)
+        queries = ["invoice 2024", "~inv24 ups", "labels/2024 label", "C:\\scans ~dhl", "ORDER rep"]
+        narrowed = 0
+        for step in range(40):
+            query = rng.choice(queries)
+            for end in range(1, len(query) + 1):
+                narrowed += index._narrows(parse_query(query[:end]))
+                self.assertEqual(index.search(query[:end]), fresh_search(file_paths, query[:end]),
+                                 f"step {step}: {query[:end]!r}")
+                # Edit the list mid-query now and then, as a folder import would
+                if rng.random() < 0.05:
+                    added = [random_path(rng) for _ in range(rng.randint(1, 5))]
+                    file_paths.extend(added)
+                    index.extend(added)
+                elif rng.random() < 0.05 and len(file_paths) > 10:
+                    first = rng.randrange(len(file_paths) - 5)
+                    last = first + rng.randint(0, 4)
+                    del file_paths[first:last + 1]
+                    index.delete(first, last)
+                elif rng.random() < 0.03:
+                    order = list(range(len(file_paths)))
+                    rng.shuffle(order)
+                    file_paths = [file_paths[row] for row in order]
+                    index.reorder(order)
+        # Most keystrokes should have reused the previous matches
+        self.assertGreater(narrowed, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
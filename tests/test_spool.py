@@ -0,0 +1,191 @@
+"""SpoolManager job states and private folders, and tmpfs detection.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import stat
+import shutil
+import tempfile
+import subprocess
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_print_core import (SpoolManager, JOB_DONE, JOB_FAILED, JOB_HANDED_OFF, JOB_READY,  # noqa: E402
+                            spool)
+
+MOUNTS = """\
+sysfs /sys sysfs rw,nosuid 0 0
+/dev/sda1 / ext4 rw,relatime 0 0
+tmpfs /dev/shm tmpfs rw,nosuid,nodev 0 0
+tmpfs /run/user/1000 tmpfs rw,nosuid,nodev,mode=700 0 0
+/dev/sdb1 /run/user/1000/disk ext4 rw 0 0
+ramfs /mnt/my\\040ram ramfs rw 0 0
+"""
+
+posix_only = unittest.skipUnless(hasattr(os, 'getuid'), "needs POSIX owners and modes")
+
+
+def mode(path):
+    return stat.S_IMODE(os.lstat(path).st_mode)
+
+
+class RamDiskTest(unittest.TestCase):
+    def is_ram_disk(self, path, mounts=MOUNTS):
+        with mock.patch.object(spool, 'open', mock.mock_open(read_data=mounts), create=True), \
+                mock.patch.object(spool.os.path, 'realpath', lambda path: path):
+            return spool.is_ram_disk(path)
+
+    def test_mount_types(self):
+        self.assertTrue(self.is_ram_disk('/dev/shm'))
+        self.assertTrue(self.is_ram_disk('/dev/shm/pdf_print_station-0'))
+        self.assertFalse(self.is_ram_disk('/tmp'))
+        self.assertFalse(self.is_ram_disk('/dev/shmem'))  # Not below /dev/shm
+        self.assertTrue(self.is_ram_disk('/mnt/my ram/spool'))
+
+    def test_deepest_mount_wins(self):
+        self.assertTrue(self.is_ram_disk('/run/user/1000/spool'))
+        self.assertFalse(self.is_ram_disk('/run/user/1000/disk/spool'))
+
+    def test_no_mount_table(self):
+        with mock.patch.object(spool, 'open', side_effect=OSError, create=True):
+            self.assertFalse(spool.is_ram_disk('/dev/shm'))
+
+    def test_fast_temp_dir_needs_ram_disk(self):
+        folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+        self.addCleanup(shutil.rmtree, folder, True)
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': folder}), \
+                mock.patch.object(spool, 'free_bytes', lambda path: 1 << 40):
+            with mock.patch.object(spool, 'is_ram_disk', lambda path: path == folder):
+                self.assertEqual(spool.fast_temp_dir(), folder)
+            with mock.patch.object(spool, 'is_ram_disk', lambda path: False):
+                self.assertEqual(spool.fast_temp_dir(), tempfile.gettempdir())
+
+
+@posix_only
+class PrivateDirTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_created_private(self):
+        path = os.path.join(self.folder, 'spool')
+        old_umask = os.umask(0)
+        try:
+            self.assertTrue(spool.private_dir(path))
+        finally:
+            os.umask(old_umask)
+        self.assertEqual(mode(path), 0o700)
+        self.assertTrue(spool.private_dir(path))  # Already there and private
+
+    def test_shared_folder_is_refused(self):
+        path = os.path.join(self.folder, 'spool')
+        os.mkdir(path)
+        os.chmod(path, 0o755)
+        self.assertFalse(spool.private_dir(path))
+
+    def test_other_owner_is_refused(self):
+        path = os.path.join(self.folder, 'spool')
+        os.mkdir(path, 0o700)
+        with mock.patch.object(spool.os, 'getuid', lambda: os.lstat(path).st_uid + 1):
+            self.assertFalse(spool.private_dir(path))
+
+    def test_planted_symlink_and_file_are_refused(self):
+        target = os.path.join(self.folder, 'target')
+        os.mkdir(target, 0o700)
+        link = os.path.join(self.folder, 'link')
+        os.symlink(target, link)
+        self.assertFalse(spool.private_dir(link))
+        plain_file = os.path.join(self.folder, 'file')
+        open(plain_file, 'w').close()
+        self.assertFalse(spool.private_dir(plain_file))
+
+
+class SpoolManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='pdf_print_test_')
+        self.spool = SpoolManager(self.folder, max_handed_off=2)
+
+    def tearDown(self):
+        self.spool.shutdown()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    @posix_only
+    def test_session_is_private(self):
+        session = self.spool.session()
+        self.assertEqual(os.path.dirname(session), self.spool.root)
+        self.assertTrue(os.path.basename(session).startswith(f"session_{os.getpid()}_"))
+        self.assertEqual(mode(self.spool.root), 0o700)
+        self.assertEqual(mode(session), 0o700)
+        self.assertEqual(self.spool.session(), session)
+
+    @posix_only
+    def test_session_falls_back_when_root_is_not_private(self):
+        os.mkdir(self.spool.root)
+        os.chmod(self.spool.root, 0o777)
+        session = self.spool.session()
+        self.assertEqual(os.path.dirname(session), self.folder)
+        self.assertEqual(mode(session), 0o700)
+
+    def test_memory_job_is_written_and_released(self):
+        job = self.spool.add_job(b'%PDF-1.4 job', pages=2)
+        self.assertEqual(job.state, JOB_READY)
+        self.assertEqual(self.spool.stats(), {'jobs': 1, 'handed_off': 0, 'memory_bytes': 12})
+        path = self.spool.file_for(job)
+        self.assertEqual(os.path.dirname(path), self.spool.session())
+        self.assertTrue(job.owned)
+        self.assertIsNone(job.data)
+        self.spool.set_state(job, JOB_DONE)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.spool.active_jobs(), [])
+
+    def test_files_not_owned_are_kept(self):
+        cached = os.path.join(self.folder, 'cached_job.pdf')
+        with open(cached, 'wb') as f:
+            f.write(b'%PDF-1.4')
+        job = self.spool.add_job(cached)
+        self.assertEqual(self.spool.file_for(job), cached)
+        self.spool.set_state(job, JOB_FAILED)
+        self.assertTrue(os.path.exists(cached))
+        self.assertEqual(self.spool.active_jobs(), [])
+
+    def test_handed_off_jobs_are_capped(self):
+        jobs = [self.spool.add_job(f'%PDF-1.4 {i}'.encode()) for i in range(3)]
+        paths = [self.spool.file_for(job) for job in jobs]
+        for job in jobs:
+            self.spool.set_state(job, JOB_HANDED_OFF)
+        # Only the newest max_handed_off stay on disk
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+        self.assertEqual(self.spool.stats()['handed_off'], 2)
+        # Shutdown leaves them for the viewer; the next start cleans up
+        self.spool.shutdown()
+        self.assertTrue(all(os.path.exists(path) for path in paths[1:]))
+
+    @unittest.skipIf(sys.platform == "win32", "uses os.kill to check processes")
+    def test_remove_stale_sessions_skips_live_processes(self):
+        own = self.spool.session()
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        live = os.path.join(self.spool.root, f"session_{os.getppid()}_abc")
+        stale = os.path.join(self.spool.root, f"session_{finished.pid}_abc")
+        other = os.path.join(self.spool.root, "not_a_session")
+        for path in (live, stale, other):
+            os.mkdir(path)
+        self.assertEqual(self.spool.remove_stale_sessions(), 1)
+        self.assertEqual([os.path.exists(path) for path in (own, live, stale, other)],
+                         [True, True, False, True])
+
+    @posix_only
+    def test_remove_stale_sessions_skips_root_that_is_not_private(self):
+        os.mkdir(self.spool.root)
+        os.mkdir(os.path.join(self.spool.root, "session_999999999_abc"))
+        os.chmod(self.spool.root, 0o777)
+        self.assertEqual(self.spool.remove_stale_sessions(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,21 @@
 import os
 import sys
 import json
-import requests
-from packaging import version
+import importlib.util
 from PyQt5.QtWidgets import QMessageBox, QProgressDialog
 from PyQt5.QtCore import Qt
 
 CURRENT_VERSION = "0.0.1"  # Current app version
 GITHUB_API_URL = "https://api.github.com/repos/SandeepSAulakh/PDF-Print-Station/releases/latest"
 
+def dependencies_available():
+    """Check that requests and packaging are installed without importing them"""
+    return all(importlib.util.find_spec(name) is not None for name in ("requests", "packaging"))
+
 def check_for_updates(parent=None):
+    # Imported here so the network stack doesn't slow down app startup
+    import requests
+    from packaging import version
     try:
         # Show checking progress
         checking_dialog = QProgressDialog("Checking for updates...", None, 0, 0, parent)
@@ -58,6 +64,7 @@ def check_for_updates(parent=None):
     return False
 
 def download_and_install_update(url, parent=None):
+    import requests
     try:
         # Create progress dialog
         progress = QProgressDialog("Downloading update...", "Cancel", 0, 100, parent)